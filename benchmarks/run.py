@@ -0,0 +1,415 @@
+"""
+วัดประสิทธิภาพของขั้นตอนหลัก (แปลงเบอร์ อ่านไฟล์ที่อัปโหลด เทียบกับเบอร์รวม ค้นหา บันทึก รวม/ตัด/ลบรายการ ส่งออก หน่วยความจำของเบอร์รวม)
+ด้วยข้อมูลเบอร์ไทยสังเคราะห์ที่สร้างซ้ำได้ (seed เดียวกันได้ไฟล์เดียวกัน)
+
+    python benchmarks/run.py                                 # 10k และ 100k แถว เบอร์รวม 100k
+    python benchmarks/run.py --sizes 10000,1000000,10000000 --master-sizes 1000000,10000000
+    python benchmarks/run.py --save-baseline main            # เก็บผลเป็น baseline ชื่อ main
+    python benchmarks/run.py --compare main                  # เทียบกับ baseline (exit 1 ถ้าช้าลงเกิน --tolerance)
+
+แต่ละกรณีรันในโปรเซสใหม่ (spawn) เพื่อให้ peak RSS เป็นของกรณีนั้นเท่านั้น
+ไฟล์ข้อมูลที่สร้างจะถูกเก็บไว้ใน --workdir และใช้ซ้ำในครั้งถัดไป
+
+baseline เก็บใน benchmarks/baselines/{NAME}.json (ผลทุกกรณีพร้อมข้อมูลเครื่อง) ไฟล์ main.json ใน repo
+วัดด้วยค่าเริ่มต้นบนเครื่องที่ระบุใน environment ของไฟล์ เวลาขึ้นกับเครื่อง จึงควรเทียบบนเครื่องเดียวกัน:
+รัน --save-baseline NAME บน commit ฐาน แล้วรัน --compare NAME (ขนาดข้อมูลและ seed เดียวกัน) บน commit ที่แก้
+กรณีที่ไม่มีใน baseline จะไม่ถูกเทียบ เมื่อปรับปรุงจนเร็วขึ้นให้บันทึก main.json ใหม่ใน commit เดียวกัน
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from number_manager import (  # noqa: E402
+    EXCEL_MAX_DATA_ROWS,
+    METRICS,
+    combine_numbers,
+    create_export_file,
+    decode_numbers,
+    encode_numbers,
+    find_existing_numbers_in_store,
+    get_all_numbers_from_file,
+    get_db_connection,
+    get_peak_rss_bytes,
+    get_snapshot_dir,
+    insert_list_numbers,
+    insert_numbers,
+    load_bloom_filter,
+    load_master_numbers,
+    normalize_phone_number,
+    normalize_phone_numbers,
+    read_master_snapshot,
+    read_phone_numbers,
+    search_numbers,
+    split_numbers,
+)
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+DEFAULT_SIZES = '10000,100000'
+DEFAULT_MASTER_SIZES = '100000'
+# สัดส่วนแถวขยะ (ชื่อ เบอร์บ้าน เลขสั้น ค่าว่าง) และสัดส่วนเบอร์ในไฟล์ที่มีอยู่แล้วในเบอร์รวม
+JUNK_RATIO = 0.1
+EXISTING_RATIO = 0.3
+# เลขขึ้นต้นของเบอร์มือถือไทย (หลัง 0)
+MOBILE_PREFIXES = (6, 8, 9)
+# เกินนี้การแปลงเบอร์ทีละค่าใช้เวลานานเกินไป จึงวัดเฉพาะแบบทั้งชุด
+SCALAR_MAX_ROWS = 1000000
+# จำนวนเบอร์ที่บันทึกหลัง snapshot ในกรณี store.load_snapshot (บันทึกที่ต้องเล่นต่อตอน cold start)
+SNAPSHOT_DELTA_ROWS = 10000
+
+_NUMBER_FORMATS = (
+    lambda d: '0' + d,
+    lambda d: '+66' + d,
+    lambda d: '66' + d,
+    lambda d: d,
+    lambda d: f'0{d[:2]}-{d[2:5]}-{d[5:]}',
+    lambda d: f'0{d[:2]} {d[2:5]} {d[5:]}',
+    lambda d: f'+66 {d[:2]} {d[2:5]} {d[5:]}',
+    lambda d: f'(0{d[:2]}) {d[2:5]}-{d[5:]}',
+)
+_JUNK_VALUES = ('สมชาย ใจดี', '02-123-4567', '1234', '', 'N/A', '0812345', 'โทร. ติดต่อฝ่ายขาย', '+1 415 555 0100')
+
+def generate_numbers(count, rng):
+    """
+    สุ่มเบอร์มือถือไทยที่ไม่ซ้ำ count เบอร์ คืนค่าเป็น uint32 (เลข 9 หลักหลัง 0 แบบ encode_numbers)
+    """
+    numbers = np.empty(0, dtype=np.uint32)
+    while len(numbers) < count:
+        prefix = rng.choice(MOBILE_PREFIXES, count) * 100000000
+        numbers = np.unique(np.concatenate((numbers, (prefix + rng.integers(0, 100000000, count)).astype(np.uint32))))
+    return rng.permutation(numbers)[:count]
+
+def format_rows(encoded, rng):
+    """
+    แปลงเบอร์เป็นข้อความหลายรูปแบบ (0XX, +66, 66, 9 หลัก, มีขีด/ช่องว่าง/วงเล็บ) ปนแถวขยะตาม JUNK_RATIO
+    """
+    styles = rng.integers(0, len(_NUMBER_FORMATS), len(encoded))
+    junk = rng.random(len(encoded)) < JUNK_RATIO
+    junk_values = rng.integers(0, len(_JUNK_VALUES), len(encoded))
+    rows = []
+    for digits, style, is_junk, junk_value in zip(decode_numbers(encoded), styles, junk, junk_values):
+        rows.append(_JUNK_VALUES[junk_value] if is_junk else _NUMBER_FORMATS[style](digits[1:]))
+    return rows
+
+def build_corpus(workdir, size, master_size, seed):
+    """
+    สร้าง (หรือใช้ซ้ำ) ข้อมูลชุดหนึ่ง: เบอร์รวม master_size เบอร์ และไฟล์อัปโหลด size แถวในรูปแบบ txt/csv/xlsx
+    โดยเบอร์ในไฟล์อัปโหลดมีอยู่แล้วในเบอร์รวมประมาณ EXISTING_RATIO
+    """
+    name = f'{size}-{master_size}-{seed}'
+    paths = {
+        'master': os.path.join(workdir, f'master-{name}.npy'),
+        'upload': os.path.join(workdir, f'upload-{name}.npy'),
+        'txt': os.path.join(workdir, f'upload-{name}.txt'),
+        'csv': os.path.join(workdir, f'upload-{name}.csv'),
+        'xlsx': os.path.join(workdir, f'upload-{name}.xlsx'),
+    }
+    if all(os.path.exists(path) for key, path in paths.items() if key != 'xlsx' or size <= EXCEL_MAX_DATA_ROWS):
+        return paths
+
+    rng = np.random.default_rng(seed)
+    numbers = generate_numbers(master_size + size, rng)
+    master = np.sort(numbers[:master_size])
+    existing_count = min(int(size * EXISTING_RATIO), master_size)
+    upload = np.concatenate((rng.choice(master, existing_count, replace=False), numbers[master_size:master_size + size - existing_count]))
+    upload = rng.permutation(upload)
+    np.save(paths['master'], master)
+    np.save(paths['upload'], upload)
+
+    rows = format_rows(upload, rng)
+    with open(paths['txt'], 'w', encoding='utf-8') as f:
+        f.write('\n'.join(rows))
+    with open(paths['csv'], 'w', encoding='utf-8') as f:
+        f.write('name,phone,province\n')
+        f.writelines(f'customer {i},"{row}",Bangkok\n' for i, row in enumerate(rows))
+    if size <= EXCEL_MAX_DATA_ROWS:
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(paths['xlsx'], {'constant_memory': True})
+        worksheet = workbook.add_worksheet()
+        worksheet.write_row(0, 0, ('name', 'phone', 'province'))
+        for row_number, row in enumerate(rows, start=1):
+            worksheet.write_row(row_number, 0, (f'customer {row_number}', row, 'Bangkok'))
+        workbook.close()
+    return paths
+
+def build_master_db(workdir, paths, master_size, seed):
+    """
+    ฐานข้อมูลเบอร์รวมต้นแบบของชุดข้อมูล (สร้างครั้งเดียว กรณีที่แก้ฐานข้อมูลจะคัดลอกไปใช้)
+    """
+    db_path = os.path.join(workdir, f'master-{master_size}-{seed}.db')
+    if not os.path.exists(db_path):
+        insert_numbers(decode_numbers(np.load(paths['master'])), db_path=db_path + '.tmp')
+        with closing(get_db_connection(db_path + '.tmp')) as conn:
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        os.replace(db_path + '.tmp', db_path)
+    return db_path
+
+def build_combined_file(workdir, paths, master_size, seed):
+    """
+    ไฟล์รวมเบอร์แบบเดิม (ข้อความ เบอร์ละบรรทัด) ที่มีเบอร์รวมทั้งหมดของชุดข้อมูล สำหรับวัด cold start แบบเดิม
+    """
+    path = os.path.join(workdir, f'combined-{master_size}-{seed}.txt')
+    if not os.path.exists(path):
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.writelines(f'{number}\n' for number in decode_numbers(np.load(paths['master'])))
+        os.replace(path + '.tmp', path)
+    return path
+
+def copy_db(db_path, workdir):
+    target = os.path.join(workdir, f'run-{os.getpid()}.db')
+    shutil.copyfile(db_path, target)
+    return target
+
+def run_case(case, size, master_size, paths, db_path, workdir):
+    """
+    รันกรณีทดสอบหนึ่งกรณี (ในโปรเซสลูก) คืนค่า dict ของเวลา จำนวนแถว และ peak RSS
+    """
+    METRICS.reset()
+    cleanup = []
+    rows = size
+    memory_bytes = None
+    if case in ('normalize.scalar', 'normalize.batch'):
+        with open(paths['txt'], encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    if case in ('dedupe', 'search', 'store.insert', 'store.insert_list', 'store.lookup', 'store.lookup_bloom',
+                'export.txt', 'export.xlsx') or case.startswith('lists.'):
+        upload = np.load(paths['upload'])
+    if case in ('dedupe', 'search') or case.startswith(('lists.', 'memory.')):
+        master = np.load(paths['master'])
+        master.flags.writeable = False
+    if case.startswith('lists.'):
+        # รายการในฐานข้อมูลออกมาเป็น uint32 เรียงลำดับไม่ซ้ำอยู่แล้ว
+        upload = np.unique(upload)
+    if case == 'dedupe':
+        upload_numbers = set(decode_numbers(upload))
+    if case in ('store.insert', 'store.insert_list', 'store.lookup', 'store.lookup_bloom'):
+        db_path = copy_db(db_path, workdir)
+        cleanup.append(db_path)
+        upload_numbers = decode_numbers(upload)
+        if case == 'store.lookup_bloom':
+            bloom = load_bloom_filter(db_path)
+            cleanup.append(f'{db_path}-bloom.npz')
+    if case == 'store.load_snapshot':
+        db_path = copy_db(db_path, workdir)
+        cleanup.append(db_path)
+        # โหลดครั้งแรกเขียน snapshot (ฐานข้อมูลต้นแบบไม่มี) แล้วเพิ่มเบอร์อีกชุดให้มีบันทึกที่ต้องเล่นต่อ
+        with closing(get_db_connection(db_path)) as conn:
+            read_master_snapshot(conn, db_path)
+        insert_numbers(decode_numbers(np.load(paths['upload'])[:SNAPSHOT_DELTA_ROWS]), db_path=db_path)
+
+    start = time.perf_counter()
+    if case == 'normalize.scalar':
+        for line in lines:
+            normalize_phone_number(line)
+    elif case == 'normalize.batch':
+        normalize_phone_numbers(lines)
+    elif case.startswith('ingest.'):
+        # ส่วนที่ปุ่มประมวลผลไฟล์ทำกับแต่ละไฟล์: อ่าน แปลงเบอร์ และรวมเบอร์ที่ไม่ซ้ำ
+        with open(paths[case.split('.')[1]], 'rb') as f:
+            read_phone_numbers(f)
+    elif case == 'legacy.read_combined_file':
+        # cold start แบบเดิม: อ่านไฟล์รวมเบอร์ทั้งไฟล์เป็น set ของข้อความ เทียบกับ store.load_master/store.load_snapshot
+        rows = len(get_all_numbers_from_file(paths['combined']))
+    elif case == 'dedupe':
+        # ส่วนที่ปุ่มประมวลผลไฟล์ทำหลังอ่านไฟล์: แยกเบอร์ใหม่/เบอร์ซ้ำกับเบอร์รวม
+        split_numbers(upload_numbers, master)
+    elif case == 'search':
+        search_numbers(upload, master)
+    elif case == 'store.insert':
+        insert_numbers(upload_numbers, db_path=db_path)
+    elif case == 'store.insert_list':
+        insert_list_numbers(upload_numbers, 'benchmark', db_path=db_path)
+    elif case == 'store.lookup':
+        find_existing_numbers_in_store(upload_numbers, db_path)
+    elif case == 'store.lookup_bloom':
+        find_existing_numbers_in_store(upload_numbers, db_path, bloom)
+    elif case == 'store.load_master':
+        with closing(get_db_connection(db_path)) as conn:
+            rows = len(load_master_numbers(conn))
+    elif case == 'store.load_snapshot':
+        # cold start: เปิด snapshot แบบ memory-mapped แล้วเล่นบันทึกการเปลี่ยนแปลงต่อ แตะทุกหน้าด้วยการหาค่าสูงสุด
+        with closing(get_db_connection(db_path)) as conn:
+            _, numbers = read_master_snapshot(conn, db_path)
+            rows = len(numbers)
+            numbers.max(initial=0)
+    elif case.startswith('export.'):
+        create_export_file(upload, case.split('.')[1])
+    elif case.startswith('lists.'):
+        combine_numbers(upload, master, case.split('.')[1])
+        rows = len(upload) + len(master)
+    elif case.startswith('memory.'):
+        # หน่วยความจำที่เบอร์รวมใช้อยู่หลังโหลด: set ของข้อความแบบเดิม เทียบกับ uint32 array (รวมข้อความที่สร้างระหว่างทาง)
+        tracemalloc.start()
+        held = set(decode_numbers(master)) if case == 'memory.set' else encode_numbers(decode_numbers(master))
+        memory_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        rows = len(held)
+    seconds = time.perf_counter() - start
+
+    for path in cleanup:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        shutil.rmtree(get_snapshot_dir(path), ignore_errors=True)
+    return {
+        'case': case,
+        'size': size,
+        'master_size': master_size,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds else 0.0,
+        'peak_rss_bytes': get_peak_rss_bytes(),
+        'memory_bytes': memory_bytes,
+        'stages': METRICS.snapshot()['stages'],
+    }
+
+def list_cases(size):
+    cases = ['normalize.batch', 'ingest.txt', 'ingest.csv']
+    if size <= SCALAR_MAX_ROWS:
+        cases.insert(0, 'normalize.scalar')
+    if size <= EXCEL_MAX_DATA_ROWS:
+        cases.append('ingest.xlsx')
+    cases += [
+        'legacy.read_combined_file', 'dedupe', 'search', 'store.insert', 'store.insert_list', 'store.lookup',
+        'store.lookup_bloom', 'store.load_master', 'store.load_snapshot', 'lists.union', 'lists.intersection', 'lists.difference', 'export.txt',
+        'memory.set', 'memory.uint32',
+    ]
+    if size <= EXCEL_MAX_DATA_ROWS:
+        cases.append('export.xlsx')
+    return cases
+
+def result_key(result):
+    return f"{result['case']}|{result['size']}|{result['master_size']}"
+
+def environment():
+    import pandas
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+def print_results(results, baseline=None, tolerance=0.2):
+    """
+    พิมพ์ตารางผล ถ้ามี baseline จะแสดงอัตราส่วนเวลาเทียบกับ baseline และคืนค่ารายการกรณีที่ช้าลงเกิน tolerance
+    """
+    regressions = []
+    header = f"{'case':<28}{'rows':>10}{'master':>10}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}"
+    if baseline is not None:
+        header += f"{'vs base':>10}"
+    print(header)
+    for result in results:
+        peak = result['peak_rss_bytes']
+        line = (
+            f"{result['case']:<28}{result['rows']:>10}{result['master_size']:>10}{result['seconds']:>10.3f}"
+            f"{result['rows_per_second']:>14,.0f}{(peak or 0) / (1024 * 1024):>10.1f}"
+        )
+        if baseline is not None:
+            base = baseline.get(result_key(result))
+            if base and base['seconds']:
+                ratio = result['seconds'] / base['seconds']
+                line += f"{ratio:>9.2f}x"
+                if ratio > 1 + tolerance:
+                    line += "  ช้าลง"
+                    regressions.append(result)
+            else:
+                line += f"{'-':>10}"
+        print(line)
+    return regressions
+
+def print_speedups(results):
+    """
+    พิมพ์อัตราเร็ว (แถว/วินาที) ของ normalize.batch เทียบกับ normalize.scalar ในชุดข้อมูลเดียวกัน
+    """
+    by_key = {result_key(result): result for result in results}
+    for result in results:
+        if result['case'] != 'normalize.batch':
+            continue
+        scalar = by_key.get(result_key(dict(result, case='normalize.scalar')))
+        if scalar and scalar['rows_per_second']:
+            print(
+                f"normalize ({result['size']} แถว): batch {result['rows_per_second']:,.0f} แถว/วินาที, "
+                f"scalar {scalar['rows_per_second']:,.0f} แถว/วินาที "
+                f"(เร็วกว่า {result['rows_per_second'] / scalar['rows_per_second']:.1f} เท่า)"
+            )
+
+def print_memory(results):
+    """
+    พิมพ์หน่วยความจำต่อ 1 ล้านเบอร์ของเบอร์รวมแต่ละแบบ (กรณี memory.*)
+    """
+    for result in results:
+        if result.get('memory_bytes') is not None and result['rows']:
+            per_million = result['memory_bytes'] / result['rows'] * 1000000 / (1024 * 1024)
+            print(f"{result['case']} (เบอร์รวม {result['rows']} เบอร์): {per_million:.1f} MB ต่อ 1 ล้านเบอร์")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="วัดประสิทธิภาพด้วยข้อมูลเบอร์ไทยสังเคราะห์")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"จำนวนแถวของไฟล์อัปโหลด คั่นด้วย , (ค่าเริ่มต้น {DEFAULT_SIZES})")
+    parser.add_argument('--master-sizes', default=DEFAULT_MASTER_SIZES, help=f"จำนวนเบอร์ในเบอร์รวม (ค่าเริ่มต้น {DEFAULT_MASTER_SIZES})")
+    parser.add_argument('--cases', help="รันเฉพาะกรณีที่ขึ้นต้นด้วยชื่อเหล่านี้ คั่นด้วย , เช่น ingest,export.txt")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'number_manager_bench'), help="โฟลเดอร์เก็บไฟล์ข้อมูลที่สร้าง")
+    parser.add_argument('--output', help="เขียนผลทั้งหมดเป็น JSON ลงไฟล์นี้")
+    parser.add_argument('--save-baseline', metavar='NAME', help=f"เก็บผลเป็น baseline ใน {BASELINE_DIR}")
+    parser.add_argument('--compare', metavar='NAME', help="เทียบกับ baseline ที่เก็บไว้")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="ช้าลงได้ไม่เกินสัดส่วนนี้ก่อนนับเป็น regression (ค่าเริ่มต้น 0.2)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    master_sizes = [int(size) for size in args.master_sizes.split(',')]
+    case_filters = args.cases.split(',') if args.cases else None
+    os.makedirs(args.workdir, exist_ok=True)
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for master_size in master_sizes:
+        for size in sizes:
+            print(f"# เตรียมข้อมูล: ไฟล์ {size} แถว, เบอร์รวม {master_size} เบอร์", file=sys.stderr)
+            paths = build_corpus(args.workdir, size, master_size, args.seed)
+            db_path = build_master_db(args.workdir, paths, master_size, args.seed)
+            paths['combined'] = build_combined_file(args.workdir, paths, master_size, args.seed)
+            for case in list_cases(size):
+                if case_filters and not any(case.startswith(prefix) for prefix in case_filters):
+                    continue
+                print(f"# {case} ({size} แถว, เบอร์รวม {master_size})", file=sys.stderr)
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    results.append(pool.submit(run_case, case, size, master_size, paths, db_path, args.workdir).result())
+
+    baseline = None
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f'{args.compare}.json'), encoding='utf-8') as f:
+            baseline = {result_key(result): result for result in json.load(f)['results']}
+    regressions = print_results(results, baseline, args.tolerance)
+    print_speedups(results)
+    print_memory(results)
+
+    report = {'environment': environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f'{args.save_baseline}.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if regressions:
+        print(f"ช้าลงเกิน {args.tolerance:.0%}: {len(regressions)} กรณี", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
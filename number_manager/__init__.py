@@ -0,0 +1,117 @@
+"""
+เครื่องมือจัดการเบอร์โทรศัพท์สำหรับ SMS Marketing (ส่วนที่ไม่ขึ้นกับ Streamlit)
+"""
+from .bloom import BLOOM_CAPACITY_GROWTH, BLOOM_FP_RATE, BLOOM_MIN_CAPACITY, BloomFilter
+from .cache import ExportCache, ParsedFileCache
+from .export import EXCEL_MAX_DATA_ROWS, EXPORT_FORMATS, EXPORT_MIME_TYPES, create_export_file
+from .ingest import (
+    CSV_SAMPLE_BYTES,
+    INGEST_CHUNK_ROWS,
+    INGEST_READ_BYTES,
+    NoPhoneColumnError,
+    choose_phone_column,
+    find_phone_column,
+    get_file_size,
+    hash_file_content,
+    iter_csv_phone_values,
+    iter_phone_number_chunks,
+    iter_text_lines,
+    iter_xlsx_phone_values,
+    read_phone_numbers,
+    read_phone_numbers_from_path,
+    sniff_csv_layout,
+)
+from .jobs import (
+    ACTIVE_JOB_STATUSES,
+    FINISHED_JOB_STATUSES,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_POLL_SECONDS,
+    JOB_PROCESSES,
+    JOB_PROGRESS_INTERVAL,
+    JOB_RETENTION_SECONDS,
+    JOB_STALE_SECONDS,
+    JOB_WORKERS,
+    JOBS_DB_FILE,
+    JOBS_DIR,
+    JobCancelled,
+    JobContext,
+    JobQueue,
+    create_job_handlers,
+    export_job,
+    file_error_message,
+    read_files_job,
+    read_job_file,
+    save_job,
+)
+from .master import (
+    SET_OPERATIONS,
+    MasterCache,
+    combine_numbers,
+    contains_numbers,
+    prefix_range,
+    search_numbers,
+    shared_master_cache,
+    split_numbers,
+)
+from .metrics import METRICS, Metrics, StageRecord, get_peak_rss_bytes
+from .normalize import (
+    NORMALIZER_VERSION,
+    decode_numbers,
+    encode_numbers,
+    normalize_phone_number,
+    normalize_phone_numbers,
+)
+from .snapshots import (
+    SNAPSHOT_COMPACT_ENTRIES,
+    SNAPSHOT_COMPACT_ROWS,
+    SNAPSHOT_DTYPE,
+    SNAPSHOT_KEEP,
+    get_snapshot_dir,
+    list_snapshot_versions,
+    load_snapshot,
+    merge_numbers,
+    pack_numbers,
+    prune_snapshots,
+    save_snapshot,
+    snapshot_path,
+    unpack_numbers,
+)
+from .store import (
+    COMBINED_NUMBERS_FILE,
+    MASTER_LOAD_ROWS,
+    NUMBERS_DB_FILE,
+    SQLITE_IN_BATCH_SIZE,
+    add_staged_numbers_to_list,
+    begin_write,
+    bump_list_version,
+    bump_store_version,
+    check_file_uploaded_before,
+    clear_numbers_store,
+    compact_master_snapshots,
+    count_numbers,
+    create_list,
+    delete_list,
+    ensure_list,
+    find_existing_numbers_in_store,
+    get_all_numbers_from_file,
+    get_bloom_path,
+    get_db_connection,
+    get_list_version,
+    get_lists,
+    get_restore_points,
+    get_snapshot_time,
+    get_store_version,
+    insert_list_numbers,
+    insert_numbers,
+    load_bloom_filter,
+    load_list_numbers,
+    load_master_numbers,
+    log_master_change,
+    migrate_numbers_from_file,
+    read_list_snapshot,
+    read_master_snapshot,
+    replay_master_log,
+    restore_master_version,
+    update_bloom_filter,
+    update_number_count,
+)
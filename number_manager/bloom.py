@@ -0,0 +1,115 @@
+"""
+Bloom filter ของเบอร์รวม (uint32 จาก encode_numbers) ใช้คัดเบอร์ที่ "ใหม่แน่นอน" ออกก่อนถามฐานข้อมูล
+ตอบว่า "ไม่มี" ได้แน่นอน ส่วน "อาจมี" ต้องตรวจกับฐานข้อมูลอีกครั้ง (ผิดได้ตามอัตรา false positive)
+"""
+import math
+import os
+import threading
+
+import numpy as np
+
+# อัตรา false positive ที่ต้องการ ความจุขั้นต่ำ และตัวคูณความจุเผื่อเบอร์ที่จะเพิ่มหลังสร้างใหม่
+BLOOM_FP_RATE = 0.01
+BLOOM_MIN_CAPACITY = 1000000
+BLOOM_CAPACITY_GROWTH = 2
+# จำนวนเบอร์ที่คำนวณตำแหน่งบิตต่อรอบ (จำกัดหน่วยความจำชั่วคราว)
+BLOOM_BATCH_SIZE = 262144
+
+_HASH_SEED = np.uint64(0x9E3779B97F4A7C15)
+
+def _mix64(values):
+    """splitmix64 finalizer แบบ vectorized (ค่าล้นวนรอบตามปกติของ uint64)"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+class BloomFilter:
+    """
+    Bloom filter ขนาดคงที่สำหรับ capacity เบอร์ที่อัตรา false positive fp_rate
+    ตำแหน่งบิต k ตำแหน่งได้จาก double hashing ของ splitmix64 ทำทีละชุดด้วย numpy
+    version คือเวอร์ชันของฐานข้อมูลที่ตัวกรองนี้ตรงกัน (ดู get_store_version)
+    """
+
+    def __init__(self, capacity, fp_rate=BLOOM_FP_RATE, bits=None, count=0, version=None):
+        self.capacity = int(capacity)
+        self.fp_rate = float(fp_rate)
+        bit_count = math.ceil(-self.capacity * math.log(self.fp_rate) / math.log(2) ** 2)
+        self.bit_count = max(64, -(-bit_count // 64) * 64)
+        self.hash_count = max(1, round(self.bit_count / self.capacity * math.log(2)))
+        self.bits = np.zeros(self.bit_count // 8, dtype=np.uint8) if bits is None else bits
+        self.count = int(count)
+        self.version = version
+
+    def _positions(self, encoded):
+        values = encoded.astype(np.uint64)
+        first = _mix64(values)
+        step = _mix64(values ^ _HASH_SEED) | np.uint64(1)
+        rounds = np.arange(self.hash_count, dtype=np.uint64)
+        return (first[:, None] + rounds[None, :] * step[:, None]) % np.uint64(self.bit_count)
+
+    def add(self, encoded):
+        """
+        เพิ่มเบอร์ (uint32 ที่ยังไม่มีในตัวกรอง) ลงตัวกรอง
+        """
+        encoded = np.asarray(encoded, dtype=np.uint32)
+        for start in range(0, len(encoded), BLOOM_BATCH_SIZE):
+            positions = self._positions(encoded[start:start + BLOOM_BATCH_SIZE]).ravel()
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.count += len(encoded)
+
+    def might_contain(self, encoded):
+        """
+        คืนค่า boolean mask: False คือไม่มีในตัวกรองแน่นอน True คืออาจมี
+        """
+        encoded = np.asarray(encoded, dtype=np.uint32)
+        mask = np.empty(len(encoded), dtype=bool)
+        for start in range(0, len(encoded), BLOOM_BATCH_SIZE):
+            positions = self._positions(encoded[start:start + BLOOM_BATCH_SIZE])
+            hits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+            mask[start:start + BLOOM_BATCH_SIZE] = hits.all(axis=1)
+        return mask
+
+    @property
+    def memory_bytes(self):
+        return self.bits.nbytes
+
+    def expected_fp_rate(self):
+        """
+        อัตรา false positive โดยประมาณจากจำนวนเบอร์ที่อยู่ในตัวกรองตอนนี้
+        """
+        return (1 - math.exp(-self.hash_count * self.count / self.bit_count)) ** self.hash_count
+
+    def save(self, path):
+        """
+        บันทึกตัวกรองลงไฟล์ .npz (เขียนไฟล์ชั่วคราวแล้วแทนที่ ผู้อ่านจึงไม่เห็นไฟล์ที่เขียนไม่เสร็จ)
+        """
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                np.savez(
+                    f, bits=self.bits,
+                    params=np.array([self.capacity, self.count, -1 if self.version is None else self.version], dtype=np.int64),
+                    fp_rate=np.array(self.fp_rate),
+                )
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """
+        โหลดตัวกรองจากไฟล์ คืนค่า None ถ้าไม่มีไฟล์หรือไฟล์เสีย
+        """
+        try:
+            with np.load(path) as data:
+                capacity, count, version = (int(value) for value in data['params'])
+                bloom = cls(capacity, float(data['fp_rate']), data['bits'], count, None if version < 0 else version)
+        except (OSError, ValueError, KeyError):
+            return None
+        if bloom.bits.nbytes * 8 != bloom.bit_count:
+            return None
+        return bloom
@@ -0,0 +1,135 @@
+"""
+แคชผลการอ่านเบอร์จากไฟล์ โดยใช้ content hash ของไฟล์และเวอร์ชันของตัวแปลงเบอร์เป็นกุญแจ
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .normalize import NORMALIZER_VERSION
+
+class ParsedFileCache:
+    """
+    แคช LRU ของเบอร์ที่อ่านได้จากแต่ละไฟล์ (uint32 array จาก encode_numbers) จำกัดขนาดในหน่วยความจำ
+    ถ้ากำหนด directory จะเก็บลงดิสก์ด้วย (ไฟล์ .npy) และลบไฟล์ที่ใช้นานที่สุดเมื่อเกิน max_disk_bytes
+    """
+
+    def __init__(self, max_bytes, directory=None, max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _key(self, content_hash):
+        return f'{content_hash}-v{NORMALIZER_VERSION}'
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npy')
+
+    def _remember(self, key, numbers):
+        if numbers.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = numbers
+            self._total_bytes += numbers.nbytes
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.nbytes
+
+    def get(self, content_hash):
+        """
+        คืนค่าเบอร์ของไฟล์ที่เคยอ่านแล้ว หรือ None ถ้าไม่มีในแคช
+        """
+        key = self._key(content_hash)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            numbers = np.load(path)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        numbers.flags.writeable = False
+        self._remember(key, numbers)
+        return numbers
+
+    def put(self, content_hash, numbers):
+        """
+        เก็บเบอร์ที่อ่านได้จากไฟล์ลงแคช
+        """
+        key = self._key(content_hash)
+        numbers = np.array(numbers, dtype=np.uint32)
+        numbers.flags.writeable = False
+        self._remember(key, numbers)
+        if not self.directory:
+            return
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                np.save(f, numbers)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self._prune_disk()
+
+    def _prune_disk(self):
+        if not self.max_disk_bytes:
+            return
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npy'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+class ExportCache:
+    """
+    แคช LRU ของไฟล์ส่งออกที่สร้างแล้ว (bytes) จำกัดขนาดรวม กุญแจควรรวมเวอร์ชันของข้อมูลและรูปแบบไฟล์
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, build):
+        """
+        คืนค่าไฟล์ที่สร้างไว้แล้ว ถ้ายังไม่มีจะเรียก build() แล้วจำผลไว้
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        data = build()
+        if len(data) <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = data
+                    self._total_bytes += len(data)
+                while self._total_bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._total_bytes -= len(evicted)
+        return data
@@ -0,0 +1,403 @@
+"""
+ใช้งานจากบรรทัดคำสั่งโดยไม่ต้องเปิด Streamlit (ใช้ฐานข้อมูลและตัวอ่านไฟล์ชุดเดียวกับหน้าเว็บ)
+
+    python -m number_manager ingest vendor_a.xlsx vendor_b.csv
+    python -m number_manager check vendor_c.txt
+    cat list.txt | python -m number_manager dedupe - -o new_numbers.xlsx
+    python -m number_manager export -o all_combined_numbers.txt
+    python -m number_manager search numbers_to_find.txt
+    python -m number_manager --list brand_a ingest vendor_d.csv
+    python -m number_manager combine brand_b difference brand_a --left-seen-days 30 -o reuse.txt
+    python -m number_manager history
+    python -m number_manager restore 41
+
+ไฟล์ชื่อ - คือ stdin (อ่านเป็นไฟล์ข้อความ บรรทัดละเบอร์)
+ข้อความสรุปออกทาง stderr ส่วนเบอร์ที่เป็นผลลัพธ์ออกทาง stdout หรือไฟล์ที่ระบุด้วย -o
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+import numpy as np
+
+from .bloom import BLOOM_FP_RATE
+from .export import EXPORT_FORMATS, create_export_file
+from .ingest import NoPhoneColumnError, hash_file_content, read_phone_numbers, read_phone_numbers_from_path
+from .master import SET_OPERATIONS, combine_numbers, search_numbers
+from .metrics import METRICS
+from .normalize import decode_numbers
+from .store import (
+    NUMBERS_DB_FILE,
+    check_file_uploaded_before,
+    count_numbers,
+    create_list,
+    delete_list,
+    find_existing_numbers_in_store,
+    get_db_connection,
+    get_lists,
+    get_restore_points,
+    insert_list_numbers,
+    load_bloom_filter,
+    load_list_numbers,
+    migrate_numbers_from_file,
+    read_master_snapshot,
+    restore_master_version,
+)
+
+# exit code ของทุกคำสั่ง (2 คือใช้คำสั่งผิด ตามค่ามาตรฐานของ argparse)
+EXIT_OK = 0
+EXIT_FILE_ERROR = 1
+EXIT_USAGE = 2
+EXIT_STORE_ERROR = 3
+
+STDIN_NAME = '-'
+
+def report(message):
+    print(message, file=sys.stderr)
+
+def report_file_error(filename, error):
+    """
+    แสดงข้อผิดพลาดของไฟล์ที่อ่านไม่สำเร็จ
+    """
+    if isinstance(error, NoPhoneColumnError):
+        report(f"ไฟล์ {filename}: ไม่พบคอลัมน์ที่เหมาะสมสำหรับเบอร์โทรศัพท์")
+    else:
+        report(f"ข้อผิดพลาดในการประมวลผลไฟล์ {filename}: {error}")
+
+def read_input_numbers(paths, db_path, jobs, skip_saved=False, list_name=None):
+    """
+    อ่านเบอร์จากไฟล์ทั้งหมด ข้ามไฟล์ที่เนื้อหาซ้ำกัน และถ้า skip_saved (ใช้กับ ingest เท่านั้น)
+    ข้ามไฟล์ที่เนื้อหาเคยถูกบันทึกแล้ว (เข้ารายการ list_name ถ้าระบุ) ด้วย
+    ถ้ามีหลายไฟล์และ jobs > 1 จะอ่านพร้อมกันใน process pool
+    คืนค่า (uint32 array ที่ไม่ซ้ำ, dict ของ content hash -> (ชื่อไฟล์, ขนาดไฟล์, จำนวนเบอร์), มีไฟล์ที่อ่านไม่สำเร็จหรือไม่)
+    """
+    merged = [np.empty(0, dtype=np.uint32)]
+    file_info = {}
+    pending_files = []
+    has_errors = False
+    for path in paths:
+        if path == STDIN_NAME:
+            pending_files.append((None, path))
+            continue
+        try:
+            with open(path, 'rb') as f:
+                content_hash = hash_file_content(f)
+            file_size = os.path.getsize(path)
+        except OSError as e:
+            report_file_error(path, e)
+            has_errors = True
+            continue
+        uploaded_before = check_file_uploaded_before(content_hash, db_path, list_name) if skip_saved else None
+        if uploaded_before:
+            saved_name, saved_count, saved_at = uploaded_before
+            report(f"ข้ามไฟล์ {path}: เนื้อหาเหมือนไฟล์ {saved_name} ที่บันทึกแล้วเมื่อ {saved_at} ({saved_count} เบอร์)")
+            continue
+        if content_hash in file_info:
+            report(f"ข้ามไฟล์ {path}: เนื้อหาเหมือนไฟล์ {file_info[content_hash][0]}")
+            continue
+        file_info[content_hash] = (os.path.basename(path), file_size, 0)
+        pending_files.append((content_hash, path))
+
+    def collect(content_hash, path, read):
+        nonlocal has_errors
+        try:
+            numbers = read()
+        except Exception as e:
+            report_file_error(path, e)
+            has_errors = True
+            file_info.pop(content_hash, None)
+            return
+        merged.append(numbers)
+        if content_hash is not None:
+            filename, file_size, _ = file_info[content_hash]
+            file_info[content_hash] = (filename, file_size, len(numbers))
+        report(f"{path}: พบเบอร์ {len(numbers)} เบอร์")
+
+    on_disk = [(content_hash, path) for content_hash, path in pending_files if path != STDIN_NAME]
+    if len(on_disk) > 1 and jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(on_disk))) as pool:
+            futures = [(content_hash, path, pool.submit(read_phone_numbers_from_path, path)) for content_hash, path in on_disk]
+            for content_hash, path, future in futures:
+                collect(content_hash, path, future.result)
+    else:
+        for content_hash, path in on_disk:
+            collect(content_hash, path, lambda: read_phone_numbers_from_path(path))
+    if len(on_disk) < len(pending_files):
+        collect(None, STDIN_NAME, lambda: read_phone_numbers(sys.stdin.buffer, 'stdin.txt'))
+
+    return np.unique(np.concatenate(merged)), file_info, has_errors
+
+def output_format(args):
+    """
+    รูปแบบไฟล์ผลลัพธ์: ตามที่ระบุด้วย --format หรือเดาจากนามสกุลของไฟล์ -o (ค่าเริ่มต้น txt)
+    """
+    if args.format:
+        return args.format
+    if args.output and args.output.lower().endswith('.xlsx'):
+        return 'xlsx'
+    return 'txt'
+
+def write_numbers(numbers, path, file_format):
+    """
+    เขียนเบอร์ลงไฟล์ด้วยรูปแบบเดียวกับปุ่มดาวน์โหลดบนหน้าเว็บ ถ้า path เป็น None หรือ - จะเขียนออก stdout
+    """
+    data = create_export_file(numbers, file_format)
+    if path is None or path == STDIN_NAME:
+        sys.stdout.buffer.write(data)
+        if file_format == 'txt' and data:
+            sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
+    else:
+        with open(path, 'wb') as f:
+            f.write(data)
+
+def get_list_count(args):
+    """
+    จำนวนเบอร์ในรายการ args.list หรือ None ถ้าไม่มีรายการนี้
+    """
+    counts = {name: count for name, count, _ in get_lists(args.db)}
+    return counts.get(args.list)
+
+def command_ingest(args):
+    encoded, file_info, has_errors = read_input_numbers(args.files, args.db, args.jobs, not args.force, args.list)
+    inserted, _, list_added, _ = insert_list_numbers(decode_numbers(encoded), args.list, file_info, args.db)
+    print(f"พบเบอร์ทั้งหมด {len(encoded)} เบอร์ บันทึกเบอร์ใหม่ {len(inserted)} เบอร์")
+    print(f"จำนวนเบอร์ในไฟล์รวมเบอร์: {count_numbers(args.db)} เบอร์")
+    if args.list is not None:
+        print(f"เพิ่มเข้ารายการ {args.list} {len(list_added)} เบอร์ (ทั้งหมด {get_list_count(args)} เบอร์)")
+    return EXIT_FILE_ERROR if has_errors else EXIT_OK
+
+def split_against_store(args):
+    """
+    อ่านไฟล์แล้วแยกเป็น (เบอร์ใหม่, เบอร์ที่มีอยู่แล้วในเบอร์รวม) โดยถามฐานข้อมูลตรง ไม่ต้องโหลดเบอร์รวมทั้งหมด
+    เบอร์ที่ Bloom filter บอกว่าใหม่แน่นอนจะไม่ถูกส่งไปถามฐานข้อมูล (ปิดได้ด้วย --no-bloom)
+    ถ้าระบุ --list จะเทียบกับเบอร์ของรายการนั้นแทน (โหลดเป็น uint32 เรียงลำดับแล้วค้นด้วย searchsorted)
+    """
+    encoded, _, has_errors = read_input_numbers(args.files, args.db, args.jobs, list_name=args.list)
+    if args.list is not None:
+        with closing(get_db_connection(args.db)) as conn:
+            found, not_found = search_numbers(encoded, load_list_numbers(conn, args.list))
+        return set(decode_numbers(not_found)), set(decode_numbers(found)), has_errors
+    numbers = decode_numbers(encoded)
+    bloom = None
+    if not args.no_bloom:
+        bloom = load_bloom_filter(args.db, args.bloom_fp_rate)
+        report(
+            f"Bloom filter: {bloom.count} เบอร์, {bloom.memory_bytes / (1024 * 1024):.1f} MB, "
+            f"อัตรา false positive โดยประมาณ {bloom.expected_fp_rate():.4%}"
+        )
+    existing = find_existing_numbers_in_store(numbers, args.db, bloom)
+    return set(numbers) - existing, existing, has_errors
+
+def command_check(args):
+    new_numbers, existing, has_errors = split_against_store(args)
+    print(f"พบเบอร์ทั้งหมด {len(new_numbers) + len(existing)} เบอร์")
+    print(f"เบอร์ใหม่: {len(new_numbers)} เบอร์")
+    print(f"เบอร์ที่ซ้ำกับไฟล์รวมเบอร์: {len(existing)} เบอร์")
+    return EXIT_FILE_ERROR if has_errors else EXIT_OK
+
+def command_dedupe(args):
+    new_numbers, existing, has_errors = split_against_store(args)
+    file_format = output_format(args)
+    write_numbers(new_numbers, args.output, file_format)
+    if args.duplicates_output:
+        write_numbers(existing, args.duplicates_output, file_format)
+    report(f"เบอร์ใหม่ {len(new_numbers)} เบอร์, เบอร์ที่ซ้ำกับไฟล์รวมเบอร์ {len(existing)} เบอร์")
+    return EXIT_FILE_ERROR if has_errors else EXIT_OK
+
+def command_search(args):
+    not_found, found, has_errors = split_against_store(args)
+    file_format = output_format(args)
+    write_numbers(found, args.output, file_format)
+    if args.not_found_output:
+        write_numbers(not_found, args.not_found_output, file_format)
+    report(f"พบเบอร์ {len(found)} เบอร์, ไม่พบเบอร์ {len(not_found)} เบอร์ ในไฟล์รวมเบอร์")
+    return EXIT_FILE_ERROR if has_errors else EXIT_OK
+
+def command_export(args):
+    with closing(get_db_connection(args.db)) as conn:
+        numbers = read_master_snapshot(conn, args.db)[1] if args.list is None else load_list_numbers(conn, args.list)
+    write_numbers(numbers, args.output, output_format(args))
+    report(f"ส่งออกเบอร์ทั้งหมด {len(numbers)} เบอร์")
+    return EXIT_OK
+
+def command_lists(args):
+    for name, count, created_at in get_lists(args.db):
+        print(f"{name}\t{count}\t{created_at}")
+    return EXIT_OK
+
+def command_create_list(args):
+    try:
+        create_list(args.name, args.db)
+    except ValueError:
+        report("ชื่อรายการต้องไม่ว่าง")
+        return EXIT_USAGE
+    report(f"สร้างรายการ {args.name} แล้ว")
+    return EXIT_OK
+
+def command_delete_list(args):
+    if not delete_list(args.name, args.db):
+        report(f"ไม่พบรายการ {args.name}")
+        return EXIT_USAGE
+    report(f"ลบรายการ {args.name} แล้ว (เบอร์ยังอยู่ในไฟล์รวมเบอร์)")
+    return EXIT_OK
+
+def command_combine(args):
+    known_lists = {name for name, _, _ in get_lists(args.db)}
+    missing = [name for name in (args.left, args.right) if name not in known_lists]
+    if missing:
+        report(f"ไม่พบรายการ {', '.join(missing)}")
+        return EXIT_USAGE
+    with closing(get_db_connection(args.db)) as conn:
+        left = load_list_numbers(conn, args.left, args.left_seen_days)
+        right = load_list_numbers(conn, args.right, args.right_seen_days)
+    numbers = combine_numbers(left, right, args.operation)
+    write_numbers(numbers, args.output, output_format(args))
+    report(f"{args.left} ({len(left)} เบอร์) {args.operation} {args.right} ({len(right)} เบอร์): {len(numbers)} เบอร์")
+    return EXIT_OK
+
+def command_history(args):
+    for version, created_at, op, rows in get_restore_points(args.db):
+        print(f"{version}\t{created_at}\t{op}\t{rows}")
+    return EXIT_OK
+
+def command_restore(args):
+    try:
+        version, count = restore_master_version(args.version, args.db)
+    except ValueError:
+        report(f"กู้คืนเวอร์ชัน {args.version} ไม่ได้ (ดูเวอร์ชันที่กู้คืนได้ด้วยคำสั่ง history)")
+        return EXIT_USAGE
+    report(f"กู้คืนเบอร์รวมเป็นเวอร์ชัน {args.version} แล้ว: {count} เบอร์ (เวอร์ชันใหม่ {version})")
+    return EXIT_OK
+
+def days(value):
+    count = float(value)
+    if count < 0:
+        raise argparse.ArgumentTypeError("ต้องไม่ติดลบ")
+    return count
+
+def fp_rate(value):
+    rate = float(value)
+    if not 0 < rate < 1:
+        raise argparse.ArgumentTypeError("ต้องอยู่ระหว่าง 0 ถึง 1")
+    return rate
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m number_manager', description="จัดการเบอร์โทรศัพท์สำหรับ SMS Marketing")
+    parser.add_argument('--db', default=NUMBERS_DB_FILE, help=f"ไฟล์ฐานข้อมูลรวมเบอร์ (ค่าเริ่มต้น {NUMBERS_DB_FILE})")
+    parser.add_argument(
+        '--bloom-fp-rate', type=fp_rate, default=BLOOM_FP_RATE,
+        help=f"อัตรา false positive ของ Bloom filter (ค่าเริ่มต้น {BLOOM_FP_RATE}) ค่าต่ำใช้หน่วยความจำมากขึ้น",
+    )
+    parser.add_argument('--no-bloom', action='store_true', help="ไม่ใช้ Bloom filter ถามฐานข้อมูลทุกเบอร์")
+    parser.add_argument(
+        '--list', metavar='NAME',
+        help="ทำงานกับรายการ/แคมเปญนี้แทนเบอร์รวม: ingest เพิ่มเบอร์เข้ารายการ (และเบอร์รวม) ส่วน check, dedupe, "
+             "search และ export เทียบหรือส่งออกเฉพาะเบอร์ของรายการ",
+    )
+    parser.add_argument(
+        '--metrics',
+        help="เขียนเวลาและปริมาณงานของแต่ละขั้นตอนลงไฟล์นี้เมื่อจบคำสั่ง (.json เป็น JSON นอกนั้นเป็นข้อความแบบ Prometheus)",
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_input_arguments(subparser, default_stdin=False):
+        subparser.add_argument(
+            'files', nargs='*' if default_stdin else '+', default=[STDIN_NAME],
+            help="ไฟล์เบอร์ (.txt, .xlsx, .csv หรือ .tsv) ใช้ - แทน stdin",
+        )
+        subparser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help="จำนวนโปรเซสที่อ่านไฟล์พร้อมกัน")
+
+    def add_output_arguments(subparser):
+        subparser.add_argument('-o', '--output', help="ไฟล์ผลลัพธ์ (ค่าเริ่มต้นคือ stdout)")
+        subparser.add_argument('--format', choices=EXPORT_FORMATS, help="รูปแบบไฟล์ผลลัพธ์ (ค่าเริ่มต้นเดาจากนามสกุลของ -o)")
+
+    ingest = subparsers.add_parser('ingest', help="บันทึกเบอร์ใหม่จากไฟล์ลงไฟล์รวมเบอร์")
+    add_input_arguments(ingest)
+    ingest.add_argument('--force', action='store_true', help="บันทึกไฟล์ที่เนื้อหาเคยถูกบันทึกแล้วด้วย")
+    ingest.set_defaults(handler=command_ingest)
+
+    check = subparsers.add_parser('check', help="ตรวจสอบเบอร์ซ้ำกับไฟล์รวมเบอร์ (ไม่บันทึก)")
+    add_input_arguments(check)
+    check.set_defaults(handler=command_check)
+
+    dedupe = subparsers.add_parser('dedupe', help="ส่งออกเฉพาะเบอร์ที่ยังไม่มีในไฟล์รวมเบอร์ (ไม่บันทึก)")
+    add_input_arguments(dedupe)
+    add_output_arguments(dedupe)
+    dedupe.add_argument('--duplicates-output', help="ไฟล์สำหรับเบอร์ที่ซ้ำกับไฟล์รวมเบอร์")
+    dedupe.set_defaults(handler=command_dedupe)
+
+    export = subparsers.add_parser('export', help="ส่งออกเบอร์ทั้งหมดในไฟล์รวมเบอร์")
+    add_output_arguments(export)
+    export.set_defaults(handler=command_export)
+
+    search = subparsers.add_parser('search', help="ค้นหาเบอร์ในไฟล์รวมเบอร์ ส่งออกเบอร์ที่พบ")
+    add_input_arguments(search, default_stdin=True)
+    add_output_arguments(search)
+    search.add_argument('--not-found-output', help="ไฟล์สำหรับเบอร์ที่ไม่พบ")
+    search.set_defaults(handler=command_search)
+
+    lists = subparsers.add_parser('lists', help="แสดงรายการ/แคมเปญทั้งหมด (ชื่อ จำนวนเบอร์ เวลาที่สร้าง)")
+    lists.set_defaults(handler=command_lists)
+
+    create = subparsers.add_parser('create-list', help="สร้างรายการ/แคมเปญ")
+    create.add_argument('name')
+    create.set_defaults(handler=command_create_list)
+
+    delete = subparsers.add_parser('delete-list', help="ลบรายการ/แคมเปญ (เบอร์ยังอยู่ในไฟล์รวมเบอร์)")
+    delete.add_argument('name')
+    delete.set_defaults(handler=command_delete_list)
+
+    combine = subparsers.add_parser(
+        'combine', help="รวม (union) ตัดกัน (intersection) หรือลบ (difference) เบอร์ของสองรายการ",
+        description="difference คือเบอร์ที่อยู่ในรายการซ้ายแต่ไม่อยู่ในรายการขวา",
+    )
+    combine.add_argument('left')
+    combine.add_argument('operation', choices=SET_OPERATIONS)
+    combine.add_argument('right')
+    combine.add_argument('--left-seen-days', type=days, help="ใช้เฉพาะเบอร์ของรายการซ้ายที่บันทึกล่าสุดภายในจำนวนวันนี้")
+    combine.add_argument('--right-seen-days', type=days, help="ใช้เฉพาะเบอร์ของรายการขวาที่บันทึกล่าสุดภายในจำนวนวันนี้")
+    add_output_arguments(combine)
+    combine.set_defaults(handler=command_combine)
+
+    history = subparsers.add_parser(
+        'history', help="แสดงเวอร์ชันก่อนหน้าของเบอร์รวมที่กู้คืนได้ (เวอร์ชัน เวลา ชนิดการเปลี่ยนแปลง จำนวนเบอร์ที่เพิ่ม)",
+    )
+    history.set_defaults(handler=command_history)
+
+    restore = subparsers.add_parser(
+        'restore', help="กู้คืนเบอร์รวมกลับเป็นเวอร์ชันก่อนหน้า (ไม่ต้องนำเข้าไฟล์ใหม่ กู้คืนกลับได้อีก)",
+    )
+    restore.add_argument('version', type=int)
+    restore.set_defaults(handler=command_restore)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        migrate_numbers_from_file(args.db)
+        with METRICS.stage(f'cli.{args.command}'):
+            exit_code = args.handler(args)
+    except sqlite3.Error as e:
+        report(f"เกิดข้อผิดพลาดของฐานข้อมูล: {e}")
+        exit_code = EXIT_STORE_ERROR
+    except OSError as e:
+        report(f"อ่านหรือเขียนไฟล์ไม่สำเร็จ: {e}")
+        exit_code = EXIT_FILE_ERROR
+    if args.metrics:
+        write_metrics(args.metrics)
+    return exit_code
+
+def write_metrics(path):
+    """
+    เขียนสถิติของการรันครั้งนี้ลงไฟล์ (เช่นให้ textfile collector ของ node_exporter อ่าน)
+    """
+    text = METRICS.to_json() if path.lower().endswith('.json') else METRICS.to_prometheus()
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    except OSError as e:
+        report(f"เขียนไฟล์สถิติไม่สำเร็จ: {e}")
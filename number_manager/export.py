@@ -0,0 +1,46 @@
+"""
+สร้างไฟล์ส่งออกเบอร์ (.txt / .xlsx)
+"""
+import io
+
+import numpy as np
+import xlsxwriter
+
+from .metrics import METRICS
+from .normalize import decode_numbers
+
+# จำนวนแถวข้อมูลสูงสุดต่อชีตของ Excel (1,048,576 แถวรวมหัวตาราง)
+EXCEL_MAX_DATA_ROWS = 1048575
+EXPORT_FORMATS = ('txt', 'xlsx')
+EXPORT_MIME_TYPES = {
+    'txt': 'text/plain',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+def create_export_file(numbers, file_format):
+    """
+    สร้างไฟล์ส่งออกจากชุดเบอร์ (set ของข้อความ หรือ uint32 array จาก encode_numbers)
+    xlsx เขียนแบบสตรีมด้วย xlsxwriter (constant_memory) และแบ่งชีตอัตโนมัติเมื่อเกินจำนวนแถวของ Excel
+    """
+    with METRICS.stage(f'export.{file_format}') as stage:
+        data = _build_export_file(numbers, file_format)
+        stage.add(rows=len(numbers), nbytes=len(data) if data else 0)
+    return data
+
+def _build_export_file(numbers, file_format):
+    if isinstance(numbers, np.ndarray):
+        numbers = decode_numbers(np.sort(numbers))
+    else:
+        numbers = sorted(numbers)
+    if file_format == 'txt':
+        return "\n".join(numbers).encode('utf-8')
+    elif file_format == 'xlsx':
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        for sheet_number, start in enumerate(range(0, max(len(numbers), 1), EXCEL_MAX_DATA_ROWS), start=1):
+            worksheet = workbook.add_worksheet(f"Sheet{sheet_number}")
+            worksheet.write_string(0, 0, "Phone Number")
+            for row, number in enumerate(numbers[start:start + EXCEL_MAX_DATA_ROWS], start=1):
+                worksheet.write_string(row, 0, number)
+        workbook.close()
+        return output.getvalue()
@@ -0,0 +1,233 @@
+"""
+อ่านเบอร์โทรศัพท์จากไฟล์ (.txt / .xlsx / .csv / .tsv) แบบสตรีมทีละก้อน
+"""
+import codecs
+import csv
+import hashlib
+import io
+import os
+
+import openpyxl
+import pandas as pd
+
+import numpy as np
+
+from .metrics import METRICS
+from .normalize import encode_numbers, normalize_phone_number, normalize_phone_numbers
+
+# ขนาดที่อ่านจากไฟล์ข้อความต่อครั้ง และจำนวนเซลล์ xlsx ที่แปลงต่อหนึ่งก้อน
+INGEST_READ_BYTES = 1024 * 1024
+INGEST_CHUNK_ROWS = 100000
+# ขนาดตัวอย่างจากต้นไฟล์ csv ที่ใช้เดาตัวคั่นและคอลัมน์เบอร์โทรศัพท์
+CSV_SAMPLE_BYTES = 64 * 1024
+
+class NoPhoneColumnError(ValueError):
+    """ไม่พบคอลัมน์ที่เหมาะสมสำหรับเบอร์โทรศัพท์"""
+
+# อักขระขึ้นบรรทัดใหม่ทั้งหมดที่ str.splitlines ใช้แบ่งบรรทัด
+_LINE_BREAKS = ('\n', '\r', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e', '\x85', '\u2028', '\u2029')
+
+def get_file_size(fileobj):
+    """
+    ขนาดไฟล์เป็นไบต์ โดยไม่เปลี่ยนตำแหน่งการอ่าน
+    """
+    position = fileobj.tell()
+    size = fileobj.seek(0, io.SEEK_END)
+    fileobj.seek(position)
+    return size
+
+def hash_file_content(fileobj):
+    """
+    คำนวณ SHA-256 ของเนื้อหาไฟล์ทีละบล็อก (ไม่โหลดทั้งไฟล์) ใช้เป็นกุญแจตรวจไฟล์ซ้ำแทนชื่อไฟล์
+    """
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    with METRICS.stage('hash') as stage:
+        for block in iter(lambda: fileobj.read(INGEST_READ_BYTES), b''):
+            digest.update(block)
+            stage.add(nbytes=len(block))
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+def iter_text_lines(fileobj):
+    """
+    อ่านไฟล์ข้อความทีละบล็อกและถอดรหัส UTF-8 แบบต่อเนื่อง ไม่โหลดทั้งไฟล์เข้าหน่วยความจำ
+    คืนค่าทีละ (list ของบรรทัด, จำนวนไบต์ที่อ่านแล้ว)
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    bytes_read = 0
+    while True:
+        block = fileobj.read(INGEST_READ_BYTES)
+        bytes_read += len(block)
+        text = pending + decoder.decode(block, final=not block)
+        lines = text.splitlines()
+        # บรรทัดสุดท้ายที่ยังไม่จบ เก็บไว้ต่อกับบล็อกถัดไป
+        pending = lines.pop() if block and lines and not text.endswith(_LINE_BREAKS) else ''
+        if lines:
+            yield lines, bytes_read
+        if not block:
+            break
+
+def find_phone_column(header):
+    """
+    หาตำแหน่งคอลัมน์ที่น่าจะเป็นเบอร์โทรศัพท์จากหัวตาราง ถ้าไม่พบใช้คอลัมน์แรก
+    """
+    for index, name in enumerate(header):
+        if 'phone' in str(name).lower() or 'number' in str(name).lower():
+            return index
+    return 0
+
+def choose_phone_column(header, sample_rows):
+    """
+    เลือกคอลัมน์เบอร์โทรศัพท์จากหัวตารางและข้อมูลตัวอย่าง คอลัมน์ที่แปลงเป็นเบอร์ได้มากที่สุดชนะ
+    ถ้าเท่ากันใช้คอลัมน์ที่ find_phone_column เลือก ถ้าไม่มีคอลัมน์ใดเป็นเบอร์เลยใช้ find_phone_column
+    """
+    named_column = find_phone_column(header)
+    width = max([len(header)] + [len(row) for row in sample_rows])
+    hits = []
+    for column in range(width):
+        values = [row[column] if column < len(row) else None for row in sample_rows]
+        hits.append(int(normalize_phone_numbers(values).notna().sum()))
+    if not hits or max(hits) == 0:
+        return named_column
+    return max(range(width), key=lambda column: (hits[column], column == named_column, -column))
+
+def sniff_csv_layout(fileobj, filename):
+    """
+    อ่านตัวอย่างจากต้นไฟล์ csv/tsv เพื่อหา (ตัวคั่น, มีหัวตารางหรือไม่, ตำแหน่งคอลัมน์เบอร์โทรศัพท์)
+    """
+    fileobj.seek(0)
+    sample = fileobj.read(CSV_SAMPLE_BYTES)
+    is_truncated = bool(fileobj.read(1))
+    fileobj.seek(0)
+    text = sample.decode('utf-8-sig', errors='replace')
+    if is_truncated:
+        # ตัดบรรทัดสุดท้ายที่อาจถูกตัดกลางทิ้ง
+        text = text[:max(text.rfind('\n'), 0)]
+
+    if filename.lower().endswith('.tsv'):
+        delimiter = '\t'
+    else:
+        try:
+            delimiter = csv.Sniffer().sniff(text, delimiters=',;\t|').delimiter
+        except csv.Error:
+            delimiter = ','
+
+    rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if any(cell.strip() for cell in row)]
+    if not rows:
+        raise NoPhoneColumnError()
+    # ถ้าแถวแรกมีเบอร์โทรศัพท์อยู่แล้ว แสดงว่าไฟล์ไม่มีหัวตาราง
+    has_header = not any(normalize_phone_number(cell) for cell in rows[0])
+    header, sample_rows = (rows[0], rows[1:]) if has_header else ([], rows)
+    return delimiter, has_header, choose_phone_column(header, sample_rows)
+
+def iter_csv_phone_values(fileobj, filename):
+    """
+    อ่านเฉพาะคอลัมน์เบอร์โทรศัพท์จากไฟล์ csv/tsv ด้วย C parser ของ pandas ทีละก้อน
+    คืนค่าทีละ (Series ของข้อความในคอลัมน์, สัดส่วนความคืบหน้า)
+    """
+    delimiter, has_header, column = sniff_csv_layout(fileobj, filename)
+    total_bytes = get_file_size(fileobj)
+    reader = pd.read_csv(
+        fileobj,
+        sep=delimiter,
+        header=0 if has_header else None,
+        index_col=False,
+        usecols=[column],
+        dtype=str,
+        na_filter=False,
+        encoding='utf-8-sig',
+        encoding_errors='replace',
+        engine='c',
+        chunksize=INGEST_CHUNK_ROWS,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk.iloc[:, 0], fileobj.tell() / total_bytes if total_bytes else None
+
+def iter_xlsx_phone_values(fileobj):
+    """
+    อ่านเฉพาะคอลัมน์เบอร์โทรศัพท์จากชีตแรกของไฟล์ xlsx ด้วย openpyxl แบบ read-only
+    คืนค่าทีละ (list ของค่าในเซลล์, สัดส่วนความคืบหน้า หรือ None ถ้าไม่ทราบจำนวนแถว)
+    """
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        # หัวตารางคือแถวแรกที่มีข้อมูล เหมือนกับ pd.read_excel
+        header_row = 0
+        for header_row, header in enumerate(rows, start=1):
+            if any(value is not None for value in header):
+                break
+        else:
+            raise NoPhoneColumnError()
+        column = find_phone_column(header) + 1
+        total_rows = sheet.max_row
+
+        values = []
+        row_number = header_row
+        for row_number, (value,) in enumerate(
+            sheet.iter_rows(min_row=header_row + 1, min_col=column, max_col=column, values_only=True),
+            start=header_row + 1,
+        ):
+            values.append(value)
+            if len(values) >= INGEST_CHUNK_ROWS:
+                yield values, row_number / total_rows if total_rows else None
+                values = []
+        if values:
+            yield values, row_number / total_rows if total_rows else None
+    finally:
+        workbook.close()
+
+def iter_phone_number_chunks(fileobj, filename=None):
+    """
+    อ่านและแปลงเบอร์จากไฟล์เป็นก้อน ๆ ขนาดคงที่ หน่วยความจำไม่ขึ้นกับขนาดไฟล์
+    คืนค่าทีละ (set ของเบอร์ที่แปลงแล้ว, สัดส่วนความคืบหน้า 0-1 หรือ None)
+    """
+    filename = filename or fileobj.name
+    seekable = fileobj.seekable()
+    if seekable:
+        fileobj.seek(0)
+    extension = os.path.splitext(filename)[1].lower()
+    # สตรีมที่ย้อนกลับไม่ได้ (เช่น stdin) อ่านได้เฉพาะไฟล์ข้อความและไม่มีความคืบหน้า
+    total_bytes = get_file_size(fileobj) if seekable else 0
+    bytes_read = total_bytes
+    if extension == '.txt':
+        def text_chunks():
+            nonlocal bytes_read
+            for lines, bytes_read in iter_text_lines(fileobj):
+                yield lines, bytes_read / total_bytes if total_bytes else None
+        chunks = text_chunks()
+    elif extension == '.xlsx':
+        chunks = ((pd.Series(values), progress) for values, progress in iter_xlsx_phone_values(fileobj))
+    elif extension in ('.csv', '.tsv'):
+        chunks = iter_csv_phone_values(fileobj, filename)
+    else:
+        raise ValueError(f'unsupported file type: {filename}')
+
+    read_stage = f'read{extension}'
+    rows = 0
+    for values, progress in METRICS.timed(read_stage, chunks):
+        rows += len(values)
+        with METRICS.stage('normalize') as stage:
+            numbers = set(normalize_phone_numbers(values).dropna())
+            stage.add(rows=len(values))
+        yield numbers, progress
+    METRICS.record(read_stage, rows=rows, nbytes=bytes_read, calls=0)
+
+def read_phone_numbers(fileobj, filename=None):
+    """
+    อ่านเบอร์ทั้งหมดจากไฟล์ คืนค่าเป็น uint32 array ที่ไม่ซ้ำและเรียงลำดับ (ดู encode_numbers)
+    """
+    chunks = [np.empty(0, dtype=np.uint32)]
+    for numbers, _ in iter_phone_number_chunks(fileobj, filename):
+        chunks.append(encode_numbers(numbers, skip_invalid=True))
+    return np.unique(np.concatenate(chunks))
+
+def read_phone_numbers_from_path(path):
+    """
+    อ่านเบอร์จากไฟล์บนดิสก์ ใช้เป็นงานของ worker ใน process pool (ส่งแค่ชื่อไฟล์ข้ามโปรเซส)
+    """
+    with open(path, 'rb') as f:
+        return read_phone_numbers(f, path)
@@ -0,0 +1,528 @@
+"""
+คิวงานเบื้องหลัง: งานที่ใช้เวลานาน (ประมวลผลไฟล์ ตรวจสอบ บันทึก ส่งออก) ทำใน worker thread แยกจากเธรดของหน้าเว็บ
+สถานะของงานเก็บในฐานข้อมูล SQLite แยกจากฐานข้อมูลรวมเบอร์ (การรายงานความคืบหน้าจึงไม่ต้องรอการบันทึกเบอร์)
+ผลลัพธ์เก็บเป็นไฟล์ในโฟลเดอร์ของงาน หน้าเว็บที่รันใหม่หรือเชื่อมต่อใหม่จึงอ่านผลเดิมได้
+"""
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from functools import partial
+
+import numpy as np
+
+from .export import create_export_file
+from .ingest import NoPhoneColumnError, hash_file_content, iter_phone_number_chunks, read_phone_numbers_from_path
+from .master import search_numbers, shared_master_cache
+from .metrics import METRICS
+from .normalize import decode_numbers, encode_numbers
+from .store import NUMBERS_DB_FILE, check_file_uploaded_before, insert_list_numbers
+
+# ฐานข้อมูลสถานะของงาน และโฟลเดอร์เก็บไฟล์ที่ส่งมากับงานและผลลัพธ์ (โฟลเดอร์ละงาน)
+JOBS_DB_FILE = 'sms_jobs.db'
+JOBS_DIR = '.jobs'
+# จำนวนงานที่ทำพร้อมกัน
+JOB_WORKERS = 2
+# ขนาดของ process pool ที่ทุกงานใช้ร่วมกันสำหรับอ่านหลายไฟล์พร้อมกัน (ทั้งคิวไม่เกินจำนวน CPU)
+JOB_PROCESSES = os.cpu_count() or 1
+# worker ตรวจหางานใหม่อย่างน้อยทุกกี่วินาที (งานที่ส่งจากโปรเซสเดียวกันจะปลุก worker ทันที)
+JOB_POLL_SECONDS = 1.0
+# งานที่ทำอยู่บันทึกว่ายังทำงานอยู่ทุกกี่วินาที และถ้าขาดหายเกินกี่วินาทีถือว่าโปรเซสที่ทำงานนั้นตายไปแล้ว
+JOB_HEARTBEAT_SECONDS = 5
+JOB_STALE_SECONDS = 60
+# เขียนความคืบหน้าลงฐานข้อมูลถี่ที่สุดทุกกี่วินาที
+JOB_PROGRESS_INTERVAL = 0.5
+# ลบงานที่จบแล้ว (พร้อมไฟล์ผลลัพธ์) เมื่อเก่ากว่านี้
+JOB_RETENTION_SECONDS = 3 * 24 * 60 * 60
+
+ACTIVE_JOB_STATUSES = ('queued', 'running')
+FINISHED_JOB_STATUSES = ('done', 'failed', 'cancelled')
+
+class JobCancelled(Exception):
+    """ผู้ใช้ยกเลิกงานระหว่างทำ (ส่งออกมาจาก JobContext.progress)"""
+
+class JobContext:
+    """
+    สิ่งที่ handler ของงานได้รับ: พารามิเตอร์ ไฟล์ที่ส่งมากับงาน โฟลเดอร์ผลลัพธ์ และการรายงานความคืบหน้า
+    """
+
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.id = job['id']
+        self.kind = job['kind']
+        self.owner = job['owner']
+        self.params = job['params']
+        self.directory = queue.job_directory(self.id)
+        self._last_update = 0.0
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    @property
+    def inputs(self):
+        """
+        ไฟล์ที่ส่งมากับงาน เป็น list ของ (ชื่อไฟล์เดิม, path ของไฟล์ในโฟลเดอร์ของงาน)
+        """
+        return [(name, self.path(stored_name)) for name, stored_name in self.params.get('inputs', [])]
+
+    def progress(self, fraction, message=None):
+        """
+        บันทึกความคืบหน้า (0-1) และข้อความ ถ้าผู้ใช้ขอยกเลิกงานจะส่ง JobCancelled ออกมา
+        เขียนลงฐานข้อมูลไม่ถี่กว่าทุก JOB_PROGRESS_INTERVAL วินาที ยกเว้นเมื่อมีข้อความใหม่
+        """
+        now = time.monotonic()
+        if message is None and now - self._last_update < JOB_PROGRESS_INTERVAL:
+            return
+        self._last_update = now
+        if self.queue.update_progress(self.id, fraction, message):
+            raise JobCancelled()
+
+class JobQueue:
+    """
+    คิวงานที่เก็บสถานะใน SQLite และทำงานด้วย worker thread จำนวน workers
+    handlers คือ dict ของชนิดงาน -> ฟังก์ชันที่รับ JobContext และคืนค่าผลลัพธ์ (dict ที่แปลงเป็น JSON ได้)
+    งานถัดไปเลือกจากเจ้าของ (owner) ที่มีงานกำลังทำน้อยที่สุดและได้เริ่มงานล่าสุดนานที่สุดก่อน
+    ผู้ใช้ที่ส่งงานไว้มากจึงไม่ทำให้งานของผู้ใช้อื่นต้องรอจนหมดคิว
+    หลายโปรเซสใช้ฐานข้อมูลงานเดียวกันได้ (การรับงานทำใน transaction ที่จองสิทธิ์เขียน)
+    งานที่อ่านหลายไฟล์ใช้ process pool ชุดเดียวของคิว (ดู process_pool) ขนาด processes
+    """
+
+    def __init__(self, handlers, db_path=JOBS_DB_FILE, directory=JOBS_DIR, workers=JOB_WORKERS, processes=JOB_PROCESSES):
+        self.handlers = handlers
+        self.db_path = db_path
+        self.directory = directory
+        self.workers = workers
+        self.processes = processes
+        self._pool = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._running = set()
+        self._threads = []
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()):
+            pass
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id TEXT PRIMARY KEY, kind TEXT NOT NULL, owner TEXT NOT NULL, status TEXT NOT NULL, '
+            'params TEXT NOT NULL, result TEXT, error TEXT, progress REAL NOT NULL DEFAULT 0, message TEXT, '
+            'cancel_requested INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, started_at REAL, '
+            'finished_at REAL, heartbeat_at REAL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, owner)')
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, created_at)')
+        return conn
+
+    def job_directory(self, job_id):
+        return os.path.join(self.directory, job_id)
+
+    def process_pool(self):
+        """
+        process pool ที่ทุกงานในคิวใช้ร่วมกัน (สร้างครั้งแรกที่เรียก) หรือ None ถ้า processes ไม่เกิน 1
+        ใช้ spawn เพราะโปรเซสนี้มีหลายเธรด (fork ไม่ปลอดภัย) โปรเซสลูกจึงเริ่มและ import ครั้งเดียวแล้วใช้ซ้ำทุกงาน
+        """
+        if self.processes <= 1:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def discard_process_pool(self, pool):
+        """
+        ทิ้ง pool ที่เสีย (เช่นโปรเซสลูกตาย) งานถัดไปจะได้ pool ใหม่
+        """
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """
+        เริ่ม worker thread (daemon) และเธรด heartbeat ถ้ายังไม่ได้เริ่ม
+        """
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            self.mark_stale_jobs()
+            self.cleanup()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker_loop, name=f'job-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            thread = threading.Thread(target=self._heartbeat_loop, name='job-heartbeat', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, wait=True):
+        """
+        หยุดรับงานใหม่ งานที่กำลังทำจะทำต่อจนเสร็จ (ถ้า wait จะรอจนเสร็จ)
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        if wait:
+            for thread in threads:
+                thread.join()
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+    def submit(self, kind, owner, params=None, inputs=()):
+        """
+        ส่งงานชนิด kind ของ owner เข้าคิว inputs คือ (ชื่อไฟล์, bytes) ของไฟล์ที่งานต้องใช้
+        (เขียนลงโฟลเดอร์ของงานก่อนเข้าคิว) คืนค่า id ของงาน
+        """
+        if kind not in self.handlers:
+            raise ValueError(f'unknown job kind: {kind}')
+        job_id = uuid.uuid4().hex
+        directory = self.job_directory(job_id)
+        os.makedirs(directory)
+        stored = []
+        for index, (name, data) in enumerate(inputs):
+            stored_name = f'input-{index}{os.path.splitext(name)[1].lower()}'
+            with open(os.path.join(directory, stored_name), 'wb') as f:
+                f.write(data)
+            stored.append([name, stored_name])
+        params = dict(params or {}, inputs=stored)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, owner, status, params, created_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, owner, json.dumps(params, ensure_ascii=False), time.time()),
+            )
+        self._wakeup.set()
+        return job_id
+
+    def _row_to_job(self, row):
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def get_job(self, job_id):
+        """
+        คืนค่างานเป็น dict (params และ result แปลงจาก JSON แล้ว) หรือ None ถ้าไม่มีงานนี้
+        """
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, owner=None, limit=20):
+        """
+        งานล่าสุดไม่เกิน limit งาน (ของ owner ถ้าระบุ) เรียงจากใหม่ไปเก่า
+        """
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            if owner is None:
+                rows = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,))
+            else:
+                rows = conn.execute('SELECT * FROM jobs WHERE owner = ? ORDER BY created_at DESC LIMIT ?', (owner, limit))
+            return [self._row_to_job(row) for row in rows]
+
+    def queue_position(self, job_id):
+        """
+        จำนวนงานที่รอคิวอยู่ก่อนงานนี้ (นับตามเวลาที่ส่ง) หรือ None ถ้างานไม่ได้รอคิวอยู่
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT created_at FROM jobs WHERE id = ? AND status = 'queued'", (job_id,)).fetchone()
+            if row is None:
+                return None
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", row).fetchone()[0]
+
+    def cancel(self, job_id):
+        """
+        ยกเลิกงาน: งานที่รอคิวถูกยกเลิกทันที งานที่กำลังทำจะหยุดเมื่อรายงานความคืบหน้าครั้งถัดไป
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'", (job_id,))
+
+    def update_progress(self, job_id, fraction, message=None):
+        """
+        บันทึกความคืบหน้าของงาน คืนค่า True ถ้าผู้ใช้ขอยกเลิกงานนี้แล้ว
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'UPDATE jobs SET progress = ?, message = COALESCE(?, message), heartbeat_at = ? WHERE id = ?',
+                (min(max(fraction, 0.0), 1.0), message, time.time(), job_id),
+            )
+            row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def mark_stale_jobs(self):
+        """
+        งานที่ขึ้นว่ากำลังทำแต่ไม่มี heartbeat เกิน JOB_STALE_SECONDS (เช่นเซิร์ฟเวอร์ถูกปิดกลางทาง) ถือว่าล้มเหลว
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'interrupted', finished_at = ? "
+                "WHERE status = 'running' AND heartbeat_at < ?",
+                (now, now - JOB_STALE_SECONDS),
+            )
+
+    def cleanup(self, max_age_seconds=JOB_RETENTION_SECONDS):
+        """
+        ลบงานที่จบแล้วและเก่ากว่า max_age_seconds พร้อมโฟลเดอร์ของงาน
+        """
+        placeholders = ','.join('?' * len(FINISHED_JOB_STATUSES))
+        with closing(self._connect()) as conn, conn:
+            job_ids = [row[0] for row in conn.execute(
+                f'SELECT id FROM jobs WHERE status IN ({placeholders}) AND created_at < ?',
+                (*FINISHED_JOB_STATUSES, time.time() - max_age_seconds),
+            )]
+            conn.executemany('DELETE FROM jobs WHERE id = ?', ((job_id,) for job_id in job_ids))
+        for job_id in job_ids:
+            shutil.rmtree(self.job_directory(job_id), ignore_errors=True)
+
+    def _claim(self):
+        """
+        รับงานถัดไปจากคิว (เปลี่ยนสถานะเป็น running ใน transaction เดียว) คืนค่างานหรือ None ถ้าไม่มีงานรอ
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.row_factory = sqlite3.Row
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT id FROM jobs j WHERE status = 'queued' ORDER BY "
+                "(SELECT COUNT(*) FROM jobs r WHERE r.owner = j.owner AND r.status = 'running'), "
+                "(SELECT MAX(started_at) FROM jobs r WHERE r.owner = j.owner), created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (now, now, row['id']),
+            )
+            job = self._row_to_job(conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone())
+        with self._lock:
+            self._running.add(job['id'])
+        return job
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, '
+                "progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END WHERE id = ?",
+                (status, None if result is None else json.dumps(result, ensure_ascii=False), error, time.time(), status, job_id),
+            )
+        with self._lock:
+            self._running.discard(job_id)
+
+    def run_job(self, job):
+        """
+        ทำงานหนึ่งงานด้วย handler ของชนิดงานนั้นแล้วบันทึกผล (ข้อผิดพลาดของ handler ถูกเก็บเป็นสถานะ failed)
+        """
+        context = JobContext(self, job)
+        try:
+            with METRICS.stage(f"job.{job['kind']}"):
+                result = self.handlers[job['kind']](context)
+        except JobCancelled:
+            self._finish(job['id'], 'cancelled')
+        except Exception as e:
+            self._finish(job['id'], 'failed', error=f'{type(e).__name__}: {e}')
+        else:
+            self._finish(job['id'], 'done', result)
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = self._claim()
+            except sqlite3.Error:
+                job = None
+            if job is None:
+                self._wakeup.wait(JOB_POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+            self.run_job(job)
+
+    def _heartbeat_loop(self):
+        last_cleanup = time.monotonic()
+        while not self._stopping.wait(JOB_HEARTBEAT_SECONDS):
+            with self._lock:
+                running = list(self._running)
+            try:
+                with closing(self._connect()) as conn, conn:
+                    conn.executemany(
+                        'UPDATE jobs SET heartbeat_at = ? WHERE id = ?',
+                        ((time.time(), job_id) for job_id in running),
+                    )
+                self.mark_stale_jobs()
+                if time.monotonic() - last_cleanup > 60 * 60:
+                    self.cleanup()
+                    last_cleanup = time.monotonic()
+            except sqlite3.Error:
+                pass
+
+# --- งานมาตรฐานของโปรแกรม (ดู create_job_handlers) ---
+def file_error_message(filename, error):
+    """
+    (ระดับ, ข้อความ) ของไฟล์ที่อ่านไม่สำเร็จ ระดับเป็น 'warning' หรือ 'error'
+    """
+    if isinstance(error, NoPhoneColumnError):
+        return 'warning', f"ไฟล์ {filename}: ไม่พบคอลัมน์ที่เหมาะสมสำหรับเบอร์โทรศัพท์"
+    return 'error', f"ข้อผิดพลาดในการประมวลผลไฟล์ {filename}: {error}"
+
+def read_job_file(context, name, path, index, count):
+    """
+    อ่านเบอร์จากไฟล์หนึ่งไฟล์ของงานแบบสตรีม พร้อมรายงานความคืบหน้า (ไฟล์ที่ index จาก count ไฟล์)
+    คืนค่า uint32 ที่ไม่ซ้ำ
+    """
+    chunks = [np.empty(0, dtype=np.uint32)]
+    with open(path, 'rb') as f:
+        for numbers, progress in iter_phone_number_chunks(f, name):
+            chunks.append(encode_numbers(numbers, skip_invalid=True))
+            context.progress((index + (progress or 0)) / count)
+    return np.unique(np.concatenate(chunks))
+
+def read_files_job(context, db_path=NUMBERS_DB_FILE, parsed_cache=None):
+    """
+    งาน process/check: อ่านเบอร์จากไฟล์ที่ส่งมากับงาน แล้วแยกเป็นเบอร์ใหม่/เบอร์ที่มีอยู่แล้ว
+    เทียบกับเบอร์รวม (หรือรายการ params['list_name']) งาน process ข้ามไฟล์ที่เนื้อหาเคยถูกบันทึกแล้ว
+    (เบอร์อยู่ในเบอร์รวมแล้ว) ส่วนงาน check อ่านทุกไฟล์ เบอร์ของไฟล์ที่บันทึกแล้วจึงถูกนับเป็นเบอร์ซ้ำตามจริง
+    ถ้ามีหลายไฟล์จะอ่านพร้อมกันใน process pool ของคิว (ดู JobQueue.process_pool)
+    ผลลัพธ์เก็บเป็น processed.npy, new.npy และ duplicates.npy (uint32 เรียงลำดับ) ในโฟลเดอร์ของงาน
+    """
+    list_name = context.params.get('list_name')
+    messages = []
+    merged = [np.empty(0, dtype=np.uint32)]
+    file_info = {}
+    pending_files = []
+    for name, path in context.inputs:
+        with open(path, 'rb') as f:
+            content_hash = hash_file_content(f)
+        uploaded_before = check_file_uploaded_before(content_hash, db_path, list_name)
+        if uploaded_before:
+            saved_name, saved_count, saved_at = uploaded_before
+            if context.kind == 'process':
+                messages.append(('info', f"ข้ามไฟล์ {name}: เนื้อหาเหมือนไฟล์ {saved_name} ที่บันทึกแล้วเมื่อ {saved_at} ({saved_count} เบอร์)"))
+                continue
+            messages.append(('info', f"{name}: เนื้อหาเหมือนไฟล์ {saved_name} ที่บันทึกแล้วเมื่อ {saved_at} ({saved_count} เบอร์)"))
+        if content_hash in file_info:
+            messages.append(('info', f"ข้ามไฟล์ {name}: เนื้อหาเหมือนไฟล์ {file_info[content_hash][0]} ที่อัปโหลดมาด้วยกัน"))
+            continue
+        file_size = os.path.getsize(path)
+        cached_numbers = parsed_cache.get(content_hash) if parsed_cache is not None else None
+        if cached_numbers is not None:
+            messages.append(('info', f"{name}: ใช้ผลที่อ่านไว้แล้ว"))
+            merged.append(cached_numbers)
+            file_info[content_hash] = (name, file_size, len(cached_numbers))
+            continue
+        file_info[content_hash] = (name, file_size, 0)
+        pending_files.append((content_hash, name, path))
+
+    def collect(content_hash, name, read):
+        try:
+            numbers = read()
+        except (JobCancelled, BrokenProcessPool):
+            raise
+        except Exception as e:
+            messages.append(file_error_message(name, e))
+            del file_info[content_hash]
+            return
+        merged.append(numbers)
+        if parsed_cache is not None:
+            parsed_cache.put(content_hash, numbers)
+        file_info[content_hash] = (name, file_info[content_hash][1], len(numbers))
+
+    pool = context.queue.process_pool() if len(pending_files) > 1 else None
+    if pool is not None:
+        try:
+            futures = {
+                pool.submit(read_phone_numbers_from_path, path): (content_hash, name)
+                for content_hash, name, path in pending_files
+            }
+            context.progress(0, f"กำลังอ่าน {len(futures)} ไฟล์พร้อมกัน")
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                content_hash, name = futures[future]
+                collect(content_hash, name, future.result)
+                context.progress(done_count / len(futures), f"อ่านไฟล์เสร็จ {done_count}/{len(futures)} ไฟล์")
+        except JobCancelled:
+            for future in futures:
+                future.cancel()
+            raise
+        except BrokenProcessPool:
+            context.queue.discard_process_pool(pool)
+            raise
+    else:
+        for index, (content_hash, name, path) in enumerate(pending_files):
+            context.progress(index / len(pending_files), f"กำลังอ่านไฟล์ {name}")
+            collect(content_hash, name, partial(read_job_file, context, name, path, index, len(pending_files)))
+
+    context.progress(1.0, "กำลังเทียบกับเบอร์รวม")
+    processed = np.unique(np.concatenate(merged))
+    duplicates, new_numbers = search_numbers(processed, shared_master_cache(db_path, list_name).snapshot()[1])
+    np.save(context.path('processed.npy'), processed)
+    np.save(context.path('new.npy'), new_numbers)
+    np.save(context.path('duplicates.npy'), duplicates)
+    return {
+        'list_name': list_name,
+        'file_info': file_info,
+        'messages': messages,
+        'processed': len(processed),
+        'new': len(new_numbers),
+        'duplicates': len(duplicates),
+    }
+
+def save_job(context, db_path=NUMBERS_DB_FILE):
+    """
+    งาน save: บันทึกผลของงาน process params['source_job'] ลงเบอร์รวม (และรายการ params['list_name'] ถ้าระบุ)
+    บันทึกลงเบอร์รวมใช้เฉพาะเบอร์ใหม่ ส่วนบันทึกเข้ารายการใช้เบอร์ทั้งหมดเพื่อปรับเวลาที่พบล่าสุดด้วย
+    แล้วเพิ่มเบอร์ที่บันทึกจริงลงแคชเบอร์รวมที่ใช้ร่วมกันในโปรเซส
+    """
+    list_name = context.params.get('list_name')
+    source = context.queue.job_directory(context.params['source_job'])
+    encoded = np.load(os.path.join(source, 'new.npy' if list_name is None else 'processed.npy'))
+    file_info = {content_hash: tuple(info) for content_hash, info in context.params.get('file_info', {}).items()}
+    context.progress(0, f"กำลังบันทึก {len(encoded)} เบอร์")
+    inserted, version, list_added, list_version = insert_list_numbers(decode_numbers(encoded), list_name, file_info, db_path)
+    if inserted:
+        shared_master_cache(db_path).add_numbers(encode_numbers(inserted), version)
+    if len(list_added):
+        shared_master_cache(db_path, list_name).add_numbers(list_added, list_version)
+    return {'list_name': list_name, 'inserted': len(inserted), 'list_added': len(list_added)}
+
+def export_job(context, db_path=NUMBERS_DB_FILE):
+    """
+    งาน export: ส่งออกเบอร์รวมทั้งหมด (หรือเบอร์ของรายการ params['list_name']) เป็นไฟล์ params['format'] ในโฟลเดอร์ของงาน
+    """
+    list_name = context.params.get('list_name')
+    file_format = context.params['format']
+    version, numbers = shared_master_cache(db_path, list_name).snapshot()
+    context.progress(0, f"กำลังสร้างไฟล์ {file_format} ({len(numbers)} เบอร์)")
+    file_name = f'export.{file_format}'
+    with open(context.path(file_name), 'wb') as f:
+        f.write(create_export_file(numbers, file_format))
+    return {'list_name': list_name, 'format': file_format, 'file': file_name, 'rows': len(numbers), 'version': version}
+
+def create_job_handlers(db_path=NUMBERS_DB_FILE, parsed_cache=None):
+    """
+    handler ของงานมาตรฐาน (process, check, save, export) สำหรับ JobQueue
+    parsed_cache (ParsedFileCache) ใช้ร่วมกับส่วนอื่นของโปรแกรมได้ ไฟล์ที่เคยอ่านแล้วจึงไม่ต้องอ่านใหม่
+    """
+    read_files = partial(read_files_job, db_path=db_path, parsed_cache=parsed_cache)
+    return {
+        'process': read_files,
+        'check': read_files,
+        'save': partial(save_job, db_path=db_path),
+        'export': partial(export_job, db_path=db_path),
+    }
@@ -0,0 +1,139 @@
+"""
+เบอร์รวมในหน่วยความจำ (uint32 เรียงลำดับ) และการเทียบเบอร์กับเบอร์รวม
+"""
+import os
+import threading
+from contextlib import closing
+
+import numpy as np
+
+from .metrics import METRICS
+from .normalize import encode_numbers
+from .store import (
+    NUMBERS_DB_FILE,
+    get_db_connection,
+    get_list_version,
+    get_store_version,
+    read_list_snapshot,
+    read_master_snapshot,
+)
+
+# การดำเนินการกับชุดเบอร์ที่ combine_numbers รองรับ
+SET_OPERATIONS = ('union', 'intersection', 'difference')
+
+class MasterCache:
+    """
+    แคชเบอร์รวมทั้งหมด (หรือเบอร์ของรายการ list_name) เป็น uint32 array เรียงลำดับ ใช้ร่วมกันได้หลายเธรด
+    โหลดจากฐานข้อมูลใหม่เฉพาะเมื่อเวอร์ชันของฐานข้อมูล (หรือของรายการ) เปลี่ยน
+    """
+
+    def __init__(self, db_path=NUMBERS_DB_FILE, list_name=None):
+        self.db_path = db_path
+        self.list_name = list_name
+        self._lock = threading.Lock()
+        self._version = None
+        self._numbers = np.empty(0, dtype=np.uint32)
+
+    def snapshot(self):
+        """
+        คืนค่า (เวอร์ชันของฐานข้อมูลหรือของรายการ, เบอร์ทั้งหมดเป็น numpy array uint32 เรียงลำดับ)
+        รายการที่ไม่มีอยู่มีเวอร์ชันเป็น None และไม่มีเบอร์
+        """
+        with self._lock, closing(get_db_connection(self.db_path)) as conn:
+            if self.list_name is None:
+                if self._version != get_store_version(conn):
+                    self._version, self._numbers = read_master_snapshot(conn, self.db_path)
+            elif self._version != get_list_version(conn, self.list_name):
+                self._version, self._numbers = read_list_snapshot(conn, self.list_name)
+            return self._version, self._numbers
+
+    def add_numbers(self, encoded, version):
+        """
+        เพิ่มเบอร์ที่เพิ่งบันทึก (uint32 ที่ยังไม่มีในเบอร์รวม) ลงแคชโดยไม่ต้องโหลดเบอร์รวมใหม่ทั้งหมด
+        version คือเวอร์ชันของฐานข้อมูลหลังบันทึก ถ้าแคชไม่ได้อยู่ที่เวอร์ชันก่อนหน้าพอดี (มีการเขียนอื่นแทรก)
+        จะไม่แก้แคชและปล่อยให้ snapshot โหลดใหม่แทน
+        """
+        encoded = np.sort(np.asarray(encoded, dtype=np.uint32))
+        with self._lock:
+            if self._version is None or version is None or self._version != version - 1:
+                return
+            numbers = np.insert(self._numbers, np.searchsorted(self._numbers, encoded), encoded)
+            numbers.flags.writeable = False
+            self._numbers, self._version = numbers, version
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+def shared_master_cache(db_path=NUMBERS_DB_FILE, list_name=None):
+    """
+    MasterCache ของ (ไฟล์ฐานข้อมูล, รายการ) ที่ใช้ร่วมกันทั้งโปรเซส เช่นระหว่างหน้าเว็บกับงานเบื้องหลัง
+    เบอร์รวมจึงอยู่ในหน่วยความจำชุดเดียวและการบันทึกจากที่ใดก็อัปเดตแคชเดียวกัน
+    """
+    key = (os.path.abspath(db_path), list_name)
+    with _shared_caches_lock:
+        if key not in _shared_caches:
+            _shared_caches[key] = MasterCache(db_path, list_name)
+        return _shared_caches[key]
+
+def contains_numbers(master, encoded):
+    """
+    คืนค่า boolean mask ว่าแต่ละค่าใน encoded อยู่ใน master (เรียงลำดับแล้ว) หรือไม่ ด้วย searchsorted
+    """
+    if len(master) == 0:
+        return np.zeros(len(encoded), dtype=bool)
+    positions = np.minimum(np.searchsorted(master, encoded), len(master) - 1)
+    return master[positions] == encoded
+
+def split_numbers(numbers, master):
+    """
+    แยกเบอร์เป็น (เบอร์ใหม่, เบอร์ที่มีอยู่แล้วใน master) โดย master คือ uint32 array เรียงลำดับ
+    """
+    with METRICS.stage('membership') as stage:
+        numbers = np.array(list(numbers), dtype=object)
+        found = contains_numbers(master, encode_numbers(numbers))
+        stage.add(rows=len(numbers))
+        return set(numbers[~found]), set(numbers[found])
+
+def search_numbers(encoded, master):
+    """
+    ค้นหาเบอร์ทั้งชุด (uint32 จาก encode_numbers) ใน master ด้วย searchsorted ครั้งเดียว
+    คืนค่า (เบอร์ที่พบ, เบอร์ที่ไม่พบ) เป็น uint32 array เรียงลำดับและไม่ซ้ำ
+    """
+    with METRICS.stage('membership') as stage:
+        encoded = np.unique(np.asarray(encoded, dtype=np.uint32))
+        found = contains_numbers(master, encoded)
+        stage.add(rows=len(encoded))
+        return encoded[found], encoded[~found]
+
+def combine_numbers(left, right, operation):
+    """
+    รวม (union) ตัดกัน (intersection) หรือลบ (difference: อยู่ใน left แต่ไม่อยู่ใน right) ชุดเบอร์สองชุด
+    ที่เป็น uint32 array เรียงลำดับและไม่ซ้ำ (เช่นจาก MasterCache.snapshot หรือ load_list_numbers)
+    ทำด้วยการ merge และ searchsorted ของเลขจำนวนเต็มโดยไม่สร้าง set ของ Python คืนค่า uint32 array เรียงลำดับ
+    """
+    if operation not in SET_OPERATIONS:
+        raise ValueError(f'unknown set operation: {operation}')
+    with METRICS.stage(f'lists.{operation}') as stage:
+        stage.add(rows=len(left) + len(right))
+        if operation == 'union':
+            merged = np.concatenate([left, right]).astype(np.uint32, copy=False)
+            # timsort รวมสองช่วงที่เรียงอยู่แล้วได้ในรอบเดียว
+            merged.sort(kind='stable')
+            keep = np.ones(len(merged), dtype=bool)
+            keep[1:] = merged[1:] != merged[:-1]
+            return merged[keep]
+        found = contains_numbers(right, left)
+        return left[found] if operation == 'intersection' else left[~found]
+
+def prefix_range(prefix):
+    """
+    ช่วงค่า [start, stop) ของ uint32 (ดู encode_numbers) สำหรับเบอร์ที่ขึ้นต้นด้วย prefix เช่น '081'
+    ไม่ต้องพิมพ์ 0 ตัวแรกก็ได้ ('81' เท่ากับ '081') ถ้าไม่มีตัวเลขเลยคือทุกเบอร์
+    """
+    digits = ''.join(c for c in prefix if c in '0123456789')
+    if digits.startswith('0'):
+        digits = digits[1:]
+    digits = digits[:9]
+    scale = 10 ** (9 - len(digits))
+    start = int(digits or 0) * scale
+    return start, start + scale
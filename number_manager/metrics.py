@@ -0,0 +1,137 @@
+"""
+ตัววัดเวลาและตัวนับของแต่ละขั้นตอน (อ่านไฟล์ แปลงเบอร์ เทียบกับเบอร์รวม บันทึก ส่งออก)
+เก็บรวมทั้งโปรเซสใน METRICS และส่งออกเป็น JSON หรือข้อความแบบ Prometheus ได้
+"""
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows ไม่มีโมดูล resource
+    resource = None
+
+def get_peak_rss_bytes():
+    """
+    หน่วยความจำสูงสุดที่โปรเซสนี้เคยใช้ (peak RSS) เป็นไบต์ หรือ None ถ้าระบบไม่รองรับ
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux รายงานเป็น KB ส่วน macOS เป็นไบต์
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class StageRecord:
+    """จำนวนแถวและไบต์ที่ขั้นตอนหนึ่งประมวลผล เพิ่มได้ระหว่างอยู่ใน Metrics.stage()"""
+
+    def __init__(self):
+        self.rows = 0
+        self.nbytes = 0
+
+    def add(self, rows=0, nbytes=0):
+        self.rows += rows
+        self.nbytes += nbytes
+
+class Metrics:
+    """
+    ตัวนับเวลา จำนวนครั้ง จำนวนแถว และจำนวนไบต์ของแต่ละขั้นตอน ใช้ร่วมกันได้หลายเธรด
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self.started_at = time.time()
+
+    def record(self, stage, seconds=0.0, rows=0, nbytes=0, calls=1):
+        """
+        บันทึกผลของขั้นตอน stage หนึ่งครั้ง
+        """
+        with self._lock:
+            stats = self._stages.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'rows': 0, 'bytes': 0})
+            stats['calls'] += calls
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['rows'] += rows
+            stats['bytes'] += nbytes
+
+    @contextmanager
+    def stage(self, name):
+        """
+        จับเวลาโค้ดในบล็อก with แล้วบันทึกเป็นขั้นตอน name (เพิ่มจำนวนแถว/ไบต์ผ่าน StageRecord.add)
+        """
+        record = StageRecord()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            self.record(name, time.perf_counter() - start, record.rows, record.nbytes)
+
+    def timed(self, name, iterable):
+        """
+        ส่งต่อค่าจาก iterable พร้อมจับเวลาเฉพาะช่วงที่ iterable ทำงาน (ไม่รวมเวลาของผู้ใช้ค่าระหว่างรอบ)
+        """
+        iterator = iter(iterable)
+        seconds = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start
+                yield item
+        finally:
+            self.record(name, seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        คืนค่าสถิติทั้งหมดเป็น dict (พร้อม rows_per_second ของแต่ละขั้นตอนและ peak RSS)
+        """
+        with self._lock:
+            stages = {name: dict(stats) for name, stats in self._stages.items()}
+        for stats in stages.values():
+            stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+        return {
+            'uptime_seconds': time.time() - self.started_at,
+            'peak_rss_bytes': get_peak_rss_bytes(),
+            'stages': stages,
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix='number_manager'):
+        """
+        ส่งออกเป็นข้อความแบบ Prometheus (text exposition format)
+        """
+        snapshot = self.snapshot()
+        metrics = [
+            ('stage_calls_total', 'counter', 'calls', "Number of times each stage ran"),
+            ('stage_seconds_total', 'counter', 'seconds', "Total time spent in each stage"),
+            ('stage_max_seconds', 'gauge', 'max_seconds', "Longest single run of each stage"),
+            ('stage_rows_total', 'counter', 'rows', "Rows (numbers, lines or cells) processed by each stage"),
+            ('stage_bytes_total', 'counter', 'bytes', "Bytes read or written by each stage"),
+        ]
+        lines = []
+        for name, metric_type, key, help_text in metrics:
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            for stage, stats in sorted(snapshot['stages'].items()):
+                lines.append(f'{prefix}_{name}{{stage="{stage}"}} {stats[key]}')
+        if snapshot['peak_rss_bytes'] is not None:
+            lines.append(f'# HELP {prefix}_peak_rss_bytes Peak resident set size of the process')
+            lines.append(f'# TYPE {prefix}_peak_rss_bytes gauge')
+            lines.append(f'{prefix}_peak_rss_bytes {snapshot["peak_rss_bytes"]}')
+        return '\n'.join(lines) + '\n'
+
+# ตัวนับที่ใช้ร่วมกันทั้งโปรเซส (งานที่ทำใน process pool จะถูกนับในโปรเซสของ worker ไม่ใช่ที่นี่)
+METRICS = Metrics()
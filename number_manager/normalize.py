@@ -0,0 +1,166 @@
+"""
+แปลงเบอร์โทรศัพท์ให้อยู่ในรูปแบบมาตรฐาน 10 หลัก และเข้ารหัสเป็นจำนวนเต็ม
+"""
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# เพิ่มเลขนี้ทุกครั้งที่กฎการแปลงเบอร์หรือการเลือกคอลัมน์เปลี่ยน เพื่อไม่ให้ใช้ผลเก่าที่ค้างอยู่ในแคช
+NORMALIZER_VERSION = 2
+
+def normalize_phone_number(number_str):
+    """
+    แปลงเบอร์โทรศัพท์ให้อยู่ในรูปแบบ 10 หลัก (08XXXXXXXX)
+    """
+    if isinstance(number_str, float) and not math.isfinite(number_str):
+        return None
+    if isinstance(number_str, (int, float)):
+        number_str = str(int(number_str))
+    
+    if not isinstance(number_str, str):
+        return None
+
+    # ลบอักขระที่ไม่ใช่ตัวเลข และแปลงตัวเลขไทย (หรือตัวเลข unicode อื่น) เป็นตัวเลข ASCII
+    digits = re.sub(r'\D', '', number_str)
+    if not digits.isascii():
+        digits = ''.join(str(int(c)) for c in digits)
+
+    # จัดการรูปแบบเบอร์ที่พบบ่อย
+    if digits.startswith('66') and len(digits) >= 11:
+        digits = '0' + digits[2:]
+    elif len(digits) == 9 and digits.startswith(('6', '8', '9')):
+        digits = '0' + digits
+    
+    # ตรวจสอบว่าเป็นเบอร์โทรศัพท์มือถือ 10 หลักหรือไม่
+    if len(digits) == 10 and digits.startswith('0'):
+        return digits
+    return None
+
+def normalize_phone_numbers(values):
+    """
+    แปลงเบอร์โทรศัพท์ทั้งชุด (pandas Series หรือ list ของบรรทัด) ในครั้งเดียว
+    ใช้กฎเดียวกับ normalize_phone_number ทุกประการ คืนค่า Series ที่ตำแหน่งตรงกับข้อมูลเข้า
+    โดยค่าที่ไม่ใช่เบอร์มือถือที่ถูกต้อง (รวมถึงค่าว่าง) จะเป็น None
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    result = np.full(len(values), None, dtype=object)
+    positions = np.flatnonzero(values.notna().to_numpy())
+    present = values.iloc[positions]
+
+    if pd.api.types.is_numeric_dtype(present) and not pd.api.types.is_bool_dtype(present):
+        # ตัวเลขจาก Excel: ตัดทศนิยมแบบเดียวกับ str(int(x)) ค่าที่ใหญ่เกินไปไม่มีทางเป็นเบอร์ที่ถูกต้อง
+        in_range = (present.abs() < 1e15).to_numpy()
+        positions = positions[in_range]
+        texts = present[in_range].astype('int64').astype(str).tolist()
+    else:
+        present = present.astype(object)
+        kinds = present.map(type)
+        is_text = (kinds == str).to_numpy()
+        is_number = kinds.isin([int, float]).to_numpy().copy()
+        # inf ในคอลัมน์ข้อความ (เช่นจาก xlsx) แปลงเป็นจำนวนเต็มไม่ได้ ส่งไปฟังก์ชันเดิมซึ่งคืนค่า None
+        is_number[is_number] = [type(v) is int or math.isfinite(v) for v in present[is_number]]
+        # ค่าชนิดอื่น (เช่นวันที่) มีไม่มาก ใช้ฟังก์ชันเดิมทีละค่า
+        others = ~(is_text | is_number)
+        result[positions[others]] = [normalize_phone_number(v) for v in present[others]]
+        # ตัวเลขที่ปนอยู่ในคอลัมน์ข้อความ (เช่นจาก xlsx) แปลงแบบเดียวกับ str(int(x)) แล้วรวมกับข้อความ
+        texts = present[is_text].tolist() + [str(int(v)) for v in present[is_number]]
+        positions = np.concatenate((positions[is_text], positions[is_number]))
+
+    numbers = np.array(_normalize_text_lines(texts), dtype=object)
+    found = numbers != ''
+    result[positions[found]] = numbers[found]
+    return pd.Series(result, index=values.index, dtype=object)
+
+# ไบต์ทุกตัวที่ไม่ใช่ตัวเลข ASCII หรือขึ้นบรรทัดใหม่ ใช้กับ bytes.translate เพื่อลบทิ้ง
+_NON_DIGIT_BYTES = bytes(c for c in range(256) if c != ord('\n') and not ord('0') <= c <= ord('9'))
+
+def _normalize_text_lines(texts):
+    """
+    แปลงรายการข้อความเป็นเบอร์ 10 หลัก โดยต่อทุกค่าเป็นข้อความเดียวแล้วประมวลผลทั้งก้อน
+    คืนค่า list ที่ตำแหน่งตรงกับข้อมูลเข้า ค่าที่ไม่ถูกต้องเป็น ''
+    """
+    if not texts:
+        return []
+    blob = '\n'.join(texts)
+    if blob.count('\n') != len(texts) - 1:
+        # บางค่ามีขึ้นบรรทัดใหม่อยู่ข้างใน (เช่นเซลล์ Excel) ตัดทิ้งได้เลยเพราะไม่ใช่ตัวเลขอยู่แล้ว
+        texts = [text.replace('\n', '') for text in texts]
+        blob = '\n'.join(texts)
+    if blob.isascii():
+        return _normalize_ascii_blob(blob, len(texts))
+
+    # มีตัวเลขไทยหรืออักขระ unicode อื่น เฉพาะค่าเหล่านั้นใช้ regex ซึ่งรองรับ \d แบบ unicode เหมือนฟังก์ชันเดิม
+    # ค่าที่เหลือ (ส่วนใหญ่) ยังใช้ทางเร็ว แถวขยะภาษาไทยไม่กี่แถวจึงไม่ทำให้ทั้งก้อนช้าลง
+    is_ascii = np.fromiter((text.isascii() for text in texts), dtype=bool, count=len(texts))
+    numbers = np.full(len(texts), '', dtype=object)
+    ascii_positions = np.flatnonzero(is_ascii)
+    if len(ascii_positions):
+        numbers[ascii_positions] = _normalize_ascii_blob('\n'.join([texts[i] for i in ascii_positions]), len(ascii_positions))
+    other_blob = '\n'.join([texts[i] for i in np.flatnonzero(~is_ascii)])
+    other_blob = re.sub(r'[^\d\n]+', '', other_blob)
+    other_blob = re.sub(r'[^\x00-\x7f]', lambda match: str(int(match.group())), other_blob)
+    other_blob = re.sub(r'^(?:66(?=\d{9}$)|(?=[689]\d{8}$))', '0', other_blob, flags=re.M)
+    other_blob = re.sub(r'^(?!0\d{9}$).+$', '', other_blob, flags=re.M)
+    numbers[~is_ascii] = other_blob.split('\n')
+    return numbers.tolist()
+
+def _normalize_ascii_blob(blob, count):
+    """
+    แปลงข้อความ ASCII ที่ต่อกันด้วยขึ้นบรรทัดใหม่ (count ค่า) เป็นเบอร์ 10 หลักด้วย numpy ค่าที่ไม่ถูกต้องเป็น ''
+    """
+    data = np.frombuffer(blob.encode('ascii').translate(None, _NON_DIGIT_BYTES), dtype=np.uint8)
+    breaks = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(data)]))
+    lengths = ends - starts
+    # อ่านสองหลักแรกของแต่ละบรรทัด (บรรทัดสั้นจะถูกกรองด้วยความยาวอยู่แล้ว)
+    padded = np.concatenate((data, np.zeros(2, dtype=np.uint8)))
+    first, second = padded[starts], padded[starts + 1]
+    valid = (
+        ((lengths == 11) & (first == ord('6')) & (second == ord('6')))
+        | ((lengths == 9) & np.isin(first, np.frombuffer(b'689', dtype=np.uint8)))
+        | ((lengths == 10) & (first == ord('0')))
+    )
+    # ทุกรูปแบบที่ถูกต้องคือ 0 ตามด้วยเลข 9 หลักสุดท้ายของบรรทัด
+    digits = np.full((int(valid.sum()), 10), ord('0'), dtype=np.uint8)
+    digits[:, 1:] = data[ends[valid][:, None] - np.arange(9, 0, -1)]
+    numbers = np.full(count, '', dtype='U10')
+    numbers[valid] = digits.view('S10').ravel().astype('U10')
+    return numbers.tolist()
+
+# น้ำหนักของแต่ละหลัก ใช้แปลงเลข 9 หลักหลัง 0 เป็นจำนวนเต็ม
+_DIGIT_WEIGHTS = 10 ** np.arange(8, -1, -1, dtype=np.uint32)
+
+def encode_numbers(numbers, skip_invalid=False):
+    """
+    แปลงเบอร์ 10 หลัก (0XXXXXXXXX) เป็น uint32 ของเลข 9 หลักหลัง 0 ใช้หน่วยความจำ 4 ไบต์ต่อเบอร์
+    ค่าที่ไม่ใช่เบอร์รูปแบบนี้ (ตัวเลข ASCII 10 หลักขึ้นต้นด้วย 0) ทำให้เกิด ValueError
+    เว้นแต่ skip_invalid ซึ่งจะข้ามค่าเหล่านั้นไป (ผลลัพธ์จึงอาจสั้นกว่าข้อมูลเข้า)
+    """
+    numbers = list(numbers)
+    if not numbers:
+        return np.empty(0, dtype=np.uint32)
+    # อ่านเป็น code point (UTF-32) 11 ตัว ค่าที่ยาวเกิน 10 ตัวหรือมีอักขระอื่นจึงตรวจพบได้โดยไม่ต้อง encode
+    codes = np.array(numbers, dtype='U11').view(np.uint32).reshape(-1, 11)
+    digits = codes[:, :10] - ord('0')
+    valid = (digits <= 9).all(axis=1) & (digits[:, 0] == 0) & (codes[:, 10] == 0)
+    if not valid.all():
+        if not skip_invalid:
+            bad = [numbers[i] for i in np.flatnonzero(~valid)[:3]]
+            raise ValueError(f'not normalized phone numbers: {bad!r}')
+        digits = digits[valid]
+    return digits[:, 1:] @ _DIGIT_WEIGHTS
+
+def decode_numbers(encoded):
+    """
+    แปลง uint32 จาก encode_numbers กลับเป็น list ของเบอร์ 10 หลัก
+    """
+    digits = np.full((len(encoded), 10), ord('0'), dtype=np.uint8)
+    rest = np.asarray(encoded, dtype=np.uint32)
+    for position in range(9, 0, -1):
+        rest, digit = np.divmod(rest, 10)
+        digits[:, position] += digit.astype(np.uint8)
+    return digits.view('S10').ravel().astype('U10').tolist()
+
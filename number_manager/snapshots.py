@@ -0,0 +1,104 @@
+"""
+snapshot ของเบอร์รวมเป็นไฟล์ไบนารี (uint32 เรียงลำดับ แบบ .npy) เปิดแบบ memory-mapped ตอนโหลด
+ใช้คู่กับบันทึกการเปลี่ยนแปลงแบบต่อท้าย (ตาราง master_log ใน store) เพื่อสร้างเบอร์รวมของเวอร์ชันใดก็ได้
+โดยไม่ต้องอ่านเบอร์ทุกแถวจากฐานข้อมูลหรือนำเข้าไฟล์ต้นทางใหม่
+"""
+import os
+import re
+import threading
+
+import numpy as np
+
+# เขียน snapshot ใหม่เมื่อต้องเล่นบันทึกการเปลี่ยนแปลงต่อจาก snapshot ล่าสุดเกินจำนวนครั้งหรือจำนวนเบอร์นี้
+SNAPSHOT_COMPACT_ENTRIES = 50
+SNAPSHOT_COMPACT_ROWS = 500000
+# จำนวน snapshot ล่าสุดที่เก็บไว้ (เวอร์ชันที่เก่ากว่า snapshot เก่าสุดจะกู้คืนไม่ได้)
+SNAPSHOT_KEEP = 10
+# ค่า uint32 ในไฟล์และในบันทึกเป็น little-endian เสมอ ไฟล์จึงย้ายข้ามเครื่องได้
+SNAPSHOT_DTYPE = np.dtype('<u4')
+
+_SNAPSHOT_NAME = re.compile(r'^master-(\d+)\.npy$')
+
+def get_snapshot_dir(db_path):
+    """
+    โฟลเดอร์ snapshot ของเบอร์รวม เก็บไว้ข้างไฟล์ฐานข้อมูล
+    """
+    return f'{db_path}-snapshots'
+
+def snapshot_path(directory, version):
+    return os.path.join(directory, f'master-{version:012d}.npy')
+
+def list_snapshot_versions(directory):
+    """
+    เวอร์ชันของ snapshot ที่มีในโฟลเดอร์ เรียงจากเก่าไปใหม่
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return sorted(int(match.group(1)) for match in map(_SNAPSHOT_NAME.match, names) if match)
+
+def save_snapshot(directory, version, numbers):
+    """
+    บันทึกเบอร์รวม (uint32 เรียงลำดับ) ของเวอร์ชัน version (เขียนไฟล์ชั่วคราวแล้วแทนที่ ผู้อ่านจึงไม่เห็นไฟล์ที่เขียนไม่เสร็จ)
+    ถ้ามี snapshot ของเวอร์ชันนี้อยู่แล้วจะไม่เขียนซ้ำ เพราะเนื้อหาของเวอร์ชันเดียวกันเหมือนกันเสมอ
+    """
+    path = snapshot_path(directory, version)
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            np.save(f, np.asarray(numbers, dtype=SNAPSHOT_DTYPE))
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+def load_snapshot(directory, version):
+    """
+    เปิด snapshot ของเวอร์ชัน version แบบ memory-mapped (อ่านอย่างเดียว) ข้อมูลจะถูกอ่านจากดิสก์เมื่อใช้งานจริง
+    คืนค่า None ถ้าไม่มีไฟล์หรือไฟล์เสีย
+    """
+    try:
+        numbers = np.load(snapshot_path(directory, version), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if numbers.dtype != SNAPSHOT_DTYPE or numbers.ndim != 1:
+        return None
+    return np.asarray(numbers)
+
+def prune_snapshots(directory, keep=SNAPSHOT_KEEP):
+    """
+    ลบ snapshot ที่เก่ากว่า keep ไฟล์ล่าสุด คืนค่าเวอร์ชันของ snapshot เก่าสุดที่เหลืออยู่ หรือ None ถ้าไม่มีเลย
+    """
+    for version in list_snapshot_versions(directory)[:-keep]:
+        try:
+            os.remove(snapshot_path(directory, version))
+        except OSError:
+            # เช่นบน Windows ไฟล์ที่ยังถูก map อยู่จะลบไม่ได้ ลองใหม่ตอน compaction ครั้งถัดไป
+            pass
+    remaining = list_snapshot_versions(directory)
+    return remaining[0] if remaining else None
+
+def pack_numbers(encoded):
+    """
+    แปลงเบอร์ (uint32) เป็น bytes สำหรับเก็บในบันทึกการเปลี่ยนแปลง
+    """
+    return np.asarray(encoded, dtype=SNAPSHOT_DTYPE).tobytes()
+
+def unpack_numbers(blob):
+    return np.frombuffer(blob, dtype=SNAPSHOT_DTYPE)
+
+def merge_numbers(numbers, added):
+    """
+    รวมเบอร์ที่เพิ่ม (uint32 ที่ยังไม่มีใน numbers) เข้า numbers ที่เรียงลำดับแล้ว คืนค่า array ใหม่ (อ่านอย่างเดียว)
+    """
+    added = np.sort(np.asarray(added, dtype=np.uint32))
+    numbers = np.asarray(numbers, dtype=np.uint32)
+    merged = np.insert(numbers, np.searchsorted(numbers, added), added)
+    merged.flags.writeable = False
+    return merged
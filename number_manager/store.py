@@ -0,0 +1,645 @@
+"""
+ฐานข้อมูลรวมเบอร์ (SQLite) และบันทึกไฟล์ที่เคยบันทึกแล้ว
+ฟังก์ชันในนี้ไม่แสดงผลเอง ข้อผิดพลาดของฐานข้อมูลจะถูกส่งต่อเป็น sqlite3.Error ให้ผู้เรียกจัดการ
+การเขียนทุกครั้งทำใน transaction เดียวที่เริ่มด้วย BEGIN IMMEDIATE จึงมีผู้เขียนได้ครั้งละหนึ่งราย
+(ข้ามโปรเซสได้ เช่นหน้าเว็บกับ CLI) และถ้าล้มกลางทางจะไม่มีข้อมูลครึ่ง ๆ กลาง ๆ ค้างอยู่
+"""
+import datetime
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+
+from .bloom import BLOOM_CAPACITY_GROWTH, BLOOM_FP_RATE, BLOOM_MIN_CAPACITY, BloomFilter
+from .metrics import METRICS
+from .normalize import decode_numbers, encode_numbers, normalize_phone_numbers
+from .snapshots import (
+    SNAPSHOT_COMPACT_ENTRIES,
+    SNAPSHOT_COMPACT_ROWS,
+    get_snapshot_dir,
+    list_snapshot_versions,
+    load_snapshot,
+    merge_numbers,
+    pack_numbers,
+    prune_snapshots,
+    save_snapshot,
+    snapshot_path,
+    unpack_numbers,
+)
+
+# ไฟล์ฐานข้อมูลรวมเบอร์ และไฟล์รวมเบอร์แบบข้อความเดิม (ย้ายเข้าฐานข้อมูลครั้งแรกที่เปิด)
+NUMBERS_DB_FILE = 'sms_numbers.db'
+COMBINED_NUMBERS_FILE = 'combined_numbers.txt'
+# จำนวนค่าสูงสุดต่อคำสั่ง IN (ต่ำกว่าขีดจำกัดพารามิเตอร์ของ SQLite)
+SQLITE_IN_BATCH_SIZE = 900
+# จำนวนแถวที่ดึงจากฐานข้อมูลต่อครั้งตอนโหลดเบอร์รวม
+MASTER_LOAD_ROWS = 100000
+
+def get_all_numbers_from_file(filepath):
+    """
+    ดึงเบอร์โทรศัพท์ทั้งหมดจากไฟล์ที่กำหนด
+    """
+    numbers = set()
+    if os.path.exists(filepath):
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                numbers.add(line.strip())
+    return numbers
+
+def get_db_connection(db_path=NUMBERS_DB_FILE):
+    """
+    เปิดการเชื่อมต่อฐานข้อมูลรวมเบอร์ในโหมด WAL และสร้างตารางถ้ายังไม่มี
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS phone_numbers ('
+        'id INTEGER PRIMARY KEY AUTOINCREMENT, number TEXT UNIQUE NOT NULL)'
+    )
+    conn.execute('CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS uploaded_files ('
+        'content_hash TEXT PRIMARY KEY, filename TEXT NOT NULL, file_size INTEGER NOT NULL, '
+        'number_count INTEGER NOT NULL, uploaded_at TEXT NOT NULL, store_version INTEGER)'
+    )
+    # รายการ/แคมเปญ: สมาชิกเก็บเป็นเลข uint32 เดียวกับ encode_numbers เรียงตาม (list_id, number) ใน primary key
+    # จึงอ่านเบอร์ของรายการหนึ่งออกมาเรียงลำดับได้จากดัชนีโดยตรง
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS number_lists ('
+        'id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL, created_at TEXT NOT NULL, '
+        'number_count INTEGER NOT NULL DEFAULT 0, version INTEGER NOT NULL DEFAULT 0)'
+    )
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS list_members ('
+        'list_id INTEGER NOT NULL, number INTEGER NOT NULL, added_at TEXT NOT NULL, last_seen_at TEXT NOT NULL, '
+        'PRIMARY KEY (list_id, number)) WITHOUT ROWID'
+    )
+    # บันทึกการเปลี่ยนแปลงของเบอร์รวมแบบต่อท้าย หนึ่งแถวต่อเวอร์ชัน: 'add' เก็บเบอร์ที่เพิ่ม (uint32 ใน numbers)
+    # 'clear' คือล้างทั้งหมด และ 'restore' คือกลับไปเป็นเบอร์รวมของเวอร์ชัน base_version (ดู replay_master_log)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS master_log ('
+        'version INTEGER PRIMARY KEY, op TEXT NOT NULL, numbers BLOB, base_version INTEGER, created_at TEXT NOT NULL)'
+    )
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS list_files ('
+        'list_id INTEGER NOT NULL, content_hash TEXT NOT NULL, uploaded_at TEXT NOT NULL, store_version INTEGER, '
+        'PRIMARY KEY (list_id, content_hash)) WITHOUT ROWID'
+    )
+    # store_version คือเวอร์ชันของฐานข้อมูลหลังบันทึกไฟล์ (restore_master_version ใช้เลือกไฟล์ที่ต้องลืม)
+    # ฐานข้อมูลที่สร้างก่อนมีคอลัมน์นี้ แถวเดิมจะเป็น NULL
+    for table in ('uploaded_files', 'list_files'):
+        if not any(row[1] == 'store_version' for row in conn.execute(f'PRAGMA table_info({table})')):
+            try:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN store_version INTEGER')
+            except sqlite3.OperationalError:
+                # อีกการเชื่อมต่อเพิ่มคอลัมน์ไปพร้อมกัน
+                if not any(row[1] == 'store_version' for row in conn.execute(f'PRAGMA table_info({table})')):
+                    raise
+    return conn
+
+def begin_write(conn):
+    """
+    เริ่ม transaction สำหรับเขียน โดยจองสิทธิ์เขียนทันที ผู้เขียนรายอื่นจะรอจนกว่าจะ commit (ตาม timeout ของการเชื่อมต่อ)
+    ใช้คู่กับ `with conn:` เพื่อ commit หรือ rollback
+    """
+    conn.execute('BEGIN IMMEDIATE')
+
+def get_store_version(conn):
+    """
+    เลขเวอร์ชันของฐานข้อมูลรวมเบอร์ เพิ่มขึ้นทุกครั้งที่ข้อมูลเปลี่ยน ใช้ตัดสินว่าแคชยังใช้ได้หรือไม่
+    """
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()
+    return row[0] if row else 0
+
+def bump_store_version(conn):
+    """
+    เพิ่มเลขเวอร์ชันของฐานข้อมูล (เรียกภายใน transaction เดียวกับการแก้ไขข้อมูล) คืนค่าเวอร์ชันใหม่
+    """
+    conn.execute(
+        "INSERT INTO store_meta (key, value) VALUES ('version', 1) "
+        "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+    )
+    return get_store_version(conn)
+
+def log_master_change(conn, version, op, encoded=None, base_version=None, created_at=None):
+    """
+    บันทึกการเปลี่ยนแปลงของเบอร์รวมที่ทำให้ได้เวอร์ชัน version ลง master_log
+    (เรียกภายใน transaction เดียวกับการแก้ไขข้อมูล ทุกครั้งที่เรียก bump_store_version)
+    """
+    if created_at is None:
+        created_at = datetime.datetime.now().isoformat(timespec='seconds')
+    conn.execute(
+        'INSERT INTO master_log (version, op, numbers, base_version, created_at) VALUES (?, ?, ?, ?, ?)',
+        (version, op, None if encoded is None else pack_numbers(encoded), base_version, created_at),
+    )
+
+def update_number_count(conn, delta):
+    """
+    ปรับจำนวนเบอร์ที่จำไว้ใน store_meta (เรียกภายใน transaction เดียวกับการแก้ไขข้อมูล)
+    ถ้ายังไม่เคยนับ count_numbers จะนับใหม่เองในครั้งแรก
+    """
+    conn.execute("UPDATE store_meta SET value = value + ? WHERE key = 'count'", (delta,))
+
+def bump_list_version(conn, list_id):
+    """
+    ให้เวอร์ชันใหม่กับรายการ list_id (เรียกภายใน transaction เดียวกับการแก้ไขสมาชิก) คืนค่าเวอร์ชันใหม่
+    เวอร์ชันมาจากตัวนับเดียวของทุกรายการ รายการที่ลบแล้วสร้างใหม่ชื่อเดิมจึงไม่ได้เวอร์ชันซ้ำกับแคชเก่า
+    """
+    conn.execute(
+        "INSERT INTO store_meta (key, value) VALUES ('list_version', 1) "
+        "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+    )
+    version = conn.execute("SELECT value FROM store_meta WHERE key = 'list_version'").fetchone()[0]
+    conn.execute('UPDATE number_lists SET version = ? WHERE id = ?', (version, list_id))
+    return version
+
+def migrate_numbers_from_file(db_path=NUMBERS_DB_FILE, numbers_file=None):
+    """
+    ย้ายเบอร์จากไฟล์รวมเบอร์แบบข้อความเข้าฐานข้อมูลครั้งเดียว ใช้ PRAGMA user_version เป็นตัวบอกว่าย้ายไปแล้ว
+    ถ้าไม่ระบุ numbers_file จะใช้ combined_numbers.txt ในโฟลเดอร์เดียวกับฐานข้อมูล
+    """
+    if numbers_file is None:
+        numbers_file = os.path.join(os.path.dirname(db_path), COMBINED_NUMBERS_FILE)
+    with closing(get_db_connection(db_path)) as conn:
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= 1:
+            return 0
+        lines = list(get_all_numbers_from_file(numbers_file))
+        numbers = set(normalize_phone_numbers(lines).dropna())
+        with conn:
+            begin_write(conn)
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= 1:
+                return 0
+            before = conn.total_changes
+            conn.executemany('INSERT OR IGNORE INTO phone_numbers (number) VALUES (?)', ((n,) for n in numbers))
+            migrated_count = conn.total_changes - before
+            if migrated_count:
+                update_number_count(conn, migrated_count)
+                version = bump_store_version(conn)
+                # ถ้ามีบางเบอร์อยู่ในฐานข้อมูลก่อนแล้ว ไม่รู้แน่ว่าเบอร์ใดเพิ่มจริง จึงไม่บันทึก ปล่อยให้บันทึกขาดช่วง
+                # ซึ่ง read_master_snapshot จะโหลดจากฐานข้อมูลแล้วเขียน snapshot ใหม่แทน
+                if migrated_count == len(numbers):
+                    log_master_change(conn, version, 'add', encode_numbers(numbers))
+            conn.execute('PRAGMA user_version = 1')
+    return migrated_count
+
+def count_numbers(db_path=NUMBERS_DB_FILE):
+    """
+    จำนวนเบอร์ในฐานข้อมูลรวมเบอร์ อ่านจากค่าที่ปรับทุกครั้งที่บันทึก นับทั้งตารางเฉพาะครั้งแรกเท่านั้น
+    """
+    with closing(get_db_connection(db_path)) as conn:
+        row = conn.execute("SELECT value FROM store_meta WHERE key = 'count'").fetchone()
+        if row:
+            return row[0]
+        with conn:
+            begin_write(conn)
+            count = conn.execute('SELECT COUNT(*) FROM phone_numbers').fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('count', ?)", (count,))
+        return count
+
+def load_master_numbers(conn):
+    """
+    โหลดเบอร์รวมทั้งหมดเป็น uint32 array เรียงลำดับ (อ่านอย่างเดียว) ทีละ MASTER_LOAD_ROWS แถว
+    """
+    # ดัชนี UNIQUE เรียงตามข้อความ ซึ่งสำหรับเบอร์ 10 หลักคือเรียงตามตัวเลขด้วย
+    cursor = conn.execute('SELECT number FROM phone_numbers ORDER BY number')
+    chunks = [np.empty(0, dtype=np.uint32)]
+    while True:
+        rows = cursor.fetchmany(MASTER_LOAD_ROWS)
+        if not rows:
+            break
+        chunks.append(encode_numbers(row[0] for row in rows))
+    numbers = np.concatenate(chunks)
+    numbers.flags.writeable = False
+    return numbers
+
+def read_master_snapshot(conn, db_path=None):
+    """
+    อ่าน (เวอร์ชันของฐานข้อมูล, เบอร์รวมทั้งหมด) ภายใน transaction อ่านเดียวกัน
+    เวอร์ชันจึงตรงกับข้อมูลที่ได้เสมอแม้มีการบันทึกแทรกระหว่างโหลด
+    ถ้าระบุ db_path จะเปิด snapshot ล่าสุดแบบ memory-mapped แล้วเล่นบันทึกการเปลี่ยนแปลงหลังจากนั้น (ดู replay_master_log)
+    แทนการอ่านทุกแถว และเขียน snapshot ใหม่เมื่อไม่มี snapshot ที่ใช้ได้หรือบันทึกที่ต้องเล่นยาวเกินไป
+    """
+    replayed = None
+    with conn, METRICS.stage('master.load') as stage:
+        conn.execute('BEGIN')
+        version = get_store_version(conn)
+        if db_path is not None:
+            replayed = replay_master_log(conn, get_snapshot_dir(db_path), version)
+        numbers = load_master_numbers(conn) if replayed is None else replayed[0]
+        stage.add(rows=len(numbers))
+    if db_path is not None and (
+            replayed is None or replayed[1] >= SNAPSHOT_COMPACT_ENTRIES or replayed[2] >= SNAPSHOT_COMPACT_ROWS):
+        compact_master_snapshots(db_path, version, numbers)
+    return version, numbers
+
+def replay_master_log(conn, directory, version):
+    """
+    สร้างเบอร์รวมของเวอร์ชัน version จาก snapshot ล่าสุดที่ไม่เกินเวอร์ชันนั้นในโฟลเดอร์ directory
+    แล้วเล่นบันทึก master_log ต่อจนถึงเวอร์ชันนั้น (เบอร์ที่เพิ่มทุกครั้งรวมเข้าทีเดียวตอนท้าย)
+    คืนค่า (uint32 array เรียงลำดับ, จำนวนรายการบันทึกที่เล่น, จำนวนเบอร์ที่เล่น)
+    หรือ None ถ้าสร้างไม่ได้ (ไม่มี snapshot ที่ใช้ได้หรือบันทึกขาดช่วง)
+    """
+    for base in reversed([snapshot for snapshot in list_snapshot_versions(directory) if snapshot <= version]):
+        numbers = load_snapshot(directory, base)
+        if numbers is not None:
+            break
+    else:
+        return None
+    entries = conn.execute(
+        'SELECT op, numbers, base_version FROM master_log WHERE version > ? AND version <= ? ORDER BY version',
+        (base, version),
+    ).fetchall()
+    if len(entries) != version - base:
+        return None
+    added, replayed_rows = [], 0
+    for op, blob, base_version in entries:
+        if op == 'add':
+            added.append(unpack_numbers(blob))
+            replayed_rows += len(added[-1])
+            continue
+        added = []
+        if op == 'clear':
+            numbers = np.empty(0, dtype=np.uint32)
+        else:
+            restored = replay_master_log(conn, directory, base_version)
+            if restored is None:
+                return None
+            numbers = restored[0]
+    if added:
+        numbers = merge_numbers(numbers, np.concatenate(added))
+    return numbers, len(entries), replayed_rows
+
+def compact_master_snapshots(db_path, version, numbers):
+    """
+    เขียน snapshot ของเบอร์รวมเวอร์ชัน version ลบ snapshot ที่เก่าเกิน SNAPSHOT_KEEP ไฟล์
+    และลบบันทึก master_log ที่เก่ากว่า snapshot เก่าสุดที่เหลือ (ไม่มีทางเล่นถึงแล้ว)
+    เขียนไฟล์ไม่สำเร็จไม่ถือเป็นข้อผิดพลาด ครั้งหน้าจะลองใหม่
+    """
+    directory = get_snapshot_dir(db_path)
+    with METRICS.stage('snapshot.write') as stage:
+        try:
+            save_snapshot(directory, version, numbers)
+        except OSError:
+            return
+        stage.add(rows=len(numbers), nbytes=len(numbers) * 4)
+    oldest = prune_snapshots(directory)
+    if oldest is not None:
+        with closing(get_db_connection(db_path)) as conn, conn:
+            begin_write(conn)
+            conn.execute('DELETE FROM master_log WHERE version < ?', (oldest,))
+
+def get_restore_points(db_path=NUMBERS_DB_FILE):
+    """
+    เวอร์ชันก่อนหน้าของเบอร์รวมที่กู้คืนได้ (ตั้งแต่ snapshot เก่าสุดที่เก็บไว้) เรียงจากใหม่ไปเก่า
+    คืนค่า list ของ (เวอร์ชัน, เวลาที่เปลี่ยน, ชนิดการเปลี่ยนแปลง, จำนวนเบอร์ที่เพิ่ม)
+    ชนิดเป็น 'add', 'clear', 'restore' หรือ 'snapshot' (เวอร์ชันที่รู้จากไฟล์ snapshot อย่างเดียว)
+    """
+    directory = get_snapshot_dir(db_path)
+    snapshots = list_snapshot_versions(directory)
+    if not snapshots:
+        return []
+    with closing(get_db_connection(db_path)) as conn:
+        current_version = get_store_version(conn)
+        points = {
+            version: (version, created_at, op, rows)
+            for version, created_at, op, rows in conn.execute(
+                'SELECT version, created_at, op, COALESCE(length(numbers), 0) / 4 FROM master_log '
+                'WHERE version >= ? AND version < ?',
+                (snapshots[0], current_version),
+            )
+        }
+    for version in snapshots:
+        if version < current_version and version not in points:
+            points[version] = (version, get_snapshot_time(directory, version), 'snapshot', 0)
+    return [points[version] for version in sorted(points, reverse=True)]
+
+def get_snapshot_time(directory, version):
+    try:
+        modified = os.path.getmtime(snapshot_path(directory, version))
+    except OSError:
+        return None
+    return datetime.datetime.fromtimestamp(modified).isoformat(timespec='seconds')
+
+def restore_master_version(version, db_path=NUMBERS_DB_FILE):
+    """
+    กู้คืนเบอร์รวมกลับไปเป็นเบอร์ของเวอร์ชันก่อนหน้า version (จาก snapshot และ master_log) โดยไม่ต้องนำเข้าไฟล์ต้นทางใหม่
+    ทำใน transaction เดียว: ลบ/เพิ่มเฉพาะเบอร์ที่ต่างจากปัจจุบัน เอาเบอร์ที่ถูกลบออกจากรายการด้วย
+    และลืมไฟล์ที่บันทึกหลังเวอร์ชันนั้น (store_version มากกว่า version จึงบันทึกไฟล์เหล่านั้นใหม่ได้)
+    สมาชิกรายการที่ถูกลบไปก่อนหน้าจะไม่กลับมา
+    การกู้คืนเป็นการเปลี่ยนแปลงใหม่ (ได้เวอร์ชันใหม่) จึงกู้คืนกลับไปเวอร์ชันก่อนกู้คืนได้อีก
+    คืนค่า (เวอร์ชันใหม่, จำนวนเบอร์หลังกู้คืน) ถ้ากู้คืนเวอร์ชันนั้นไม่ได้จะเกิด ValueError
+    """
+    directory = get_snapshot_dir(db_path)
+    with METRICS.stage('store.restore') as stage, closing(get_db_connection(db_path)) as conn, conn:
+        begin_write(conn)
+        current_version = get_store_version(conn)
+        if not 0 <= version < current_version:
+            raise ValueError(f'version {version} is not an earlier version of the store')
+        target = replay_master_log(conn, directory, version)
+        if target is None:
+            raise ValueError(f'version {version} is no longer available for restore')
+        target = target[0]
+        current = replay_master_log(conn, directory, current_version)
+        current = load_master_numbers(conn) if current is None else current[0]
+        removed = np.setdiff1d(current, target, assume_unique=True)
+        added = np.setdiff1d(target, current, assume_unique=True)
+        stage.add(rows=len(removed) + len(added))
+
+        conn.executemany('DELETE FROM phone_numbers WHERE number = ?', ((n,) for n in decode_numbers(removed)))
+        conn.executemany('INSERT INTO phone_numbers (number) VALUES (?)', ((n,) for n in decode_numbers(added)))
+        conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('count', ?)", (len(target),))
+        conn.execute('CREATE TEMP TABLE removed_numbers (number INTEGER PRIMARY KEY)')
+        conn.executemany('INSERT INTO removed_numbers (number) VALUES (?)', ((int(n),) for n in removed))
+        affected_lists = conn.execute(
+            'SELECT list_id, COUNT(*) FROM list_members WHERE number IN (SELECT number FROM removed_numbers) '
+            'GROUP BY list_id'
+        ).fetchall()
+        conn.execute('DELETE FROM list_members WHERE number IN (SELECT number FROM removed_numbers)')
+        for list_id, removed_count in affected_lists:
+            conn.execute('UPDATE number_lists SET number_count = number_count - ? WHERE id = ?', (removed_count, list_id))
+            bump_list_version(conn, list_id)
+        conn.execute('DELETE FROM uploaded_files WHERE store_version > ?', (version,))
+        conn.execute('DELETE FROM list_files WHERE store_version > ?', (version,))
+        # แถวจากฐานข้อมูลเก่าที่ไม่มี store_version เทียบด้วยเวลาที่บันทึกแทน (ละเอียดแค่วินาที)
+        row = conn.execute('SELECT created_at FROM master_log WHERE version = ?', (version,)).fetchone()
+        restored_at = row[0] if row else get_snapshot_time(directory, version)
+        if restored_at is not None:
+            conn.execute('DELETE FROM uploaded_files WHERE store_version IS NULL AND uploaded_at > ?', (restored_at,))
+            conn.execute('DELETE FROM list_files WHERE store_version IS NULL AND uploaded_at > ?', (restored_at,))
+        new_version = bump_store_version(conn)
+        log_master_change(conn, new_version, 'restore', base_version=version)
+    # snapshot ของเวอร์ชันใหม่ทำให้การโหลดครั้งถัดไปไม่ต้องเล่นบันทึกย้อนไปถึงเวอร์ชันที่กู้คืน
+    compact_master_snapshots(db_path, new_version, target)
+    return new_version, len(target)
+
+def get_bloom_path(db_path=NUMBERS_DB_FILE):
+    """
+    ไฟล์ Bloom filter ของเบอร์รวม เก็บไว้ข้างไฟล์ฐานข้อมูล
+    """
+    return f'{db_path}-bloom.npz'
+
+def load_bloom_filter(db_path=NUMBERS_DB_FILE, fp_rate=BLOOM_FP_RATE):
+    """
+    โหลด Bloom filter ที่ตรงกับเวอร์ชันปัจจุบันของฐานข้อมูล
+    ถ้ายังไม่มี เก่ากว่าฐานข้อมูล เต็มเกินความจุ หรืออัตรา false positive ต่างจากที่ขอ จะสร้างใหม่จากฐานข้อมูลแล้วบันทึกไว้
+    """
+    path = get_bloom_path(db_path)
+    bloom = BloomFilter.load(path)
+    with closing(get_db_connection(db_path)) as conn:
+        if (bloom is not None and bloom.version == get_store_version(conn)
+                and bloom.fp_rate == fp_rate and bloom.count <= bloom.capacity):
+            return bloom
+        version, numbers = read_master_snapshot(conn, db_path)
+    with METRICS.stage('bloom.build') as stage:
+        bloom = BloomFilter(max(len(numbers) * BLOOM_CAPACITY_GROWTH, BLOOM_MIN_CAPACITY), fp_rate, version=version)
+        bloom.add(numbers)
+        stage.add(rows=len(numbers), nbytes=bloom.memory_bytes)
+    try:
+        bloom.save(path)
+    except OSError:
+        pass
+    return bloom
+
+def update_bloom_filter(encoded, version, db_path=NUMBERS_DB_FILE):
+    """
+    เพิ่มเบอร์ที่เพิ่งบันทึก (uint32) ลง Bloom filter ที่บันทึกไว้ โดยไม่ต้องสร้างใหม่ทั้งหมด
+    แก้เฉพาะเมื่อตัวกรองอยู่ที่เวอร์ชันก่อนหน้าพอดีและยังไม่เกินความจุ ไม่เช่นนั้นปล่อยให้ load_bloom_filter สร้างใหม่
+    """
+    path = get_bloom_path(db_path)
+    bloom = BloomFilter.load(path)
+    if bloom is None or bloom.version != version - 1 or bloom.count + len(encoded) > bloom.capacity:
+        return
+    with METRICS.stage('bloom.update') as stage:
+        bloom.add(encoded)
+        stage.add(rows=len(encoded))
+    bloom.version = version
+    try:
+        bloom.save(path)
+    except OSError:
+        pass
+
+def find_existing_numbers_in_store(numbers, db_path=NUMBERS_DB_FILE, bloom_filter=None):
+    """
+    คืนค่าเบอร์ที่มีอยู่แล้วในฐานข้อมูลรวมเบอร์ โดยถามฐานข้อมูลตรง งานเพิ่มตามจำนวนเบอร์ที่ส่งเข้ามาเท่านั้น
+    ชุดเล็กใช้ IN ส่วนชุดใหญ่ใส่ตารางชั่วคราวแล้ว JOIN กับดัชนี UNIQUE
+    ถ้าระบุ bloom_filter (ดู load_bloom_filter) จะถามฐานข้อมูลเฉพาะเบอร์ที่ตัวกรองบอกว่าอาจมีอยู่แล้ว
+    """
+    numbers = list(numbers)
+    if bloom_filter is not None and numbers:
+        with METRICS.stage('bloom.lookup') as stage:
+            stage.add(rows=len(numbers))
+            numbers = np.array(numbers, dtype=object)[bloom_filter.might_contain(encode_numbers(numbers))].tolist()
+    found = set()
+    if not numbers:
+        return found
+    with closing(get_db_connection(db_path)) as conn, METRICS.stage('store.lookup') as stage:
+        stage.add(rows=len(numbers))
+        if len(numbers) <= SQLITE_IN_BATCH_SIZE:
+            placeholders = ','.join('?' * len(numbers))
+            rows = conn.execute(f'SELECT number FROM phone_numbers WHERE number IN ({placeholders})', numbers)
+        else:
+            conn.execute('CREATE TEMP TABLE lookup_numbers (number TEXT PRIMARY KEY)')
+            conn.executemany('INSERT OR IGNORE INTO lookup_numbers (number) VALUES (?)', ((n,) for n in numbers))
+            rows = conn.execute('SELECT p.number FROM lookup_numbers l JOIN phone_numbers p ON p.number = l.number')
+        found.update(row[0] for row in rows)
+    return found
+
+def clear_numbers_store(db_path=NUMBERS_DB_FILE):
+    """
+    ลบเบอร์ทั้งหมดในฐานข้อมูลรวมเบอร์
+    """
+    with closing(get_db_connection(db_path)) as conn, conn:
+        begin_write(conn)
+        conn.execute('DELETE FROM phone_numbers')
+        conn.execute('DELETE FROM uploaded_files')
+        conn.execute("UPDATE store_meta SET value = 0 WHERE key = 'count'")
+        log_master_change(conn, bump_store_version(conn), 'clear')
+        # รายการยังอยู่ (ชื่อเดิม) แต่ไม่มีสมาชิกแล้ว
+        conn.execute('DELETE FROM list_members')
+        conn.execute('DELETE FROM list_files')
+        conn.execute('UPDATE number_lists SET number_count = 0')
+        for (list_id,) in conn.execute('SELECT id FROM number_lists').fetchall():
+            bump_list_version(conn, list_id)
+
+def insert_numbers(numbers, file_info=None, db_path=NUMBERS_DB_FILE):
+    """
+    บันทึกเบอร์ลงฐานข้อมูลรวมเบอร์ใน transaction เดียว (เบอร์ที่มีอยู่แล้วจะถูกข้าม)
+    พร้อมบันทึกไฟล์ที่มาของเบอร์ (dict ของ content hash -> (ชื่อไฟล์, ขนาดไฟล์, จำนวนเบอร์)) ถ้าระบุ file_info
+    คืนค่า (list ของเบอร์ที่เพิ่มจริงเรียงลำดับ, เวอร์ชันของฐานข้อมูลหลังบันทึก)
+    """
+    inserted, version, _, _ = insert_list_numbers(numbers, None, file_info, db_path)
+    return inserted, version
+
+def insert_list_numbers(numbers, list_name, file_info=None, db_path=NUMBERS_DB_FILE):
+    """
+    เหมือน insert_numbers แต่เพิ่มเบอร์ทั้งหมดเข้ารายการ list_name ใน transaction เดียวกันด้วย (สร้างรายการถ้ายังไม่มี)
+    เบอร์ที่อยู่ในรายการแล้วจะปรับเวลาที่พบล่าสุด (last_seen_at) และไฟล์ใน file_info จะถูกจำว่าบันทึกเข้ารายการนี้แล้ว
+    ถ้า list_name เป็น None จะบันทึกลงเบอร์รวมอย่างเดียว
+    คืนค่า (list ของเบอร์ที่เพิ่มในเบอร์รวม, เวอร์ชันของฐานข้อมูล,
+    uint32 array เรียงลำดับของเบอร์ที่เพิ่มในรายการ, เวอร์ชันของรายการ หรือ None ถ้าไม่ได้ระบุรายการ)
+    """
+    with METRICS.stage('store.insert') as stage, closing(get_db_connection(db_path)) as conn, conn:
+        conn.execute('CREATE TEMP TABLE staged_numbers (number TEXT PRIMARY KEY)')
+        # เตรียมเบอร์ในตารางชั่วคราวก่อนจองสิทธิ์เขียน ผู้เขียนรายอื่นจึงไม่ต้องรอช่วงนี้
+        before = conn.total_changes
+        conn.executemany('INSERT OR IGNORE INTO staged_numbers (number) VALUES (?)', ((n,) for n in numbers))
+        stage.add(rows=conn.total_changes - before)
+        conn.commit()
+        begin_write(conn)
+        inserted = [row[0] for row in conn.execute(
+            'SELECT s.number FROM staged_numbers s '
+            'WHERE NOT EXISTS (SELECT 1 FROM phone_numbers p WHERE p.number = s.number) ORDER BY s.number'
+        )]
+        conn.executemany('INSERT INTO phone_numbers (number) VALUES (?)', ((n,) for n in inserted))
+        uploaded_at = datetime.datetime.now().isoformat(timespec='seconds')
+        if inserted:
+            encoded = encode_numbers(inserted)
+            update_number_count(conn, len(inserted))
+            version = bump_store_version(conn)
+            log_master_change(conn, version, 'add', encoded, created_at=uploaded_at)
+        else:
+            version = get_store_version(conn)
+        if file_info:
+            conn.executemany(
+                'INSERT OR REPLACE INTO uploaded_files '
+                '(content_hash, filename, file_size, number_count, uploaded_at, store_version) VALUES (?, ?, ?, ?, ?, ?)',
+                ((content_hash, filename, file_size, number_count, uploaded_at, version)
+                 for content_hash, (filename, file_size, number_count) in file_info.items()),
+            )
+        list_added, list_version = [], None
+        if list_name is not None:
+            list_added, list_version = add_staged_numbers_to_list(conn, list_name, file_info, uploaded_at, version)
+    if inserted:
+        update_bloom_filter(encoded, version, db_path)
+    return inserted, version, np.array(list_added, dtype=np.uint32), list_version
+
+def add_staged_numbers_to_list(conn, list_name, file_info, seen_at, store_version=None):
+    """
+    เพิ่มเบอร์ในตารางชั่วคราว staged_numbers เข้ารายการ list_name (เรียกภายใน transaction ของ insert_list_numbers)
+    ไฟล์ใน file_info จะถูกจำพร้อม store_version (เวอร์ชันของฐานข้อมูลหลังบันทึก)
+    ทำด้วยคำสั่ง SQL ชุดเดียวโดยไม่ดึงเบอร์ออกมาใน Python คืนค่า (เบอร์ที่เพิ่มใหม่เป็น uint32 เรียงลำดับ, เวอร์ชันของรายการ)
+    """
+    list_id = ensure_list(conn, list_name)
+    # ค่า uint32 ของ encode_numbers คือเลข 9 หลักหลัง 0 ตัวแรก
+    list_added = [row[0] for row in conn.execute(
+        'SELECT CAST(substr(s.number, 2) AS INTEGER) AS encoded FROM staged_numbers s '
+        'WHERE NOT EXISTS (SELECT 1 FROM list_members m '
+        'WHERE m.list_id = ? AND m.number = CAST(substr(s.number, 2) AS INTEGER)) ORDER BY encoded',
+        (list_id,),
+    )]
+    conn.execute(
+        'INSERT INTO list_members (list_id, number, added_at, last_seen_at) '
+        'SELECT ?, CAST(substr(number, 2) AS INTEGER), ?, ? FROM staged_numbers WHERE true '
+        'ON CONFLICT (list_id, number) DO UPDATE SET last_seen_at = excluded.last_seen_at',
+        (list_id, seen_at, seen_at),
+    )
+    if file_info:
+        conn.executemany(
+            'INSERT OR REPLACE INTO list_files (list_id, content_hash, uploaded_at, store_version) VALUES (?, ?, ?, ?)',
+            ((list_id, content_hash, seen_at, store_version) for content_hash in file_info),
+        )
+    if not list_added:
+        return list_added, conn.execute('SELECT version FROM number_lists WHERE id = ?', (list_id,)).fetchone()[0]
+    conn.execute('UPDATE number_lists SET number_count = number_count + ? WHERE id = ?', (len(list_added), list_id))
+    return list_added, bump_list_version(conn, list_id)
+
+def check_file_uploaded_before(content_hash, db_path=NUMBERS_DB_FILE, list_name=None):
+    """
+    ตรวจสอบว่าไฟล์ที่มีเนื้อหานี้เคยถูกบันทึกไปแล้วหรือไม่ โดยดูจาก hash ของเนื้อหา (ไม่ใช่ชื่อไฟล์)
+    ถ้าระบุ list_name จะดูเฉพาะไฟล์ที่เคยบันทึกเข้ารายการนั้น
+    คืนค่า (ชื่อไฟล์, จำนวนเบอร์, เวลาที่บันทึก) ถ้าเคยบันทึก หรือ None
+    """
+    with closing(get_db_connection(db_path)) as conn:
+        if list_name is None:
+            return conn.execute(
+                'SELECT filename, number_count, uploaded_at FROM uploaded_files WHERE content_hash = ?',
+                (content_hash,),
+            ).fetchone()
+        return conn.execute(
+            'SELECT u.filename, u.number_count, f.uploaded_at FROM list_files f '
+            'JOIN number_lists l ON l.id = f.list_id JOIN uploaded_files u ON u.content_hash = f.content_hash '
+            'WHERE l.name = ? AND f.content_hash = ?',
+            (list_name, content_hash),
+        ).fetchone()
+
+def ensure_list(conn, list_name):
+    """
+    คืนค่า id ของรายการ list_name สร้างใหม่ถ้ายังไม่มี (เรียกภายใน transaction สำหรับเขียน)
+    """
+    if not list_name or not list_name.strip():
+        raise ValueError('list name must not be empty')
+    created_at = datetime.datetime.now().isoformat(timespec='seconds')
+    conn.execute('INSERT OR IGNORE INTO number_lists (name, created_at) VALUES (?, ?)', (list_name, created_at))
+    return conn.execute('SELECT id FROM number_lists WHERE name = ?', (list_name,)).fetchone()[0]
+
+def create_list(list_name, db_path=NUMBERS_DB_FILE):
+    """
+    สร้างรายการ/แคมเปญชื่อ list_name (ถ้ามีอยู่แล้วจะไม่ทำอะไร)
+    """
+    with closing(get_db_connection(db_path)) as conn, conn:
+        begin_write(conn)
+        ensure_list(conn, list_name)
+
+def delete_list(list_name, db_path=NUMBERS_DB_FILE):
+    """
+    ลบรายการและสมาชิกทั้งหมดของรายการ (เบอร์ยังอยู่ในเบอร์รวม) คืนค่า True ถ้ามีรายการนี้
+    """
+    with closing(get_db_connection(db_path)) as conn, conn:
+        begin_write(conn)
+        row = conn.execute('SELECT id FROM number_lists WHERE name = ?', (list_name,)).fetchone()
+        if row is None:
+            return False
+        conn.execute('DELETE FROM list_members WHERE list_id = ?', row)
+        conn.execute('DELETE FROM list_files WHERE list_id = ?', row)
+        conn.execute('DELETE FROM number_lists WHERE id = ?', row)
+        return True
+
+def get_lists(db_path=NUMBERS_DB_FILE):
+    """
+    คืนค่ารายการทั้งหมดเป็น list ของ (ชื่อ, จำนวนเบอร์, เวลาที่สร้าง) เรียงตามชื่อ
+    """
+    with closing(get_db_connection(db_path)) as conn:
+        return conn.execute('SELECT name, number_count, created_at FROM number_lists ORDER BY name').fetchall()
+
+def get_list_version(conn, list_name):
+    """
+    เวอร์ชันของรายการ list_name (เปลี่ยนทุกครั้งที่มีเบอร์เพิ่มหรือถูกลบ) หรือ None ถ้าไม่มีรายการนี้
+    """
+    row = conn.execute('SELECT version FROM number_lists WHERE name = ?', (list_name,)).fetchone()
+    return row[0] if row else None
+
+def load_list_numbers(conn, list_name, seen_within_days=None):
+    """
+    โหลดเบอร์ของรายการ list_name เป็น uint32 array เรียงลำดับ (อ่านอย่างเดียว) จากดัชนี (list_id, number) โดยตรง
+    ถ้าระบุ seen_within_days จะเอาเฉพาะเบอร์ที่ถูกบันทึกเข้ารายการครั้งล่าสุดภายในจำนวนวันนั้น
+    รายการที่ไม่มีอยู่คืนค่า array ว่าง
+    """
+    query = ('SELECT m.number FROM number_lists l JOIN list_members m ON m.list_id = l.id '
+             'WHERE l.name = ?')
+    params = [list_name]
+    if seen_within_days is not None:
+        seen_since = datetime.datetime.now() - datetime.timedelta(days=seen_within_days)
+        query += ' AND m.last_seen_at >= ?'
+        params.append(seen_since.isoformat(timespec='seconds'))
+    cursor = conn.execute(query + ' ORDER BY m.number', params)
+    chunks = [np.empty(0, dtype=np.uint32)]
+    while True:
+        rows = cursor.fetchmany(MASTER_LOAD_ROWS)
+        if not rows:
+            break
+        chunks.append(np.fromiter((row[0] for row in rows), dtype=np.uint32, count=len(rows)))
+    numbers = np.concatenate(chunks)
+    numbers.flags.writeable = False
+    return numbers
+
+def read_list_snapshot(conn, list_name, seen_within_days=None):
+    """
+    อ่าน (เวอร์ชันของรายการ, เบอร์ของรายการ) ภายใน transaction อ่านเดียวกัน เหมือน read_master_snapshot
+    """
+    with conn, METRICS.stage('list.load') as stage:
+        conn.execute('BEGIN')
+        version, numbers = get_list_version(conn, list_name), load_list_numbers(conn, list_name, seen_within_days)
+        stage.add(rows=len(numbers))
+    return version, numbers
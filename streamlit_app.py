@@ -1,477 +1,892 @@
-import streamlit as st
-import pandas as pd
-import re
-import os
-import io
-
-# --- การตั้งค่าไฟล์สำหรับเก็บข้อมูล ---
-COMBINED_NUMBERS_FILE = 'combined_numbers.txt'
-UPLOADED_FILES_LOG = 'uploaded_files_log.txt'
-
-# --- ฟังก์ชันช่วยทำงาน ---
-def normalize_phone_number(number_str):
-    """
-    แปลงเบอร์โทรศัพท์ให้อยู่ในรูปแบบ 10 หลัก (08XXXXXXXX)
-    """
-    if isinstance(number_str, (int, float)):
-        number_str = str(int(number_str))
-    
-    if not isinstance(number_str, str):
-        return None
-
-    # ลบอักขระที่ไม่ใช่ตัวเลข
-    digits = re.sub(r'\D', '', number_str)
-
-    # จัดการรูปแบบเบอร์ที่พบบ่อย
-    if digits.startswith('66') and len(digits) >= 11:
-        digits = '0' + digits[2:]
-    elif len(digits) == 9 and digits.startswith(('6', '8', '9')):
-        digits = '0' + digits
-    
-    # ตรวจสอบว่าเป็นเบอร์โทรศัพท์มือถือ 10 หลักหรือไม่
-    if len(digits) == 10 and digits.startswith('0'):
-        return digits
-    return None
-
-def get_all_numbers_from_file(filepath):
-    """
-    ดึงเบอร์โทรศัพท์ทั้งหมดจากไฟล์ที่กำหนด
-    """
-    numbers = set()
-    if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                numbers.add(line.strip())
-    return numbers
-
-def insert_numbers_to_file(numbers):
-    """
-    เพิ่มเบอร์ใหม่ลงในไฟล์รวมเบอร์
-    """
-    new_numbers_count = 0
-    try:
-        with open(COMBINED_NUMBERS_FILE, 'a', encoding='utf-8') as f:
-            for number in numbers:
-                f.write(number + '\n')
-                new_numbers_count += 1
-    except Exception as e:
-        st.error(f"เกิดข้อผิดพลาด: ไม่สามารถเขียนไฟล์ได้: {e}")
-    return new_numbers_count
-
-def check_file_uploaded_before(filename):
-    """
-    ตรวจสอบว่าไฟล์นี้เคยถูกบันทึกไปแล้วหรือไม่ โดยดูจากไฟล์บันทึก
-    """
-    uploaded_files = get_all_numbers_from_file(UPLOADED_FILES_LOG)
-    return filename in uploaded_files
-
-def record_uploaded_file(filename):
-    """
-    บันทึกชื่อไฟล์ว่าเคยถูกอัปโหลดและบันทึกแล้ว
-    """
-    try:
-        with open(UPLOADED_FILES_LOG, 'a', encoding='utf-8') as f:
-            f.write(filename + '\n')
-    except Exception as e:
-        st.error(f"เกิดข้อผิดพลาด: ไม่สามารถเขียนไฟล์บันทึกได้: {e}")
-
-def hide_last_four_digits(number):
-    """ซ่อนเลขท้าย 4 ตัวของเบอร์โทรศัพท์"""
-    if len(number) > 4:
-        return number[:-4] + "XXXX"
-    return "XXXX"
-
-def create_export_file(numbers_set, file_format):
-    if file_format == 'txt':
-        return "\n".join(sorted(list(numbers_set))).encode('utf-8')
-    elif file_format == 'xlsx':
-        df = pd.DataFrame(sorted(list(numbers_set)), columns=["Phone Number"])
-        output = io.BytesIO()
-        df.to_excel(output, index=False)
-        return output.getvalue()
-
-# --- ตั้งค่า Session State สำหรับ Streamlit ---
-if 'processed_numbers_from_file' not in st.session_state:
-    st.session_state.processed_numbers_from_file = set()
-if 'new_numbers_to_add' not in st.session_state:
-    st.session_state.new_numbers_to_add = set()
-if 'duplicates_found' not in st.session_state:
-    st.session_state.duplicates_found = set()
-if 'combined_numbers' not in st.session_state:
-    st.session_state.combined_numbers = get_all_numbers_from_file(COMBINED_NUMBERS_FILE)
-if 'status_message' not in st.session_state:
-    st.session_state.status_message = ["ยินดีต้อนรับสู่โปรแกรมจัดการเบอร์โทรศัพท์!"]
-if 'is_checked_only' not in st.session_state:
-    st.session_state.is_checked_only = False
-if 'uploaded_files' not in st.session_state:
-    st.session_state.uploaded_files = []
-if 'search_found_numbers' not in st.session_state: # New: To store numbers found during search
-    st.session_state.search_found_numbers = set()
-if 'search_not_found_numbers' not in st.session_state: # New: To store numbers not found during search
-    st.session_state.search_not_found_numbers = set()
-
-def update_status(message):
-    st.session_state.status_message.append(message)
-
-# --- ส่วนติดต่อผู้ใช้ (Streamlit UI) ---
-st.set_page_config(
-    page_title="SMS Marketing Number Manager",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-st.markdown(
-    """
-    <style>
-    .reportview-container .main .block-container{
-        max-width: 1000px;
-        padding-top: 2rem;
-        padding-right: 2rem;
-        padding-left: 2rem;
-        padding-bottom: 2rem;
-    }
-    .stButton>button {
-        width: 100%;
-        font-family: 'Kanit';
-    }
-    h1, h2, h3, h4, h5, h6, .st-font {
-        font-family: 'Kanit';
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
-
-st.title("โปรแกรมจัดการเบอร์โทรศัพท์สำหรับ SMS Marketing")
-
-# แสดงจำนวนเบอร์ในไฟล์รวม
-st.info(f"**จำนวนเบอร์ในไฟล์รวมเบอร์: {len(st.session_state.combined_numbers)} เบอร์**")
-
-### 1. อัปโหลดไฟล์เบอร์โทรศัพท์
-
-uploaded_files = st.file_uploader(
-    "เลือกไฟล์เบอร์ (.txt หรือ .xlsx)",
-    type=['txt', 'xlsx'],
-    accept_multiple_files=True,
-    help="สามารถเลือกได้หลายไฟล์พร้อมกัน",
-    key="file_uploader"
-)
-if uploaded_files:
-    st.session_state.uploaded_files = uploaded_files
-
-col_upload, col_check = st.columns(2)
-
-with col_upload:
-    if st.button("ประมวลผลไฟล์", key="process_button"):
-        if st.session_state.uploaded_files:
-            st.session_state.processed_numbers_from_file.clear()
-            st.session_state.new_numbers_to_add.clear()
-            st.session_state.duplicates_found.clear()
-            st.session_state.is_checked_only = False
-            
-            all_numbers_from_files = set()
-            
-            for uploaded_file in st.session_state.uploaded_files:
-                filename = uploaded_file.name
-                update_status(f"กำลังประมวลผลไฟล์: {filename}")
-                
-                try:
-                    numbers_from_file = set()
-                    if filename.endswith('.txt'):
-                        lines = uploaded_file.read().decode('utf-8').splitlines()
-                        for line in lines:
-                            num = normalize_phone_number(line.strip())
-                            if num:
-                                numbers_from_file.add(num)
-                    elif filename.endswith('.xlsx'):
-                        df = pd.read_excel(uploaded_file, engine='openpyxl')
-                        # พยายามหาคอลัมน์ที่น่าจะเป็นเบอร์โทรศัพท์
-                        column_name = None
-                        for col in df.columns:
-                            if 'phone' in str(col).lower() or 'number' in str(col).lower():
-                                column_name = col
-                                break
-                        if column_name is None and len(df.columns) > 0:
-                            column_name = df.columns[0]
-                        
-                        if column_name is not None:
-                            for num_raw in df[column_name].dropna():
-                                num = normalize_phone_number(num_raw)
-                                if num:
-                                    numbers_from_file.add(num)
-                        else:
-                            st.warning(f"ไฟล์ {filename}: ไม่พบคอลัมน์ที่เหมาะสมสำหรับเบอร์โทรศัพท์")
-                    
-                    all_numbers_from_files.update(numbers_from_file)
-                    
-                except Exception as e:
-                    st.error(f"ข้อผิดพลาดในการประมวลผลไฟล์ {filename}: {e}")
-            
-            st.session_state.processed_numbers_from_file = all_numbers_from_files
-            
-            st.session_state.combined_numbers = get_all_numbers_from_file(COMBINED_NUMBERS_FILE)
-            st.session_state.new_numbers_to_add = st.session_state.processed_numbers_from_file - st.session_state.combined_numbers
-            st.session_state.duplicates_found = st.session_state.processed_numbers_from_file.intersection(st.session_state.combined_numbers)
-            
-            update_status(f"ประมวลผลไฟล์ทั้งหมดสำเร็จ")
-            update_status(f"พบเบอร์โทรศัพท์ทั้งหมด (หลังลบซ้ำและกรอง): {len(st.session_state.processed_numbers_from_file)} เบอร์")
-            update_status(f"**เบอร์ที่สามารถใช้ส่ง SMS ได้ (เบอร์ใหม่): {len(st.session_state.new_numbers_to_add)} เบอร์**")
-            
-            st.success("ประมวลผลสำเร็จ!")
-            st.toast(f"ประมวลผลเบอร์โทรศัพท์จากไฟล์ทั้งหมดสำเร็จ: {len(st.session_state.processed_numbers_from_file)} เบอร์\nเบอร์ใหม่ที่ไม่ซ้ำ: {len(st.session_state.new_numbers_to_add)} เบอร์")
-
-        else:
-            st.warning("โปรดอัปโหลดไฟล์เบอร์โทรศัพท์ก่อน")
-
-with col_check:
-    if st.button("ตรวจสอบเบอร์ซ้ำ (ไม่บันทึก)", key="check_only_button"):
-        if st.session_state.uploaded_files:
-            st.session_state.processed_numbers_from_file.clear()
-            st.session_state.new_numbers_to_add.clear() 
-            st.session_state.duplicates_found.clear()
-            st.session_state.is_checked_only = True
-
-            all_numbers_from_files = set()
-            for uploaded_file in st.session_state.uploaded_files:
-                filename = uploaded_file.name
-                update_status(f"กำลังตรวจสอบไฟล์: {filename}")
-                
-                try:
-                    numbers_from_file = set()
-                    if filename.endswith('.txt'):
-                        lines = uploaded_file.read().decode('utf-8').splitlines()
-                        for line in lines:
-                            num = normalize_phone_number(line.strip())
-                            if num:
-                                numbers_from_file.add(num)
-                    elif filename.endswith('.xlsx'):
-                        df = pd.read_excel(uploaded_file, engine='openpyxl')
-                        column_name = None
-                        for col in df.columns:
-                            if 'phone' in str(col).lower() or 'number' in str(col).lower():
-                                column_name = col
-                                break
-                        if column_name is None and len(df.columns) > 0:
-                            column_name = df.columns[0]
-                        
-                        if column_name is not None:
-                            for num_raw in df[column_name].dropna():
-                                num = normalize_phone_number(num_raw)
-                                if num:
-                                    numbers_from_file.add(num)
-                        else:
-                            st.warning(f"ไฟล์ {filename}: ไม่พบคอลัมน์ที่เหมาะสมสำหรับเบอร์โทรศัพท์")
-
-                    all_numbers_from_files.update(numbers_from_file)
-                except Exception as e:
-                    st.error(f"ข้อผิดพลาดในการประมวลผลไฟล์ {filename}: {e}")
-
-            st.session_state.processed_numbers_from_file = all_numbers_from_files
-            st.session_state.combined_numbers = get_all_numbers_from_file(COMBINED_NUMBERS_FILE)
-            st.session_state.duplicates_found = st.session_state.processed_numbers_from_file.intersection(st.session_state.combined_numbers)
-            st.session_state.new_numbers_to_add = st.session_state.processed_numbers_from_file - st.session_state.combined_numbers # Populate new_numbers_to_add even in check-only mode for download
-
-            update_status(f"ตรวจสอบเบอร์ทั้งหมดสำเร็จ")
-            if st.session_state.duplicates_found:
-                update_status(f"**พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์: {len(st.session_state.duplicates_found)} เบอร์**")
-                st.success("ตรวจสอบเบอร์ซ้ำสำเร็จ!")
-                st.toast(f"พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์: {len(st.session_state.duplicates_found)} เบอร์")
-            else:
-                update_status("ไม่พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์ในไฟล์ที่อัปโหลด")
-                st.success("ไม่พบเบอร์ที่ซ้ำ!")
-                st.toast("ไม่พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์ในไฟล์ที่อัปโหลด")
-        else:
-            st.warning("โปรดอัปโหลดไฟล์เบอร์โทรศัพท์ก่อน")
-
-
-### 2. ผลลัพธ์และตัวเลือกการดำเนินการ
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.info("#### ข้อมูลสถานะ")
-    for message in st.session_state.status_message:
-        st.text(message)
-    
-    st.markdown("---")
-    st.info("#### ผลลัพธ์เบอร์")
-    if st.session_state.new_numbers_to_add:
-        st.text_area("เบอร์ใหม่ที่สามารถใช้ได้", "\n".join([hide_last_four_digits(n) for n in list(st.session_state.new_numbers_to_add)]), height=200, key="new_numbers_display")
-    if st.session_state.duplicates_found:
-        st.text_area("เบอร์ที่ซ้ำกับไฟล์รวมเบอร์", "\n".join([hide_last_four_digits(n) for n in list(st.session_state.duplicates_found)]), height=200, key="duplicates_display")
-    
-    # New: Display search results
-    if st.session_state.search_found_numbers:
-        st.markdown("---")
-        st.info("#### ผลการค้นหา (พบเบอร์ในไฟล์รวม)")
-        st.text_area("เบอร์ที่พบ", "\n".join([hide_last_four_digits(n) for n in sorted(list(st.session_state.search_found_numbers))]), height=150, key="search_found_display")
-    if st.session_state.search_not_found_numbers:
-        st.markdown("---")
-        st.warning("#### ผลการค้นหา (ไม่พบเบอร์ในไฟล์รวม)")
-        st.text_area("เบอร์ที่ไม่พบ", "\n".join([hide_last_four_digits(n) for n in sorted(list(st.session_state.search_not_found_numbers))]), height=150, key="search_not_found_display")
-
-
-with col2:
-    st.success("#### บันทึกและส่งออก")
-    
-    save_password = st.text_input("รหัสผ่านสำหรับบันทึก", type="password", key='save_password_input')
-
-    if st.button("บันทึกลงไฟล์รวมเบอร์", key="save_to_combined_button"):
-        if save_password == "aa123456":
-            if not st.session_state.uploaded_files or st.session_state.is_checked_only:
-                st.warning("โปรดประมวลผลไฟล์ก่อนบันทึก")
-            else:
-                already_uploaded = [f.name for f in st.session_state.uploaded_files if check_file_uploaded_before(f.name)]
-                if already_uploaded:
-                    st.warning(f"ไฟล์เหล่านี้เคยถูกบันทึกแล้ว: {', '.join(already_uploaded)} คุณแน่ใจหรือไม่ว่าต้องการบันทึกซ้ำ?")
-                    if st.button("ยืนยันบันทึกซ้ำ", key="confirm_overwrite_button"):
-                        new_count = insert_numbers_to_file(st.session_state.new_numbers_to_add)
-                        for f in st.session_state.uploaded_files:
-                            record_uploaded_file(f.name)
-                        
-                        st.session_state.combined_numbers = get_all_numbers_from_file(COMBINED_NUMBERS_FILE)
-                        update_status(f"บันทึกเบอร์ใหม่ {new_count} เบอร์")
-                        update_status(f"จำนวนเบอร์ในไฟล์รวมเบอร์: {len(st.session_state.combined_numbers)} เบอร์")
-                        st.success(f"บันทึกสำเร็จ! เพิ่มเบอร์ใหม่ {new_count} เบอร์")
-                        st.toast(f"บันทึกเบอร์ใหม่สำเร็จ: {new_count} เบอร์")
-                        st.rerun() 
-                    else:
-                        st.stop()
-                else:
-                    new_count = insert_numbers_to_file(st.session_state.new_numbers_to_add)
-                    for f in st.session_state.uploaded_files:
-                        record_uploaded_file(f.name)
-                    
-                    st.session_state.combined_numbers = get_all_numbers_from_file(COMBINED_NUMBERS_FILE)
-                    update_status(f"บันทึกเบอร์ใหม่ {new_count} เบอร์")
-                    update_status(f"จำนวนเบอร์ในไฟล์รวมเบอร์: {len(st.session_state.combined_numbers)} เบอร์")
-                    st.success(f"บันทึกสำเร็จ! เพิ่มเบอร์ใหม่ {new_count} เบอร์")
-                    st.toast(f"บันทึกเบอร์ใหม่สำเร็จ: {new_count} เบอร์")
-                    st.rerun()
-
-        elif save_password != "":
-            st.error("รหัสผ่านไม่ถูกต้องสำหรับการบันทึก")
-        else:
-            st.warning("โปรดใส่รหัสผ่านสำหรับการบันทึก")
-            
-    st.markdown("---")
-    
-    export_format = st.radio("เลือกรูปแบบไฟล์ส่งออก", ['txt', 'xlsx'], horizontal=True, key='export_format_radio')
-
-    def download_button(label, data, file_name, mime, button_key, requires_password=False):
-        can_download = True
-        if requires_password:
-            download_password_for_all = st.text_input("รหัสผ่านสำหรับดาวน์โหลด (เบอร์ทั้งหมด)", type="password", key=f'download_{button_key}_password_input')
-            if download_password_for_all != "aa123456":
-                st.warning("โปรดใส่รหัสผ่านที่ถูกต้องเพื่อดาวน์โหลดเบอร์ทั้งหมด")
-                can_download = False
-
-        if can_download:
-            st.download_button(
-                label=label,
-                data=data,
-                file_name=file_name,
-                mime=mime,
-                key=button_key
-            )
-        
-
-    if st.session_state.new_numbers_to_add:
-        download_button(
-            label=f"ดาวน์โหลดเบอร์ใหม่ ({len(st.session_state.new_numbers_to_add)} เบอร์)",
-            data=create_export_file(st.session_state.new_numbers_to_add, export_format),
-            file_name=f"new_numbers.{export_format}",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if export_format == 'xlsx' else "text/plain",
-            button_key="download_new_button",
-            requires_password=False
-        )
-    if st.session_state.duplicates_found:
-        download_button(
-            label=f"ดาวน์โหลดเบอร์ที่ซ้ำ ({len(st.session_state.duplicates_found)} เบอร์)",
-            data=create_export_file(st.session_state.duplicates_found, export_format),
-            file_name=f"duplicate_numbers.{export_format}",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if export_format == 'xlsx' else "text/plain",
-            button_key="download_duplicates_button",
-            requires_password=False
-        )
-    if st.session_state.combined_numbers:
-        download_button(
-            label=f"ดาวน์โหลดเบอร์ทั้งหมดในไฟล์รวมเบอร์ ({len(st.session_state.combined_numbers)} เบอร์)",
-            data=create_export_file(st.session_state.combined_numbers, export_format),
-            file_name=f"all_combined_numbers.{export_format}",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if export_format == 'xlsx' else "text/plain",
-            button_key="download_all_combined_button",
-            requires_password=True
-        )
-    
-    # New: Download button for searched numbers found in the combined file
-    if st.session_state.search_found_numbers:
-        st.markdown("---")
-        download_button(
-            label=f"ดาวน์โหลดเบอร์ที่พบในการค้นหา ({len(st.session_state.search_found_numbers)} เบอร์)",
-            data=create_export_file(st.session_state.search_found_numbers, export_format),
-            file_name=f"found_search_numbers.{export_format}",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" if export_format == 'xlsx' else "text/plain",
-            button_key="download_search_found_button",
-            requires_password=False # No password needed for this specific download
-        )
-
-
-### 3. ค้นหาเบอร์โทรศัพท์
-
-search_number_input = st.text_area("ป้อนเบอร์โทรศัพท์ที่ต้องการค้นหา (สามารถวางได้หลายเบอร์, คั่นด้วยบรรทัดใหม่)", key='search_number_input', height=150)
-
-if st.button("ค้นหาเบอร์", key="search_button"):
-    if search_number_input:
-        st.session_state.search_found_numbers.clear()
-        st.session_state.search_not_found_numbers.clear()
-
-        raw_numbers = search_number_input.strip().splitlines()
-        
-        for raw_num in raw_numbers:
-            normalized_search_number = normalize_phone_number(raw_num.strip())
-            if normalized_search_number:
-                if normalized_search_number in st.session_state.combined_numbers:
-                    st.session_state.search_found_numbers.add(normalized_search_number)
-                else:
-                    st.session_state.search_not_found_numbers.add(normalized_search_number)
-            else:
-                update_status(f"รูปแบบเบอร์โทรศัพท์ไม่ถูกต้อง: {raw_num.strip()} (ไม่ถูกประมวลผลในการค้นหา)")
-        
-        if st.session_state.search_found_numbers:
-            st.success(f"พบเบอร์ {len(st.session_state.search_found_numbers)} เบอร์ ในไฟล์รวมเบอร์")
-            update_status(f"ค้นหา: พบเบอร์ {len(st.session_state.search_found_numbers)} เบอร์")
-        if st.session_state.search_not_found_numbers:
-            st.warning(f"ไม่พบเบอร์ {len(st.session_state.search_not_found_numbers)} เบอร์ ในไฟล์รวมเบอร์")
-            update_status(f"ค้นหา: ไม่พบเบอร์ {len(st.session_state.search_not_found_numbers)} เบอร์")
-        
-        if not st.session_state.search_found_numbers and not st.session_state.search_not_found_numbers:
-            st.warning("ไม่พบเบอร์โทรศัพท์ที่ถูกต้องในข้อมูลที่ป้อน")
-            update_status("ค้นหา: ไม่พบเบอร์โทรศัพท์ที่ถูกต้อง")
-
-    else:
-        st.warning("โปรดป้อนเบอร์โทรศัพท์ที่ต้องการค้นหา")
-
-
-# การจัดการไฟล์ข้อมูล
-
-clear_password = st.text_input("รหัสผ่านสำหรับล้างไฟล์รวมเบอร์", type="password", key='clear_password_input')
-
-if st.button("ล้างไฟล์รวมเบอร์", key="clear_combined_button"):
-    if clear_password == "5555+":
-        st.warning("คุณแน่ใจหรือไม่ว่าต้องการลบเบอร์ทั้งหมดในไฟล์รวมเบอร์? การดำเนินการนี้ไม่สามารถย้อนกลับได้!")
-        
-        if st.button("ยืนยันการลบ", key='confirm_clear_button'):
-            try:
-                with open(COMBINED_NUMBERS_FILE, 'w', encoding='utf-8') as f:
-                    f.write("")
-                with open(UPLOADED_FILES_LOG, 'w', encoding='utf-8') as f:
-                    f.write("")
-                st.session_state.combined_numbers = set()
-                st.success("ลบเบอร์ในไฟล์รวมเบอร์ทั้งหมดเรียบร้อยแล้ว")
-                st.session_state.status_message.append("ไฟล์รวมเบอร์ถูกลบแล้ว")
-                st.rerun()
-            except Exception as e:
-                st.error(f"ข้อผิดพลาดในการลบ: {e}")
-    elif clear_password != "":
-        st.error("รหัสผ่านไม่ถูกต้อง")
\ No newline at end of file
+import streamlit as st
+import numpy as np
+import os
+import sqlite3
+import uuid
+from contextlib import closing
+from functools import partial
+
+from number_manager import (
+    ACTIVE_JOB_STATUSES,
+    COMBINED_NUMBERS_FILE,
+    EXPORT_MIME_TYPES,
+    JOB_PROCESSES,
+    JOB_WORKERS,
+    JOBS_DB_FILE,
+    JOBS_DIR,
+    METRICS,
+    NUMBERS_DB_FILE,
+    SET_OPERATIONS,
+    ExportCache,
+    JobQueue,
+    NoPhoneColumnError,
+    ParsedFileCache,
+    check_file_uploaded_before,
+    clear_numbers_store,
+    count_numbers,
+    combine_numbers,
+    create_export_file,
+    create_job_handlers,
+    create_list,
+    decode_numbers,
+    delete_list,
+    encode_numbers,
+    get_db_connection,
+    get_lists,
+    get_restore_points,
+    hash_file_content,
+    iter_phone_number_chunks,
+    load_list_numbers,
+    migrate_numbers_from_file,
+    normalize_phone_numbers,
+    prefix_range,
+    restore_master_version,
+    search_numbers,
+    shared_master_cache,
+)
+
+# --- การตั้งค่าไฟล์สำหรับเก็บข้อมูล ---
+# แคชผลการอ่านไฟล์ (ตาม content hash): ขนาดในหน่วยความจำ, โฟลเดอร์บนดิสก์ (None = ไม่เก็บลงดิสก์) และขนาดบนดิสก์
+PARSED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+PARSED_CACHE_DIR = '.parsed_cache'
+PARSED_CACHE_MAX_DISK_BYTES = 1024 * 1024 * 1024
+# ขนาดรวมสูงสุดของไฟล์ส่งออกที่จำไว้ในหน่วยความจำ
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# จำนวนเบอร์ที่แสดงต่อหน้าในส่วนผลลัพธ์
+RESULTS_PAGE_SIZE = 100
+# จำนวนงานล่าสุดที่แสดงในส่วนงานเบื้องหลัง และหน้าเว็บตรวจความคืบหน้าของงานทุกกี่วินาที
+RECENT_JOBS_SHOWN = 5
+JOB_REFRESH_SECONDS = 1
+JOB_KIND_LABELS = {
+    'process': "ประมวลผลไฟล์",
+    'check': "ตรวจสอบเบอร์ซ้ำ",
+    'save': "บันทึกลงไฟล์รวมเบอร์",
+    'export': "เตรียมไฟล์เบอร์ทั้งหมด",
+}
+RESTORE_POINT_LABELS = {
+    'add': "บันทึกเบอร์ใหม่ {rows} เบอร์",
+    'clear': "ล้างไฟล์รวมเบอร์",
+    'restore': "กู้คืนเวอร์ชันก่อนหน้า",
+    'snapshot': "snapshot",
+}
+JOB_STATUS_LABELS = {
+    'queued': "รอคิว",
+    'running': "กำลังทำ",
+    'done': "เสร็จแล้ว",
+    'failed': "ล้มเหลว",
+    'cancelled': "ยกเลิกแล้ว",
+}
+# ชื่อที่แสดงของการดำเนินการกับรายการ (ดู SET_OPERATIONS)
+SET_OPERATION_LABELS = {
+    'union': "รวมกัน (อยู่ในรายการใดรายการหนึ่ง)",
+    'intersection': "ตัดกัน (อยู่ในทั้งสองรายการ)",
+    'difference': "ลบ (อยู่ในรายการแรกแต่ไม่อยู่ในรายการที่สอง)",
+}
+
+# --- ฟังก์ชันช่วยทำงาน ---
+# ฐานข้อมูล การอ่านไฟล์ และการส่งออกอยู่ในแพ็กเกจ number_manager (ใช้ร่วมกับ CLI: python -m number_manager)
+def get_master_cache(list_name=None):
+    """
+    แคชเบอร์รวม (หรือเบอร์ของรายการ list_name) ที่ใช้ร่วมกันทั้งโปรเซส (ทุกแท็บ/ทุกผู้ใช้และงานเบื้องหลัง)
+    เก็บเป็น uint32 เรียงลำดับ
+    """
+    return shared_master_cache(NUMBERS_DB_FILE, list_name)
+
+def get_master_snapshot(list_name=None):
+    """
+    คืนค่า (เวอร์ชันของฐานข้อมูลหรือของรายการ, เบอร์ทั้งหมดเป็น numpy array uint32 เรียงลำดับ)
+    โหลดจากฐานข้อมูลใหม่เฉพาะเมื่อเวอร์ชันเปลี่ยน
+    """
+    return get_master_cache(list_name).snapshot()
+
+def get_master_numbers(list_name=None):
+    """
+    คืนค่าเบอร์รวมทั้งหมด (หรือเบอร์ของรายการ list_name) เป็น numpy array (uint32 เรียงลำดับ)
+    """
+    return get_master_snapshot(list_name)[1]
+
+def get_active_list():
+    """
+    รายการ/แคมเปญที่เลือกไว้ในแถบด้านข้าง หรือ None ถ้าใช้เบอร์รวมทั้งหมด
+    """
+    return st.session_state.get('active_list')
+
+def find_search_results(encoded, list_name=None):
+    """
+    ค้นหาเบอร์ทั้งชุดในเบอร์รวม (หรือในรายการ list_name) ครั้งเดียว คืนค่า (เบอร์ที่พบ, เบอร์ที่ไม่พบ) เป็น uint32 เรียงลำดับ
+    """
+    return search_numbers(encoded, get_master_numbers(list_name))
+
+def load_list_for_operation(list_name, seen_within_days):
+    """
+    เบอร์ของรายการสำหรับ combine_numbers: ใช้แคชของรายการถ้าไม่จำกัดวัน ไม่เช่นนั้นอ่านจากฐานข้อมูลตามช่วงเวลา
+    """
+    if not seen_within_days:
+        return get_master_numbers(list_name)
+    with closing(get_db_connection(NUMBERS_DB_FILE)) as conn:
+        return load_list_numbers(conn, list_name, seen_within_days)
+
+def create_list_clicked():
+    """
+    สร้างรายการจากชื่อที่กรอกในแถบด้านข้าง แล้วเลือกรายการนั้น (เรียกก่อนรันสคริปต์ จึงแก้ค่าของ selectbox ได้)
+    """
+    list_name = st.session_state.new_list_name.strip()
+    if not list_name:
+        st.session_state.list_message = ("warning", "โปรดใส่ชื่อรายการ")
+        return
+    try:
+        create_list(list_name)
+    except sqlite3.Error as e:
+        st.session_state.list_message = ("error", f"สร้างรายการไม่สำเร็จ: {e}")
+        return
+    st.session_state.active_list = list_name
+    st.session_state.new_list_name = ""
+    st.session_state.list_message = ("success", f"สร้างรายการ {list_name} แล้ว")
+
+@st.cache_resource
+def get_parsed_file_cache():
+    """
+    แคชเบอร์ที่อ่านได้จากแต่ละไฟล์ ใช้ร่วมกันทั้งโปรเซส กดตรวจสอบ/ประมวลผลไฟล์เดิมซ้ำจึงไม่ต้องอ่านใหม่
+    """
+    return ParsedFileCache(PARSED_CACHE_MAX_BYTES, PARSED_CACHE_DIR, PARSED_CACHE_MAX_DISK_BYTES)
+
+@st.cache_resource
+def get_job_queue():
+    """
+    คิวงานเบื้องหลังที่ใช้ร่วมกันทั้งโปรเซส งานประมวลผล ตรวจสอบ บันทึก และส่งออกทำในนี้
+    จึงไม่ถูกยกเลิกเมื่อผู้ใช้กดปุ่มอื่นระหว่างรอ และไม่ทำให้เธรดของหน้าเว็บค้าง
+    """
+    queue = JobQueue(
+        create_job_handlers(NUMBERS_DB_FILE, get_parsed_file_cache()),
+        JOBS_DB_FILE, JOBS_DIR, JOB_WORKERS, JOB_PROCESSES,
+    )
+    queue.start()
+    return queue
+
+def get_client_id():
+    """
+    รหัสของผู้ใช้ (เบราว์เซอร์) เก็บไว้ใน URL (?client=...) รีเฟรชหรือเชื่อมต่อใหม่จึงยังเห็นงานเดิมของตัวเอง
+    """
+    if 'client' not in st.query_params:
+        st.query_params['client'] = uuid.uuid4().hex
+    return st.query_params['client']
+
+def submit_job(kind, params=None, inputs=()):
+    """
+    ส่งงานเข้าคิวในนามของผู้ใช้นี้ และจำไว้เพื่อนำผลมาแสดงเมื่องานจบ คืนค่า id ของงาน หรือ None ถ้าส่งไม่สำเร็จ
+    """
+    try:
+        job_id = get_job_queue().submit(kind, get_client_id(), params, inputs)
+    except (sqlite3.Error, OSError) as e:
+        st.error(f"เกิดข้อผิดพลาด: ไม่สามารถส่งงานเข้าคิวได้: {e}")
+        return None
+    st.session_state.pending_jobs.append(job_id)
+    update_status(f"ส่งงาน{JOB_KIND_LABELS[kind]}เข้าคิวแล้ว")
+    return job_id
+
+def get_job_file(job_id, name):
+    """
+    path ของไฟล์ผลลัพธ์ name ในโฟลเดอร์ของงาน
+    """
+    return os.path.join(get_job_queue().job_directory(job_id), name)
+
+def read_job_file_bytes(job_id, name):
+    with open(get_job_file(job_id, name), 'rb') as f:
+        return f.read()
+
+def apply_job_result(job):
+    """
+    นำผลของงานที่จบแล้วมาใช้ในหน้าเว็บ (ครั้งเดียวต่องาน) เช่นโหลดเบอร์ใหม่/เบอร์ซ้ำของงานประมวลผลเข้า session state
+    """
+    kind, result = job['kind'], job['result']
+    if job['status'] == 'failed':
+        st.error(f"งาน{JOB_KIND_LABELS[kind]}ล้มเหลว: {job['error']}")
+        update_status(f"งาน{JOB_KIND_LABELS[kind]}ล้มเหลว")
+        return
+    if job['status'] == 'cancelled':
+        update_status(f"ยกเลิกงาน{JOB_KIND_LABELS[kind]}แล้ว")
+        return
+
+    if kind in ('process', 'check'):
+        for level, message in result['messages']:
+            update_status(message)
+            if level != 'info':
+                getattr(st, level)(message)
+        try:
+            processed, new_numbers, duplicates = (
+                np.load(get_job_file(job['id'], name)) for name in ('processed.npy', 'new.npy', 'duplicates.npy')
+            )
+        except OSError:
+            st.warning("ผลของงานนี้ถูกลบไปแล้ว โปรดประมวลผลไฟล์ใหม่")
+            return
+        st.session_state.processed_numbers_from_file = processed
+        st.session_state.new_numbers_to_add = new_numbers
+        st.session_state.duplicates_found = duplicates
+        st.session_state.uploaded_file_info = {content_hash: tuple(info) for content_hash, info in result['file_info'].items()}
+        st.session_state.results_list = result['list_name']
+        st.session_state.results_job = job['id']
+        st.session_state.is_checked_only = kind == 'check'
+        st.session_state.results_token = uuid.uuid4().hex
+        st.session_state.combined_count = count_numbers(NUMBERS_DB_FILE)
+
+        if kind == 'process':
+            update_status("ประมวลผลไฟล์ทั้งหมดสำเร็จ")
+            update_status(f"พบเบอร์โทรศัพท์ทั้งหมด (หลังลบซ้ำและกรอง): {len(processed)} เบอร์")
+            update_status(f"**เบอร์ที่สามารถใช้ส่ง SMS ได้ (เบอร์ใหม่): {len(new_numbers)} เบอร์**")
+            st.success("ประมวลผลสำเร็จ!")
+            st.toast(f"ประมวลผลเบอร์โทรศัพท์จากไฟล์ทั้งหมดสำเร็จ: {len(processed)} เบอร์\nเบอร์ใหม่ที่ไม่ซ้ำ: {len(new_numbers)} เบอร์")
+        elif len(duplicates):
+            update_status("ตรวจสอบเบอร์ทั้งหมดสำเร็จ")
+            update_status(f"**พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์: {len(duplicates)} เบอร์**")
+            st.success("ตรวจสอบเบอร์ซ้ำสำเร็จ!")
+            st.toast(f"พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์: {len(duplicates)} เบอร์")
+        else:
+            update_status("ตรวจสอบเบอร์ทั้งหมดสำเร็จ")
+            update_status("ไม่พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์ในไฟล์ที่อัปโหลด")
+            st.success("ไม่พบเบอร์ที่ซ้ำ!")
+            st.toast("ไม่พบเบอร์ที่ซ้ำกับไฟล์รวมเบอร์ในไฟล์ที่อัปโหลด")
+    elif kind == 'save':
+        new_count = result['inserted'] if result['list_name'] is None else result['list_added']
+        st.session_state.combined_count = count_numbers(NUMBERS_DB_FILE)
+        update_status(f"บันทึกเบอร์ใหม่ {new_count} เบอร์")
+        update_status(f"จำนวนเบอร์ในไฟล์รวมเบอร์: {st.session_state.combined_count} เบอร์")
+        st.success(f"บันทึกสำเร็จ! เพิ่มเบอร์ใหม่ {new_count} เบอร์")
+        st.toast(f"บันทึกเบอร์ใหม่สำเร็จ: {new_count} เบอร์")
+    elif kind == 'export':
+        st.session_state.export_results[(result['list_name'], result['format'])] = (result['version'], job['id'], result['file'])
+
+def restore_client_jobs():
+    """
+    สำหรับ session ใหม่ (รีเฟรชหน้าหรือเชื่อมต่อใหม่): คืนค่า id ของงานที่ยังค้างอยู่ของผู้ใช้นี้
+    รวมกับงานประมวลผล/ตรวจสอบและงานส่งออกล่าสุดที่จบแล้ว เพื่อนำผลกลับมาแสดงโดยไม่ต้องทำใหม่ (เรียงจากเก่าไปใหม่)
+    """
+    try:
+        jobs = get_job_queue().list_jobs(get_client_id())
+    except sqlite3.Error as e:
+        st.error(f"เกิดข้อผิดพลาด: ไม่สามารถอ่านคิวงานได้: {e}")
+        return []
+    restored, restored_kinds = [], set()
+    for job in jobs:
+        if job['status'] in ACTIVE_JOB_STATUSES:
+            restored.append(job['id'])
+        elif job['status'] == 'done' and job['kind'] != 'save':
+            group = 'export' if job['kind'] == 'export' else 'results'
+            if group not in restored_kinds:
+                restored_kinds.add(group)
+                restored.append(job['id'])
+    return restored[::-1]
+
+def collect_finished_jobs():
+    """
+    นำผลของงานที่ผู้ใช้นี้ส่งไว้และจบแล้วมาใช้ งานที่ยังไม่จบรอตรวจในรอบถัดไป
+    """
+    queue = get_job_queue()
+    still_pending = []
+    for job_id in st.session_state.pending_jobs:
+        job = queue.get_job(job_id)
+        if job is None:
+            continue
+        if job['status'] in ACTIVE_JOB_STATUSES:
+            still_pending.append(job_id)
+        else:
+            apply_job_result(job)
+    st.session_state.pending_jobs = still_pending
+
+def show_jobs():
+    """
+    แสดงงานล่าสุดของผู้ใช้นี้พร้อมความคืบหน้า (เรียกผ่าน st.fragment ให้รันซ้ำเองระหว่างมีงานค้าง)
+    เมื่องานที่รอผลอยู่จบจะรันทั้งหน้าใหม่เพื่อแสดงผลลัพธ์
+    """
+    queue = get_job_queue()
+    jobs = queue.list_jobs(get_client_id(), RECENT_JOBS_SHOWN)
+    for job in jobs:
+        label = f"{JOB_KIND_LABELS.get(job['kind'], job['kind'])}: {JOB_STATUS_LABELS.get(job['status'], job['status'])}"
+        if job['status'] == 'queued':
+            position = queue.queue_position(job['id'])
+            st.caption(f"{label} (มีงานรอก่อนหน้า {position or 0} งาน)")
+        elif job['status'] == 'running':
+            st.progress(job['progress'], text=f"{label} {job['message'] or ''}")
+        else:
+            st.caption(label if job['status'] != 'failed' else f"{label}: {job['error']}")
+        if job['status'] in ACTIVE_JOB_STATUSES and st.button("ยกเลิก", key=f"cancel_job_{job['id']}"):
+            queue.cancel(job['id'])
+    if any(job['id'] in st.session_state.pending_jobs and job['status'] not in ACTIVE_JOB_STATUSES for job in jobs):
+        st.rerun()
+
+def hide_last_four_digits(number):
+    """ซ่อนเลขท้าย 4 ตัวของเบอร์โทรศัพท์"""
+    if len(number) > 4:
+        return number[:-4] + "XXXX"
+    return "XXXX"
+
+@st.cache_resource
+def get_export_cache():
+    """
+    แคชไฟล์ส่งออกที่ใช้ร่วมกันทั้งโปรเซส
+    """
+    return ExportCache(EXPORT_CACHE_MAX_BYTES)
+
+def lazy_export_file(cache_key, numbers, file_format):
+    """
+    คืนฟังก์ชันที่สร้างไฟล์ส่งออกเมื่อผู้ใช้กดดาวน์โหลดจริงเท่านั้น (ใช้กับ st.download_button)
+    ผลจะถูกจำไว้ตาม (cache_key, รูปแบบไฟล์) โดย cache_key ต้องเปลี่ยนทุกครั้งที่ชุดเบอร์เปลี่ยน
+    """
+    export_cache = get_export_cache()
+    return lambda: export_cache.get_or_create((cache_key, file_format), lambda: create_export_file(numbers, file_format))
+
+# --- ตั้งค่า Session State สำหรับ Streamlit ---
+if 'processed_numbers_from_file' not in st.session_state: # ผลของงานประมวลผล/ตรวจสอบล่าสุด (uint32 เรียงลำดับ)
+    st.session_state.processed_numbers_from_file = np.empty(0, dtype=np.uint32)
+if 'new_numbers_to_add' not in st.session_state:
+    st.session_state.new_numbers_to_add = np.empty(0, dtype=np.uint32)
+if 'duplicates_found' not in st.session_state:
+    st.session_state.duplicates_found = np.empty(0, dtype=np.uint32)
+if 'combined_count' not in st.session_state:
+    migrate_numbers_from_file()
+    # อ่านจำนวนที่จำไว้ในฐานข้อมูล ไม่ต้องโหลดเบอร์รวมทั้งหมดตอนเปิดหน้าเว็บ
+    st.session_state.combined_count = count_numbers(NUMBERS_DB_FILE)
+if 'status_message' not in st.session_state:
+    st.session_state.status_message = ["ยินดีต้อนรับสู่โปรแกรมจัดการเบอร์โทรศัพท์!"]
+if 'is_checked_only' not in st.session_state:
+    st.session_state.is_checked_only = False
+if 'uploaded_files' not in st.session_state:
+    st.session_state.uploaded_files = []
+if 'uploaded_file_info' not in st.session_state: # content hash -> (ชื่อไฟล์, ขนาดไฟล์, จำนวนเบอร์) ของไฟล์ที่ประมวลผลล่าสุด
+    st.session_state.uploaded_file_info = {}
+if 'results_token' not in st.session_state: # เปลี่ยนทุกครั้งที่ผลประมวลผลเปลี่ยน ใช้เป็นกุญแจแคชไฟล์ส่งออก
+    st.session_state.results_token = uuid.uuid4().hex
+if 'search_token' not in st.session_state: # เปลี่ยนทุกครั้งที่ผลการค้นหาเปลี่ยน
+    st.session_state.search_token = uuid.uuid4().hex
+if 'result_views' not in st.session_state: # ชื่อผลลัพธ์ -> (token, uint32 array เรียงลำดับ) สำหรับแสดงทีละหน้า
+    st.session_state.result_views = {}
+if 'search_found_numbers' not in st.session_state: # New: To store numbers found during search (uint32 เรียงลำดับ)
+    st.session_state.search_found_numbers = np.empty(0, dtype=np.uint32)
+if 'search_not_found_numbers' not in st.session_state: # New: To store numbers not found during search (uint32 เรียงลำดับ)
+    st.session_state.search_not_found_numbers = np.empty(0, dtype=np.uint32)
+if 'search_target' not in st.session_state: # ชื่อของสิ่งที่ค้นหาล่าสุด ('ไฟล์รวมเบอร์' หรือ 'รายการ ...') ใช้ในข้อความผลการค้นหา
+    st.session_state.search_target = "ไฟล์รวมเบอร์"
+if 'results_list' not in st.session_state: # รายการที่ใช้เทียบตอนประมวลผลล่าสุด (None = เบอร์รวม) การบันทึกจะเข้ารายการนี้
+    st.session_state.results_list = None
+if 'results_job' not in st.session_state: # id ของงานประมวลผล/ตรวจสอบที่ให้ผลล่าสุด (งานบันทึกอ่านเบอร์จากงานนี้)
+    st.session_state.results_job = None
+if 'export_results' not in st.session_state: # (รายการ, รูปแบบไฟล์) -> (เวอร์ชัน, id ของงาน, ชื่อไฟล์) ของไฟล์เบอร์ทั้งหมดที่เตรียมไว้
+    st.session_state.export_results = {}
+if 'list_operation_numbers' not in st.session_state: # ผลการรวม/ตัด/ลบรายการล่าสุด (uint32 เรียงลำดับ)
+    st.session_state.list_operation_numbers = np.empty(0, dtype=np.uint32)
+    st.session_state.list_operation_label = ""
+    st.session_state.list_operation_token = uuid.uuid4().hex
+
+def update_status(message):
+    st.session_state.status_message.append(message)
+
+def report_file_error(filename, error):
+    """
+    แสดงข้อผิดพลาดของไฟล์ที่อ่านไม่สำเร็จ
+    """
+    if isinstance(error, NoPhoneColumnError):
+        st.warning(f"ไฟล์ {filename}: ไม่พบคอลัมน์ที่เหมาะสมสำหรับเบอร์โทรศัพท์")
+    else:
+        st.error(f"ข้อผิดพลาดในการประมวลผลไฟล์ {filename}: {error}")
+
+def read_uploaded_numbers(uploaded_file):
+    """
+    อ่านเบอร์ทั้งหมดจากไฟล์ที่อัปโหลดแบบสตรีม พร้อมแถบความคืบหน้าของไฟล์นั้น
+    """
+    numbers_from_file = set()
+    progress_bar = st.progress(0.0, text=f"กำลังอ่านไฟล์: {uploaded_file.name}")
+    for numbers, progress in iter_phone_number_chunks(uploaded_file):
+        numbers_from_file.update(numbers)
+        if progress is not None:
+            progress_bar.progress(min(progress, 1.0), text=f"{uploaded_file.name}: พบเบอร์ {len(numbers_from_file)} เบอร์")
+    progress_bar.progress(1.0, text=f"{uploaded_file.name}: พบเบอร์ {len(numbers_from_file)} เบอร์")
+    return numbers_from_file
+
+def read_search_file(uploaded_file):
+    """
+    อ่านเบอร์ที่ต้องการค้นหาจากไฟล์ คืนค่าเป็น uint32 ไม่ซ้ำ ใช้แคชผลการอ่านตาม content hash
+    (ไม่ข้ามไฟล์ที่เคยบันทึกแล้วเหมือนตอนประมวลผล เพราะการค้นหาไม่ได้เพิ่มเบอร์)
+    """
+    parsed_cache = get_parsed_file_cache()
+    content_hash = hash_file_content(uploaded_file)
+    numbers = parsed_cache.get(content_hash)
+    if numbers is None:
+        numbers = np.unique(encode_numbers(read_uploaded_numbers(uploaded_file), skip_invalid=True))
+        parsed_cache.put(content_hash, numbers)
+    return numbers
+
+def set_search_results(encoded):
+    """
+    ค้นหาเบอร์ (uint32) ในเบอร์รวมหรือในรายการที่เลือก เก็บผลไว้ใน session state และแสดงสรุปผล
+    """
+    list_name = get_active_list()
+    found, not_found = find_search_results(encoded, list_name)
+    target = "ไฟล์รวมเบอร์" if list_name is None else f"รายการ {list_name}"
+    st.session_state.search_found_numbers = found
+    st.session_state.search_not_found_numbers = not_found
+    st.session_state.search_target = target
+    st.session_state.search_token = uuid.uuid4().hex
+
+    if len(found):
+        st.success(f"พบเบอร์ {len(found)} เบอร์ ใน{target}")
+        update_status(f"ค้นหา: พบเบอร์ {len(found)} เบอร์")
+    if len(not_found):
+        st.warning(f"ไม่พบเบอร์ {len(not_found)} เบอร์ ใน{target}")
+        update_status(f"ค้นหา: ไม่พบเบอร์ {len(not_found)} เบอร์")
+
+    if not len(found) and not len(not_found):
+        st.warning("ไม่พบเบอร์โทรศัพท์ที่ถูกต้องในข้อมูลที่ป้อน")
+        update_status("ค้นหา: ไม่พบเบอร์โทรศัพท์ที่ถูกต้อง")
+
+def show_number_pages(title, numbers, view_key, token, height=200):
+    """
+    แสดงชุดเบอร์ทีละหน้าแทนการต่อข้อความทั้งหมด ซ่อนเลขท้ายเฉพาะเบอร์ในหน้าที่แสดง
+    เรียงลำดับครั้งเดียวต่อผลลัพธ์ (ตาม token) แล้วกรองเลขขึ้นต้นและแบ่งหน้าด้วย searchsorted
+    """
+    views = st.session_state.result_views
+    if views.get(view_key, (None,))[0] != token:
+        encoded = numbers if isinstance(numbers, np.ndarray) else encode_numbers(numbers)
+        views[view_key] = (token, np.sort(encoded))
+    encoded = views[view_key][1]
+
+    filter_col, page_col = st.columns(2)
+    prefix = filter_col.text_input("กรองด้วยเลขขึ้นต้น", key=f"{view_key}_prefix", placeholder="เช่น 081")
+    first, last = np.searchsorted(encoded, prefix_range(prefix))
+    total = int(last - first)
+    page_count = max(1, -(-total // RESULTS_PAGE_SIZE))
+    page_key = f"{view_key}_page"
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = 1
+    page = page_col.number_input(f"หน้า (ทั้งหมด {page_count} หน้า)", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    start = first + (page - 1) * RESULTS_PAGE_SIZE
+    stop = min(start + RESULTS_PAGE_SIZE, last)
+    page_numbers = decode_numbers(encoded[start:stop])
+    st.text_area(f"{title} ({total} เบอร์)", "\n".join(hide_last_four_digits(n) for n in page_numbers), height=height)
+    if total:
+        st.caption(f"แสดงเบอร์ที่ {start - first + 1}-{stop - first} จาก {total} เบอร์")
+
+def show_diagnostics():
+    """
+    แสดงเวลาและปริมาณงานของแต่ละขั้นตอน (ดู number_manager.metrics) พร้อมดาวน์โหลดเป็น JSON หรือ Prometheus
+    """
+    snapshot = METRICS.snapshot()
+    peak_rss = snapshot['peak_rss_bytes']
+    if peak_rss is not None:
+        st.caption(f"หน่วยความจำสูงสุด (peak RSS): {peak_rss / (1024 * 1024):.1f} MB")
+    rows = [
+        {
+            "ขั้นตอน": name,
+            "ครั้ง": stats['calls'],
+            "เวลารวม (วินาที)": round(stats['seconds'], 3),
+            "นานสุด (วินาที)": round(stats['max_seconds'], 3),
+            "แถว": stats['rows'],
+            "แถว/วินาที": round(stats['rows_per_second']),
+            "MB": round(stats['bytes'] / (1024 * 1024), 2),
+        }
+        for name, stats in sorted(snapshot['stages'].items())
+    ]
+    if rows:
+        st.dataframe(rows, hide_index=True)
+    else:
+        st.caption("ยังไม่มีข้อมูล")
+    st.download_button("ดาวน์โหลด JSON", data=METRICS.to_json, file_name="metrics.json", mime="application/json", key="download_metrics_json", on_click="ignore")
+    st.download_button("ดาวน์โหลด Prometheus", data=METRICS.to_prometheus, file_name="metrics.prom", mime="text/plain", key="download_metrics_prometheus", on_click="ignore")
+    if st.button("ล้างข้อมูลวินิจฉัย", key="reset_metrics_button"):
+        METRICS.reset()
+        st.rerun()
+
+# --- ส่วนติดต่อผู้ใช้ (Streamlit UI) ---
+st.set_page_config(
+    page_title="SMS Marketing Number Manager",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+st.markdown(
+    """
+    <style>
+    .reportview-container .main .block-container{
+        max-width: 1000px;
+        padding-top: 2rem;
+        padding-right: 2rem;
+        padding-left: 2rem;
+        padding-bottom: 2rem;
+    }
+    .stButton>button {
+        width: 100%;
+        font-family: 'Kanit';
+    }
+    h1, h2, h3, h4, h5, h6, .st-font {
+        font-family: 'Kanit';
+    }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("โปรแกรมจัดการเบอร์โทรศัพท์สำหรับ SMS Marketing")
+
+# งานเบื้องหลัง: นำผลของงานที่จบแล้วมาใช้ก่อนแสดงส่วนอื่น
+if 'pending_jobs' not in st.session_state:
+    st.session_state.pending_jobs = restore_client_jobs()
+collect_finished_jobs()
+
+# รายการ/แคมเปญ: ตรวจเบอร์ซ้ำ ค้นหา และบันทึกเทียบกับรายการที่เลือก (เบอร์ที่บันทึกเข้ารายการจะอยู่ในเบอร์รวมด้วยเสมอ)
+try:
+    list_counts = {name: number_count for name, number_count, _ in get_lists()}
+except sqlite3.Error as e:
+    st.error(f"เกิดข้อผิดพลาด: ไม่สามารถอ่านรายการจากฐานข้อมูลได้: {e}")
+    list_counts = {}
+list_names = list(list_counts)
+if st.session_state.get('active_list') not in [None] + list_names:
+    st.session_state.active_list = None
+for list_key in ('operation_left_list', 'operation_right_list'):
+    if st.session_state.get(list_key) not in list_names:
+        st.session_state.pop(list_key, None)
+with st.sidebar:
+    st.selectbox(
+        "รายการ/แคมเปญ",
+        [None] + list_names,
+        format_func=lambda name: "เบอร์รวม (ทุกรายการ)" if name is None else name,
+        key="active_list",
+        help="เลือกรายการเพื่อตรวจเบอร์ซ้ำ ค้นหา และบันทึกเฉพาะรายการนั้น",
+    )
+    st.text_input("ชื่อรายการใหม่", key="new_list_name")
+    st.button("สร้างรายการ", key="create_list_button", on_click=create_list_clicked)
+    if 'list_message' in st.session_state:
+        level, message = st.session_state.pop('list_message')
+        getattr(st, level)(message)
+active_list = get_active_list()
+
+# แสดงจำนวนเบอร์ในไฟล์รวม
+st.info(f"**จำนวนเบอร์ในไฟล์รวมเบอร์: {st.session_state.combined_count} เบอร์**")
+if active_list is not None:
+    st.info(f"**จำนวนเบอร์ในรายการ {active_list}: {list_counts[active_list]} เบอร์**")
+
+### 1. อัปโหลดไฟล์เบอร์โทรศัพท์
+
+uploaded_files = st.file_uploader(
+    "เลือกไฟล์เบอร์ (.txt, .xlsx, .csv หรือ .tsv)",
+    type=['txt', 'xlsx', 'csv', 'tsv'],
+    accept_multiple_files=True,
+    help="สามารถเลือกได้หลายไฟล์พร้อมกัน",
+    key="file_uploader"
+)
+if uploaded_files:
+    st.session_state.uploaded_files = uploaded_files
+
+col_upload, col_check = st.columns(2)
+
+with col_upload:
+    if st.button("ประมวลผลไฟล์", key="process_button"):
+        if st.session_state.uploaded_files:
+            submit_job('process', {'list_name': active_list}, [(f.name, f.getvalue()) for f in st.session_state.uploaded_files])
+        else:
+            st.warning("โปรดอัปโหลดไฟล์เบอร์โทรศัพท์ก่อน")
+
+with col_check:
+    if st.button("ตรวจสอบเบอร์ซ้ำ (ไม่บันทึก)", key="check_only_button"):
+        if st.session_state.uploaded_files:
+            submit_job('check', {'list_name': active_list}, [(f.name, f.getvalue()) for f in st.session_state.uploaded_files])
+        else:
+            st.warning("โปรดอัปโหลดไฟล์เบอร์โทรศัพท์ก่อน")
+
+# งานของผู้ใช้นี้ แสดงความคืบหน้าและรันซ้ำเองทุก JOB_REFRESH_SECONDS วินาทีระหว่างมีงานค้าง
+with st.expander("งานเบื้องหลัง", expanded=bool(st.session_state.pending_jobs)):
+    st.fragment(show_jobs, run_every=JOB_REFRESH_SECONDS if st.session_state.pending_jobs else None)()
+
+
+### 2. ผลลัพธ์และตัวเลือกการดำเนินการ
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.info("#### ข้อมูลสถานะ")
+    for message in st.session_state.status_message:
+        st.text(message)
+    
+    st.markdown("---")
+    st.info("#### ผลลัพธ์เบอร์")
+    if len(st.session_state.new_numbers_to_add):
+        show_number_pages("เบอร์ใหม่ที่สามารถใช้ได้", st.session_state.new_numbers_to_add, "new_numbers_display", st.session_state.results_token)
+    if len(st.session_state.duplicates_found):
+        show_number_pages("เบอร์ที่ซ้ำกับไฟล์รวมเบอร์", st.session_state.duplicates_found, "duplicates_display", st.session_state.results_token)
+    
+    # New: Display search results
+    if len(st.session_state.search_found_numbers):
+        st.markdown("---")
+        st.info(f"#### ผลการค้นหา (พบเบอร์ใน{st.session_state.search_target})")
+        show_number_pages("เบอร์ที่พบ", st.session_state.search_found_numbers, "search_found_display", st.session_state.search_token, height=150)
+    if len(st.session_state.search_not_found_numbers):
+        st.markdown("---")
+        st.warning(f"#### ผลการค้นหา (ไม่พบเบอร์ใน{st.session_state.search_target})")
+        show_number_pages("เบอร์ที่ไม่พบ", st.session_state.search_not_found_numbers, "search_not_found_display", st.session_state.search_token, height=150)
+
+
+with col2:
+    st.success("#### บันทึกและส่งออก")
+    
+    save_password = st.text_input("รหัสผ่านสำหรับบันทึก", type="password", key='save_password_input')
+
+    if st.button("บันทึกลงไฟล์รวมเบอร์", key="save_to_combined_button"):
+        if save_password == "aa123456":
+            if st.session_state.results_job is None or st.session_state.is_checked_only:
+                st.warning("โปรดประมวลผลไฟล์ก่อนบันทึก")
+            else:
+                results_list = st.session_state.results_list
+                save_params = {
+                    'source_job': st.session_state.results_job,
+                    'list_name': results_list,
+                    'file_info': st.session_state.uploaded_file_info,
+                }
+                already_uploaded = [info[0] for content_hash, info in st.session_state.uploaded_file_info.items() if check_file_uploaded_before(content_hash, list_name=results_list)]
+                if already_uploaded:
+                    st.warning(f"ไฟล์เหล่านี้เคยถูกบันทึกแล้ว: {', '.join(already_uploaded)} คุณแน่ใจหรือไม่ว่าต้องการบันทึกซ้ำ?")
+                    if st.button("ยืนยันบันทึกซ้ำ", key="confirm_overwrite_button"):
+                        submit_job('save', save_params)
+                        st.rerun()
+                    else:
+                        st.stop()
+                else:
+                    submit_job('save', save_params)
+                    st.rerun()
+
+        elif save_password != "":
+            st.error("รหัสผ่านไม่ถูกต้องสำหรับการบันทึก")
+        else:
+            st.warning("โปรดใส่รหัสผ่านสำหรับการบันทึก")
+            
+    st.markdown("---")
+    
+    export_format = st.radio("เลือกรูปแบบไฟล์ส่งออก", ['txt', 'xlsx'], horizontal=True, key='export_format_radio')
+
+    def download_button(label, data, file_name, mime, button_key, requires_password=False):
+        can_download = True
+        if requires_password:
+            download_password_for_all = st.text_input("รหัสผ่านสำหรับดาวน์โหลด (เบอร์ทั้งหมด)", type="password", key=f'download_{button_key}_password_input')
+            if download_password_for_all != "aa123456":
+                st.warning("โปรดใส่รหัสผ่านที่ถูกต้องเพื่อดาวน์โหลดเบอร์ทั้งหมด")
+                can_download = False
+
+        if can_download:
+            # data เป็นฟังก์ชัน ไฟล์จะถูกสร้างเมื่อกดดาวน์โหลดเท่านั้น และไม่ต้องรันสคริปต์ใหม่หลังกด
+            st.download_button(
+                label=label,
+                data=data,
+                file_name=file_name,
+                mime=mime,
+                key=button_key,
+                on_click="ignore"
+            )
+        
+
+    if len(st.session_state.new_numbers_to_add):
+        download_button(
+            label=f"ดาวน์โหลดเบอร์ใหม่ ({len(st.session_state.new_numbers_to_add)} เบอร์)",
+            data=lazy_export_file(("new", st.session_state.results_token), st.session_state.new_numbers_to_add, export_format),
+            file_name=f"new_numbers.{export_format}",
+            mime=EXPORT_MIME_TYPES[export_format],
+            button_key="download_new_button",
+            requires_password=False
+        )
+    if len(st.session_state.duplicates_found):
+        download_button(
+            label=f"ดาวน์โหลดเบอร์ที่ซ้ำ ({len(st.session_state.duplicates_found)} เบอร์)",
+            data=lazy_export_file(("duplicates", st.session_state.results_token), st.session_state.duplicates_found, export_format),
+            file_name=f"duplicate_numbers.{export_format}",
+            mime=EXPORT_MIME_TYPES[export_format],
+            button_key="download_duplicates_button",
+            requires_password=False
+        )
+    if st.session_state.combined_count:
+        # ไฟล์เบอร์ทั้งหมดสร้างในงานเบื้องหลัง แล้วดาวน์โหลดจากไฟล์ของงานได้จนกว่าเบอร์รวม (หรือรายการ) จะเปลี่ยน
+        download_password_for_all = st.text_input("รหัสผ่านสำหรับดาวน์โหลด (เบอร์ทั้งหมด)", type="password", key='download_download_all_combined_button_password_input')
+        if download_password_for_all != "aa123456":
+            st.warning("โปรดใส่รหัสผ่านที่ถูกต้องเพื่อดาวน์โหลดเบอร์ทั้งหมด")
+        else:
+            # โหลดเบอร์ทั้งหมดเฉพาะหลังใส่รหัสผ่านถูก การรันสคริปต์ครั้งอื่นจึงไม่ต้องโหลดเบอร์รวม
+            master_version, master_numbers = get_master_snapshot(active_list)
+            export_version, export_job_id, export_file = st.session_state.export_results.get((active_list, export_format), (None, None, None))
+            if export_version is not None and export_version == master_version:
+                download_button(
+                    label=f"ดาวน์โหลดเบอร์ทั้งหมดใน{'ไฟล์รวมเบอร์' if active_list is None else 'รายการ ' + active_list} ({len(master_numbers)} เบอร์)",
+                    data=partial(read_job_file_bytes, export_job_id, export_file),
+                    file_name=f"all_combined_numbers.{export_format}" if active_list is None else f"list_{active_list}.{export_format}",
+                    mime=EXPORT_MIME_TYPES[export_format],
+                    button_key="download_all_combined_button",
+                    requires_password=False
+                )
+            elif st.button(f"เตรียมไฟล์เบอร์ทั้งหมด ({len(master_numbers)} เบอร์)", key="prepare_all_combined_button"):
+                submit_job('export', {'list_name': active_list, 'format': export_format})
+                st.rerun()
+    
+    # New: Download button for searched numbers found in the combined file
+    if len(st.session_state.search_found_numbers) or len(st.session_state.search_not_found_numbers):
+        st.markdown("---")
+    if len(st.session_state.search_found_numbers):
+        download_button(
+            label=f"ดาวน์โหลดเบอร์ที่พบในการค้นหา ({len(st.session_state.search_found_numbers)} เบอร์)",
+            data=lazy_export_file(("search_found", st.session_state.search_token), st.session_state.search_found_numbers, export_format),
+            file_name=f"found_search_numbers.{export_format}",
+            mime=EXPORT_MIME_TYPES[export_format],
+            button_key="download_search_found_button",
+            requires_password=False # No password needed for this specific download
+        )
+    if len(st.session_state.search_not_found_numbers):
+        download_button(
+            label=f"ดาวน์โหลดเบอร์ที่ไม่พบในการค้นหา ({len(st.session_state.search_not_found_numbers)} เบอร์)",
+            data=lazy_export_file(("search_not_found", st.session_state.search_token), st.session_state.search_not_found_numbers, export_format),
+            file_name=f"not_found_search_numbers.{export_format}",
+            mime=EXPORT_MIME_TYPES[export_format],
+            button_key="download_search_not_found_button",
+            requires_password=False
+        )
+
+
+### 3. ค้นหาเบอร์โทรศัพท์
+
+search_number_input = st.text_area("ป้อนเบอร์โทรศัพท์ที่ต้องการค้นหา (สามารถวางได้หลายเบอร์, คั่นด้วยบรรทัดใหม่)", key='search_number_input', height=150)
+
+if st.button("ค้นหาเบอร์", key="search_button"):
+    if search_number_input:
+        raw_numbers = [raw_num.strip() for raw_num in search_number_input.strip().splitlines()]
+        normalized = normalize_phone_numbers(raw_numbers)
+        for raw_num, normalized_search_number in zip(raw_numbers, normalized):
+            if not normalized_search_number:
+                update_status(f"รูปแบบเบอร์โทรศัพท์ไม่ถูกต้อง: {raw_num} (ไม่ถูกประมวลผลในการค้นหา)")
+
+        set_search_results(encode_numbers(normalized.dropna()))
+
+    else:
+        st.warning("โปรดป้อนเบอร์โทรศัพท์ที่ต้องการค้นหา")
+
+# ค้นหาจำนวนมากจากไฟล์: อ่านและแปลงเบอร์ทั้งไฟล์แบบสตรีม แล้วค้นหาในเบอร์รวมทีเดียว
+search_file = st.file_uploader(
+    "หรือค้นหาจากไฟล์เบอร์ (.txt, .xlsx, .csv หรือ .tsv)",
+    type=['txt', 'xlsx', 'csv', 'tsv'],
+    key="search_file_uploader"
+)
+
+if st.button("ค้นหาจากไฟล์", key="search_file_button"):
+    if search_file:
+        try:
+            search_file_numbers = read_search_file(search_file)
+        except Exception as e:
+            report_file_error(search_file.name, e)
+        else:
+            update_status(f"ค้นหาจากไฟล์ {search_file.name}: {len(search_file_numbers)} เบอร์")
+            set_search_results(search_file_numbers)
+    else:
+        st.warning("โปรดอัปโหลดไฟล์เบอร์โทรศัพท์ที่ต้องการค้นหา")
+
+
+### 4. รวม/ตัด/ลบรายการ
+
+if list_names:
+    st.markdown("---")
+    st.info("#### รวม/ตัด/ลบรายการ")
+    left_col, operation_col, right_col = st.columns(3)
+    left_list = left_col.selectbox("รายการแรก", list_names, key="operation_left_list")
+    left_days = left_col.number_input("เฉพาะเบอร์ที่บันทึกภายใน (วัน, 0 = ทั้งหมด)", min_value=0, step=1, key="operation_left_days")
+    operation = operation_col.radio("การดำเนินการ", SET_OPERATIONS, format_func=SET_OPERATION_LABELS.get, key="operation_radio")
+    right_list = right_col.selectbox("รายการที่สอง", list_names, key="operation_right_list")
+    right_days = right_col.number_input("เฉพาะเบอร์ที่บันทึกภายใน (วัน, 0 = ทั้งหมด)", min_value=0, step=1, key="operation_right_days")
+
+    if st.button("คำนวณ", key="list_operation_button"):
+        try:
+            left_numbers = load_list_for_operation(left_list, left_days)
+            right_numbers = load_list_for_operation(right_list, right_days)
+        except sqlite3.Error as e:
+            st.error(f"เกิดข้อผิดพลาด: ไม่สามารถอ่านรายการจากฐานข้อมูลได้: {e}")
+        else:
+            st.session_state.list_operation_numbers = combine_numbers(left_numbers, right_numbers, operation)
+            st.session_state.list_operation_label = f"{left_list} {SET_OPERATION_LABELS[operation].split()[0]} {right_list}"
+            st.session_state.list_operation_token = uuid.uuid4().hex
+            update_status(f"{st.session_state.list_operation_label}: {len(st.session_state.list_operation_numbers)} เบอร์")
+
+    if st.session_state.list_operation_label:
+        show_number_pages(
+            st.session_state.list_operation_label, st.session_state.list_operation_numbers,
+            "list_operation_display", st.session_state.list_operation_token, height=150,
+        )
+        if len(st.session_state.list_operation_numbers):
+            st.download_button(
+                f"ดาวน์โหลดผลลัพธ์ ({len(st.session_state.list_operation_numbers)} เบอร์)",
+                data=lazy_export_file(("list_operation", st.session_state.list_operation_token), st.session_state.list_operation_numbers, export_format),
+                file_name=f"list_operation.{export_format}",
+                mime=EXPORT_MIME_TYPES[export_format],
+                key="download_list_operation_button",
+                on_click="ignore",
+            )
+
+
+# การจัดการไฟล์ข้อมูล
+
+clear_password = st.text_input("รหัสผ่านสำหรับล้างไฟล์รวมเบอร์", type="password", key='clear_password_input')
+
+if st.button("ล้างไฟล์รวมเบอร์", key="clear_combined_button"):
+    if clear_password == "5555+":
+        st.warning("คุณแน่ใจหรือไม่ว่าต้องการลบเบอร์ทั้งหมดในไฟล์รวมเบอร์? (กู้คืนได้จากส่วนกู้คืนไฟล์รวมเบอร์ย้อนหลัง)")
+        
+        if st.button("ยืนยันการลบ", key='confirm_clear_button'):
+            try:
+                clear_numbers_store()
+                with open(COMBINED_NUMBERS_FILE, 'w', encoding='utf-8') as f:
+                    f.write("")
+                st.session_state.combined_count = 0
+                st.success("ลบเบอร์ในไฟล์รวมเบอร์ทั้งหมดเรียบร้อยแล้ว")
+                st.session_state.status_message.append("ไฟล์รวมเบอร์ถูกลบแล้ว")
+                st.rerun()
+            except Exception as e:
+                st.error(f"ข้อผิดพลาดในการลบ: {e}")
+    elif clear_password != "":
+        st.error("รหัสผ่านไม่ถูกต้อง")
+
+if active_list is not None and st.button(f"ลบรายการ {active_list}", key="delete_list_button"):
+    # ลบเฉพาะสมาชิกของรายการ เบอร์ยังอยู่ในไฟล์รวมเบอร์ ใช้รหัสผ่านเดียวกับการล้างไฟล์รวมเบอร์
+    if clear_password == "5555+":
+        try:
+            delete_list(active_list)
+        except sqlite3.Error as e:
+            st.error(f"ข้อผิดพลาดในการลบรายการ: {e}")
+        else:
+            update_status(f"ลบรายการ {active_list} แล้ว")
+            st.rerun()
+    else:
+        st.warning("โปรดใส่รหัสผ่านสำหรับล้างไฟล์รวมเบอร์ก่อนลบรายการ")
+
+# กู้คืนเบอร์รวมย้อนหลังจาก snapshot และบันทึกการเปลี่ยนแปลง (ไม่ต้องนำเข้าไฟล์ใหม่) ใช้รหัสผ่านเดียวกับการล้างไฟล์รวมเบอร์
+try:
+    restore_points = get_restore_points(NUMBERS_DB_FILE)
+except sqlite3.Error as e:
+    st.error(f"เกิดข้อผิดพลาด: ไม่สามารถอ่านประวัติไฟล์รวมเบอร์ได้: {e}")
+    restore_points = []
+if restore_points:
+    restore_labels = {
+        version: f"เวอร์ชัน {version} ({created_at}): {RESTORE_POINT_LABELS.get(op, op).format(rows=rows)}"
+        for version, created_at, op, rows in restore_points
+    }
+    restore_version = st.selectbox(
+        "กู้คืนไฟล์รวมเบอร์ย้อนหลังเป็นสถานะหลังการเปลี่ยนแปลง",
+        list(restore_labels),
+        format_func=restore_labels.get,
+        key="restore_version",
+    )
+    if st.button("กู้คืนไฟล์รวมเบอร์", key="restore_button"):
+        if clear_password == "5555+":
+            try:
+                _, restored_count = restore_master_version(restore_version, NUMBERS_DB_FILE)
+            except (sqlite3.Error, ValueError) as e:
+                st.error(f"ข้อผิดพลาดในการกู้คืน: {e}")
+            else:
+                st.session_state.combined_count = restored_count
+                update_status(f"กู้คืนไฟล์รวมเบอร์เป็นเวอร์ชัน {restore_version} แล้ว: {restored_count} เบอร์")
+                st.rerun()
+        else:
+            st.warning("โปรดใส่รหัสผ่านสำหรับล้างไฟล์รวมเบอร์ก่อนกู้คืน")
+
+
+# ข้อมูลวินิจฉัยประสิทธิภาพ (แสดงเมื่อเลือกเท่านั้น) แสดงท้ายสคริปต์เพื่อให้รวมงานของรอบนี้ด้วย
+with st.sidebar:
+    if st.checkbox("แสดงข้อมูลวินิจฉัย (เวลาแต่ละขั้นตอน)", key="show_diagnostics"):
+        show_diagnostics()
\ No newline at end of file
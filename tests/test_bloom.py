@@ -0,0 +1,73 @@
+"""
+Bloom filter ต้องไม่ตอบว่า "ไม่มี" กับเบอร์ที่มีอยู่จริง อัตรา false positive ต้องใกล้ค่าที่ตั้งไว้
+และตัวกรองที่เวอร์ชันไม่ตรงกับฐานข้อมูลต้องถูกสร้างใหม่
+"""
+import numpy as np
+
+from number_manager import (
+    BloomFilter,
+    clear_numbers_store,
+    decode_numbers,
+    find_existing_numbers_in_store,
+    get_bloom_path,
+    insert_numbers,
+    load_bloom_filter,
+)
+
+def random_numbers(rng, count):
+    return rng.choice(np.arange(800000000, 1000000000, dtype=np.uint32), count, replace=False)
+
+def test_no_false_negatives_after_save_and_load(tmp_path):
+    rng = np.random.default_rng(0)
+    numbers = random_numbers(rng, 200000)
+    bloom = BloomFilter(len(numbers), version=7)
+    bloom.add(numbers[:100000])
+    bloom.add(numbers[100000:])
+    assert bloom.might_contain(numbers).all()
+
+    path = str(tmp_path / 'bloom.npz')
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+    assert (loaded.version, loaded.count, loaded.capacity) == (7, len(numbers), len(numbers))
+    assert loaded.might_contain(numbers).all()
+
+def test_false_positive_rate_close_to_target():
+    rng = np.random.default_rng(1)
+    numbers = random_numbers(rng, 300000)
+    members, others = numbers[:100000], numbers[100000:]
+    bloom = BloomFilter(len(members), fp_rate=0.01)
+    bloom.add(members)
+    measured = bloom.might_contain(others).mean()
+    assert 0.005 < measured < 0.015
+    assert abs(measured - bloom.expected_fp_rate()) < 0.003
+
+def test_filter_follows_store_writes(tmp_path):
+    db_path = str(tmp_path / 'numbers.db')
+    first = decode_numbers(np.arange(800000000, 800001000, dtype=np.uint32))
+    _, version = insert_numbers(first, db_path=db_path)
+    bloom = load_bloom_filter(db_path)
+    assert bloom.version == version
+
+    # บันทึกต่อจากเวอร์ชันของตัวกรองพอดี: เพิ่มเบอร์ลงไฟล์ตัวกรองเดิม
+    second = decode_numbers(np.arange(900000000, 900001000, dtype=np.uint32))
+    _, version = insert_numbers(second, db_path=db_path)
+    updated = BloomFilter.load(get_bloom_path(db_path))
+    assert (updated.version, updated.count) == (version, 2000)
+    assert load_bloom_filter(db_path).might_contain(np.arange(900000000, 900001000, dtype=np.uint32)).all()
+
+def test_stale_filter_is_rebuilt(tmp_path):
+    db_path = str(tmp_path / 'numbers.db')
+    insert_numbers(decode_numbers(np.arange(800000000, 800001000, dtype=np.uint32)), db_path=db_path)
+    stale = load_bloom_filter(db_path)
+    # ล้างข้อมูลไม่แก้ตัวกรอง การบันทึกถัดไปจึงต่อจากเวอร์ชันของตัวกรองไม่ได้
+    clear_numbers_store(db_path)
+    fresh = decode_numbers(np.arange(810000000, 810000500, dtype=np.uint32))
+    _, version = insert_numbers(fresh, db_path=db_path)
+    assert BloomFilter.load(get_bloom_path(db_path)).version == stale.version
+
+    rebuilt = load_bloom_filter(db_path)
+    assert (rebuilt.version, rebuilt.count) == (version, len(fresh))
+    assert BloomFilter.load(get_bloom_path(db_path)).version == version
+    lookup = fresh[:100] + decode_numbers(np.arange(800000000, 800000100, dtype=np.uint32))
+    assert find_existing_numbers_in_store(lookup, db_path, rebuilt) == set(fresh[:100])
+    assert find_existing_numbers_in_store(lookup, db_path, rebuilt) == find_existing_numbers_in_store(lookup, db_path)
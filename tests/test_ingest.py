@@ -0,0 +1,73 @@
+"""
+หาตัวคั่น หัวตาราง และคอลัมน์เบอร์โทรศัพท์ของไฟล์ csv/tsv (sniff_csv_layout / choose_phone_column)
+"""
+import io
+
+import pytest
+
+from number_manager import (
+    NoPhoneColumnError,
+    choose_phone_column,
+    decode_numbers,
+    read_phone_numbers,
+    sniff_csv_layout,
+)
+
+# (ชื่อกรณี, ชื่อไฟล์, เนื้อหา, ตัวคั่น, มีหัวตาราง, คอลัมน์เบอร์, เบอร์ที่อ่านได้)
+CSV_CASES = [
+    ('comma with phone header', 'a.csv', 'name,phone\nA,0812345678\nB,0898765432\n',
+     ',', True, 1, ['0812345678', '0898765432']),
+    ('semicolon', 'a.csv', 'name;mobile;city\nA;081-234-5678;BKK\nB;089 876 5432;CNX\n',
+     ';', True, 1, ['0812345678', '0898765432']),
+    ('tab in csv', 'a.csv', 'name\ttel\nA\t0812345678\nB\t+66898765432\n',
+     '\t', True, 1, ['0812345678', '0898765432']),
+    ('tsv extension', 'a.tsv', 'id\tnumber\n1\t0812345678\n2\t0898765432\n',
+     '\t', True, 1, ['0812345678', '0898765432']),
+    ('headerless', 'a.csv', 'A,0812345678\nB,0898765432\nC,0811111111\n',
+     ',', False, 1, ['0811111111', '0812345678', '0898765432']),
+    ('headerless single column', 'a.csv', '0812345678\n0898765432\n',
+     ',', False, 0, ['0812345678', '0898765432']),
+    ('hit rate beats header name', 'a.csv', 'phone,contact\nN/A,0812345678\n-,0898765432\nx,0811111111\n',
+     ',', True, 1, ['0811111111', '0812345678', '0898765432']),
+    ('header name breaks tie', 'a.csv', 'home,phone\n0812345678,0898765432\n0811111111,0822222222\n',
+     ',', True, 1, ['0822222222', '0898765432']),
+    ('ragged rows', 'a.csv', 'name,phone,note\nA,0812345678\nB,0898765432,vip\nC\n',
+     ',', True, 1, ['0812345678', '0898765432']),
+    ('utf-8 bom', 'a.csv', '\ufeffphone,name\n0812345678,ก\n0898765432,ข\n',
+     ',', True, 0, ['0812345678', '0898765432']),
+    ('bom headerless', 'a.csv', '\ufeff0812345678,ก\n0898765432,ข\n',
+     ',', False, 0, ['0812345678', '0898765432']),
+]
+
+@pytest.mark.parametrize(
+    'filename, content, delimiter, has_header, column, numbers',
+    [case[1:] for case in CSV_CASES],
+    ids=[case[0] for case in CSV_CASES],
+)
+def test_sniff_and_read_csv(filename, content, delimiter, has_header, column, numbers):
+    data = content.encode('utf-8')
+    assert sniff_csv_layout(io.BytesIO(data), filename) == (delimiter, has_header, column)
+    assert decode_numbers(read_phone_numbers(io.BytesIO(data), filename)) == numbers
+
+# (ชื่อกรณี, หัวตาราง, แถวตัวอย่าง, คอลัมน์ที่เลือก)
+COLUMN_CASES = [
+    ('most hits wins', ['a', 'b', 'c'], [['x', '0812345678', '1'], ['y', '0898765432', '0811111111']], 1),
+    ('tie prefers named column', ['home', 'phone'], [['0812345678', '0898765432']], 1),
+    ('tie without name prefers first', ['a', 'b'], [['0812345678', '0898765432']], 0),
+    ('no hits uses header name', ['name', 'mobile number'], [['x', 'y']], 1),
+    ('no hits and no name uses first', ['a', 'b'], [['x', 'y']], 0),
+    ('short rows', ['a', 'b', 'c'], [['x'], ['y', 'z', '0812345678']], 2),
+    ('no header', [], [['x', '0812345678'], ['y', '0898765432']], 1),
+]
+
+@pytest.mark.parametrize(
+    'header, sample_rows, column',
+    [case[1:] for case in COLUMN_CASES],
+    ids=[case[0] for case in COLUMN_CASES],
+)
+def test_choose_phone_column(header, sample_rows, column):
+    assert choose_phone_column(header, sample_rows) == column
+
+def test_empty_csv_has_no_phone_column():
+    with pytest.raises(NoPhoneColumnError):
+        sniff_csv_layout(io.BytesIO(b'\n \n'), 'a.csv')
@@ -0,0 +1,124 @@
+"""
+คิวงาน: ลำดับการรับงานแบบแบ่งตามเจ้าของ การยกเลิก งานที่ค้าง process pool ที่ใช้ร่วมกัน และการข้ามไฟล์ที่บันทึกแล้ว
+"""
+import io
+import os
+import time
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+from number_manager import (
+    JOB_STALE_SECONDS,
+    JobQueue,
+    create_job_handlers,
+    encode_numbers,
+    hash_file_content,
+    insert_numbers,
+)
+
+SAVED_FILE = ('saved.txt', b'0812345678\n0812345679\n')
+NEW_FILE = ('new.txt', b'0898765432\n')
+
+def owner_handler(context):
+    return {'owner': context.owner}
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make_queue(handlers=None, processes=1):
+        if handlers is None:
+            handlers = create_job_handlers(str(tmp_path / 'numbers.db'))
+        queue = JobQueue(handlers, str(tmp_path / 'sms_jobs.db'), str(tmp_path / 'jobs'), workers=1, processes=processes)
+        queues.append(queue)
+        return queue
+
+    yield make_queue
+    for queue in queues:
+        queue.shutdown()
+
+def run_next(queue):
+    job = queue._claim()
+    queue.run_job(job)
+    return queue.get_job(job['id'])
+
+def test_claim_is_fair_between_owners(make_queue):
+    queue = make_queue({'work': owner_handler})
+    busy = [queue.submit('work', 'busy') for _ in range(3)]
+    other = queue.submit('work', 'other')
+    # งานแรกของ busy ยังทำอยู่ งานถัดไปจึงเป็นของ other แม้จะส่งมาทีหลัง
+    claimed = [queue._claim()['id'] for _ in range(4)]
+    assert claimed == [busy[0], other, busy[1], busy[2]]
+    assert queue._claim() is None
+
+def test_cancel_queued_and_running_jobs(make_queue):
+    def progress_handler(context):
+        context.progress(0.5, 'ทำอยู่')
+        return {}
+
+    queue = make_queue({'work': progress_handler})
+    queued = queue.submit('work', 'me')
+    queue.cancel(queued)
+    assert queue.get_job(queued)['status'] == 'cancelled'
+    assert queue._claim() is None
+
+    running = queue.submit('work', 'me')
+    job = queue._claim()
+    queue.cancel(running)
+    # งานที่กำลังทำหยุดเมื่อรายงานความคืบหน้าครั้งถัดไป
+    queue.run_job(job)
+    assert queue.get_job(running)['status'] == 'cancelled'
+
+def test_mark_stale_jobs(make_queue):
+    queue = make_queue({'work': owner_handler})
+    stale, alive = queue.submit('work', 'a'), queue.submit('work', 'b')
+    queue._claim()
+    queue._claim()
+    with closing(queue._connect()) as conn, conn:
+        conn.execute('UPDATE jobs SET heartbeat_at = ? WHERE id = ?', (time.time() - JOB_STALE_SECONDS - 1, stale))
+    queue.mark_stale_jobs()
+    assert (queue.get_job(stale)['status'], queue.get_job(stale)['error']) == ('failed', 'interrupted')
+    assert queue.get_job(alive)['status'] == 'running'
+
+def test_failed_handler_is_recorded(make_queue):
+    def failing_handler(context):
+        raise RuntimeError('boom')
+
+    queue = make_queue({'work': failing_handler})
+    queue.submit('work', 'me')
+    job = run_next(queue)
+    assert (job['status'], job['error']) == ('failed', 'RuntimeError: boom')
+
+def test_jobs_share_one_process_pool(make_queue):
+    assert make_queue(processes=1).process_pool() is None
+
+    queue = make_queue(processes=2)
+    pool = queue.process_pool()
+    for index in range(2):
+        queue.submit('check', 'me', {}, [SAVED_FILE, (f'extra{index}.txt', f'08{index}1111111\n'.encode())])
+        job = run_next(queue)
+        assert job['status'] == 'done', job['error']
+        assert job['result']['processed'] == 3
+        assert queue.process_pool() is pool
+    queue.shutdown()
+    with pytest.raises(RuntimeError):
+        pool.submit(int)
+
+def test_process_skips_saved_files_but_check_reads_them(tmp_path, make_queue):
+    db_path = str(tmp_path / 'numbers.db')
+    name, data = SAVED_FILE
+    insert_numbers(['0812345678', '0812345679'], {hash_file_content(io.BytesIO(data)): (name, len(data), 2)}, db_path)
+    queue = make_queue()
+
+    queue.submit('process', 'me', {}, [SAVED_FILE, NEW_FILE])
+    job = run_next(queue)
+    assert job['result']['processed'] == 1 and job['result']['duplicates'] == 0
+    assert any(message.startswith('ข้ามไฟล์ saved.txt') for _, message in job['result']['messages'])
+    assert np.load(os.path.join(queue.job_directory(job['id']), 'new.npy')).tolist() == encode_numbers(['0898765432']).tolist()
+
+    queue.submit('check', 'me', {}, [SAVED_FILE, NEW_FILE])
+    job = run_next(queue)
+    assert job['result']['processed'] == 3 and job['result']['duplicates'] == 2
+    assert not any(message.startswith('ข้ามไฟล์') for _, message in job['result']['messages'])
@@ -0,0 +1,76 @@
+"""
+รวม/ตัด/ลบรายการ (combine_numbers) ต้องได้ผลเดียวกับ set ของ Python และการกรองตามเวลาที่พบล่าสุดของรายการ
+"""
+import datetime
+import types
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+import number_manager.store
+from number_manager import (
+    SET_OPERATIONS,
+    combine_numbers,
+    decode_numbers,
+    get_db_connection,
+    insert_list_numbers,
+    load_list_numbers,
+)
+
+SET_RESULTS = {
+    'union': lambda left, right: left | right,
+    'intersection': lambda left, right: left & right,
+    'difference': lambda left, right: left - right,
+}
+
+def sorted_unique(rng, count, high):
+    return np.unique(rng.integers(800000000, 800000000 + high, count).astype(np.uint32))
+
+@pytest.mark.parametrize('operation', SET_OPERATIONS)
+@pytest.mark.parametrize('left_count, right_count, high', [
+    (0, 0, 10), (0, 50, 100), (50, 0, 100), (1000, 1000, 1500), (5000, 100, 1000000), (100, 5000, 1000000),
+])
+def test_combine_matches_python_sets(operation, left_count, right_count, high):
+    rng = np.random.default_rng(left_count * 7 + right_count)
+    left, right = sorted_unique(rng, left_count, high), sorted_unique(rng, right_count, high)
+    combined = combine_numbers(left, right, operation)
+    assert combined.dtype == np.uint32
+    assert combined.tolist() == sorted(SET_RESULTS[operation](set(left.tolist()), set(right.tolist())))
+
+def test_combine_rejects_unknown_operation():
+    with pytest.raises(ValueError):
+        combine_numbers(np.empty(0, dtype=np.uint32), np.empty(0, dtype=np.uint32), 'xor')
+
+def numbers(start, count):
+    return decode_numbers(np.arange(800000000 + start, 800000000 + start + count, dtype=np.uint32))
+
+def test_seen_within_days_cutoff(tmp_path, monkeypatch):
+    today = datetime.datetime(2024, 6, 30, 12, 0, 0)
+    clock = {'now': today}
+
+    class FakeDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock['now']
+    monkeypatch.setattr(number_manager.store, 'datetime', types.SimpleNamespace(
+        datetime=FakeDatetime, timedelta=datetime.timedelta))
+
+    db_path = str(tmp_path / 'numbers.db')
+    for days_ago, start in ((30, 0), (7, 100), (2, 200), (0, 300)):
+        clock['now'] = today - datetime.timedelta(days=days_ago)
+        insert_list_numbers(numbers(start, 10), 'brand_a', None, db_path)
+    # เบอร์เก่าที่ถูกบันทึกเข้ารายการอีกครั้งวันนี้นับว่าพบล่าสุดวันนี้
+    clock['now'] = today
+    insert_list_numbers(numbers(0, 3), 'brand_a', None, db_path)
+
+    with closing(get_db_connection(db_path)) as conn:
+        def seen(days):
+            return decode_numbers(load_list_numbers(conn, 'brand_a', days))
+
+        assert seen(None) == seen(30) == numbers(0, 10) + numbers(100, 10) + numbers(200, 10) + numbers(300, 10)
+        # ขอบเขตรวมเบอร์ที่พบล่าสุดพอดี N วันก่อน
+        assert seen(7) == numbers(0, 3) + numbers(100, 10) + numbers(200, 10) + numbers(300, 10)
+        assert seen(6) == seen(2) == numbers(0, 3) + numbers(200, 10) + numbers(300, 10)
+        assert seen(0) == numbers(0, 3) + numbers(300, 10)
+        assert load_list_numbers(conn, 'missing', 7).tolist() == []
@@ -0,0 +1,85 @@
+"""
+normalize_phone_numbers (ทั้งชุด) ต้องให้ผลเหมือน normalize_phone_number (ทีละค่า) ทุกกรณี
+"""
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from number_manager import decode_numbers, encode_numbers, normalize_phone_number, normalize_phone_numbers
+
+MIXED_VALUES = [
+    '0812345678', '812345678', '66812345678', '+66812345678', '+66 81 234 5678', '(081) 234-5678',
+    '081-234-5678', '081 234 5678', ' 0812345678 ', '\t0812345678\r', '08 1234 5678 ต่อ 1',
+    '๐๘๑๒๓๔๕๖๗๘', '๘๑๒๓๔๕๖๗๘', '+๖๖๘๑๒๓๔๕๖๗๘', '0๘๑๒๓๔๕๖๗๘', 'โทร ๐๙๑-๒๓๔-๕๖๗๘',
+    '021234567', '02-123-4567', '1234', '', '   ', 'N/A', 'สมชาย ใจดี', '0812345', '08123456789',
+    '668123456789', '66812345', '512345678', '0812\n345678', '+1 415 555 0100',
+    812345678, 66812345678, 812345678.0, 66812345678.0, 21234567, 0, -812345678, 1e20,
+    None, float('nan'), pd.NaT, True, pd.Timestamp('2024-01-01'), float('inf'), float('-inf'), np.float64('inf'),
+]
+
+def scalar(values):
+    return [None if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT
+            else normalize_phone_number(value) for value in values]
+
+def batch(values):
+    return normalize_phone_numbers(values).tolist()
+
+def test_mixed_values_match_scalar():
+    assert batch(MIXED_VALUES) == scalar(MIXED_VALUES)
+
+@pytest.mark.parametrize('value', MIXED_VALUES)
+def test_single_value_matches_scalar(value):
+    assert batch([value]) == scalar([value])
+
+def test_non_finite_cell_does_not_fail_batch():
+    assert batch(['0812345678', float('inf')]) == ['0812345678', None]
+
+def test_numeric_series_matches_scalar():
+    values = pd.Series([812345678, 66812345678, 21234567, np.nan, 912345678.0, 1e20, np.inf, -np.inf])
+    assert batch(values) == scalar(values.tolist())
+
+def test_integer_series_matches_scalar():
+    values = pd.Series([812345678, 66812345678, 21234567, 0], dtype='int64')
+    assert batch(values) == scalar(values.tolist())
+
+def test_result_keeps_index():
+    values = pd.Series(['0812345678', 'abc', None], index=[10, 20, 30])
+    result = normalize_phone_numbers(values)
+    assert result.index.tolist() == [10, 20, 30]
+    assert result.tolist() == ['0812345678', None, None]
+
+def test_empty_input():
+    assert batch([]) == []
+
+def test_random_formats_match_scalar():
+    rng = random.Random(0)
+    separators = ['', ' ', '-', '.', '  ', '\t']
+    prefixes = ['0', '', '66', '+66', '+66 ', '(0', '๐', '+๖๖']
+    thai_digits = str.maketrans('0123456789', '๐๑๒๓๔๕๖๗๘๙')
+    values = []
+    for _ in range(5000):
+        digits = ''.join(rng.choice('0123456789') for _ in range(rng.choice([7, 8, 9, 9, 9, 10, 11])))
+        text = rng.choice(prefixes) + rng.choice(separators).join([digits[:2], digits[2:5], digits[5:]])
+        if rng.random() < 0.1:
+            text = text.translate(thai_digits)
+        if rng.random() < 0.05:
+            text = ' ' + text + ' ต่อ'
+        values.append(text)
+    assert batch(values) == scalar(values)
+
+def test_unicode_digits_become_ascii():
+    assert normalize_phone_number('0๘๑๒๓๔๕๖๗๘') == '0812345678'
+    assert batch(['0๘๑๒๓๔๕๖๗๘', '+๖๖๘๑๒๓๔๕๖๗๘', 'abc']) == ['0812345678', '0812345678', None]
+
+def test_encode_round_trip():
+    numbers = ['0812345678', '0600000000', '0999999999']
+    assert decode_numbers(encode_numbers(numbers)) == numbers
+
+def test_encode_rejects_or_skips_invalid():
+    values = ['0812345678', '0๘๑๒๓๔๕๖๗๘', '08123456789', '081234567', '1812345678', None]
+    with pytest.raises(ValueError):
+        encode_numbers(values)
+    assert encode_numbers(values, skip_invalid=True).tolist() == [812345678]
@@ -0,0 +1,144 @@
+"""
+กู้คืนเบอร์รวมจาก snapshot และ master_log: เล่นบันทึก กู้คืน ลืมไฟล์ที่บันทึกหลังเวอร์ชันที่กู้คืน และตัด snapshot เก่า
+"""
+import datetime
+import types
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+import number_manager.store
+from number_manager import (
+    SNAPSHOT_KEEP,
+    check_file_uploaded_before,
+    clear_numbers_store,
+    compact_master_snapshots,
+    count_numbers,
+    decode_numbers,
+    get_db_connection,
+    get_restore_points,
+    get_snapshot_dir,
+    insert_list_numbers,
+    insert_numbers,
+    list_snapshot_versions,
+    load_list_numbers,
+    load_master_numbers,
+    read_master_snapshot,
+    replay_master_log,
+    restore_master_version,
+)
+
+def numbers(start, count):
+    return decode_numbers(np.arange(800000000 + start, 800000000 + start + count, dtype=np.uint32))
+
+def file_info(content_hash, count):
+    return {content_hash: (f'{content_hash}.txt', count * 11, count)}
+
+def master(db_path):
+    with closing(get_db_connection(db_path)) as conn:
+        return decode_numbers(load_master_numbers(conn))
+
+@pytest.fixture
+def db_path(tmp_path):
+    db_path = str(tmp_path / 'numbers.db')
+    # snapshot ของเวอร์ชัน 0 (ว่าง) เป็นจุดเริ่มให้เล่นบันทึกได้ทุกเวอร์ชัน
+    with closing(get_db_connection(db_path)) as conn:
+        read_master_snapshot(conn, db_path)
+    return db_path
+
+def test_replay_matches_every_version(db_path):
+    expected = {0: []}
+    _, version = insert_numbers(numbers(0, 100), db_path=db_path)
+    expected[version] = master(db_path)
+    _, version = insert_numbers(numbers(50, 100), db_path=db_path)
+    expected[version] = master(db_path)
+    clear_numbers_store(db_path)
+    _, version = insert_numbers(numbers(500, 10), db_path=db_path)
+    expected[version] = master(db_path)
+    version, _ = restore_master_version(2, db_path)
+    expected[version] = master(db_path)
+    assert expected[version] == expected[2]
+
+    with closing(get_db_connection(db_path)) as conn:
+        for version, expected_numbers in expected.items():
+            replayed = replay_master_log(conn, get_snapshot_dir(db_path), version)
+            assert decode_numbers(replayed[0]) == expected_numbers
+
+def test_restore_after_clear_and_reingest(db_path):
+    insert_numbers(numbers(0, 100), file_info('a', 100), db_path)
+    insert_list_numbers(numbers(100, 50), 'brand_a', file_info('b', 50), db_path)
+    before_clear = master(db_path)
+    clear_numbers_store(db_path)
+    assert master(db_path) == [] and count_numbers(db_path) == 0
+    _, version = insert_numbers(numbers(1000, 20), file_info('c', 20), db_path)
+
+    new_version, count = restore_master_version(2, db_path)
+    assert new_version == version + 1
+    assert master(db_path) == before_clear
+    assert count == count_numbers(db_path) == len(before_clear)
+    # c ถูกบันทึกหลังเวอร์ชัน 2 จึงถูกลืม ส่วน a และ b ถูกลบไปตอนล้างข้อมูลแล้ว บันทึกใหม่ได้ทุกไฟล์
+    assert check_file_uploaded_before('c', db_path) is None
+    assert check_file_uploaded_before('a', db_path) is None
+
+    inserted, _ = insert_numbers(numbers(1000, 20), file_info('c', 20), db_path)
+    assert inserted == numbers(1000, 20)
+    assert check_file_uploaded_before('c', db_path) is not None
+    with closing(get_db_connection(db_path)) as conn:
+        assert read_master_snapshot(conn, db_path)[1].tolist() == load_master_numbers(conn).tolist()
+
+def test_restore_forgets_files_saved_in_the_same_second(db_path, monkeypatch):
+    # ทุกการบันทึกเกิดในวินาทีเดียวกัน เวลาจึงแยกไฟล์ก่อน/หลังเวอร์ชันที่กู้คืนไม่ได้
+    class FrozenDatetime(datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2024, 1, 1, 12, 0, 0)
+    monkeypatch.setattr(number_manager.store, 'datetime', types.SimpleNamespace(
+        datetime=FrozenDatetime, timedelta=datetime.timedelta))
+
+    _, kept_version = insert_list_numbers(numbers(0, 10), 'brand_a', file_info('a', 10), db_path)[:2]
+    insert_list_numbers(numbers(10, 10), 'brand_a', file_info('b', 10), db_path)
+    # ไฟล์ที่ไม่มีเบอร์ใหม่ได้เวอร์ชันเดิม จึงถูกลืมไปพร้อมไฟล์ที่เพิ่มเบอร์ของมัน
+    insert_numbers(numbers(10, 5), file_info('c', 5), db_path)
+
+    restore_master_version(kept_version, db_path)
+    assert master(db_path) == numbers(0, 10)
+    assert check_file_uploaded_before('a', db_path) is not None
+    assert check_file_uploaded_before('a', db_path, 'brand_a') is not None
+    for content_hash in ('b', 'c'):
+        assert check_file_uploaded_before(content_hash, db_path) is None
+        assert check_file_uploaded_before(content_hash, db_path, 'brand_a') is None
+    with closing(get_db_connection(db_path)) as conn:
+        assert decode_numbers(load_list_numbers(conn, 'brand_a')) == numbers(0, 10)
+
+    inserted, _ = insert_numbers(numbers(10, 10), file_info('b', 10), db_path)
+    assert inserted == numbers(10, 10)
+
+def test_restore_rejects_unknown_versions(db_path):
+    _, version = insert_numbers(numbers(0, 10), db_path=db_path)
+    with pytest.raises(ValueError):
+        restore_master_version(version, db_path)
+    with pytest.raises(ValueError):
+        restore_master_version(-1, db_path)
+
+def test_compaction_prunes_snapshots_and_log(db_path):
+    directory = get_snapshot_dir(db_path)
+    for batch in range(SNAPSHOT_KEEP + 3):
+        _, version = insert_numbers(numbers(batch * 10, 10), db_path=db_path)
+        with closing(get_db_connection(db_path)) as conn:
+            compact_master_snapshots(db_path, version, load_master_numbers(conn))
+
+    snapshots = list_snapshot_versions(directory)
+    assert len(snapshots) == SNAPSHOT_KEEP
+    assert snapshots[-1] == version
+    with closing(get_db_connection(db_path)) as conn:
+        assert conn.execute('SELECT MIN(version) FROM master_log').fetchone()[0] == snapshots[0]
+        for snapshot in snapshots:
+            replayed = replay_master_log(conn, directory, snapshot)
+            assert decode_numbers(replayed[0]) == numbers(0, snapshot * 10)
+    # เวอร์ชันที่เก่ากว่า snapshot เก่าสุดกู้คืนไม่ได้แล้ว
+    assert [point[0] for point in get_restore_points(db_path)] == sorted(snapshots[:-1], reverse=True)
+    with pytest.raises(ValueError):
+        restore_master_version(snapshots[0] - 1, db_path)
+    restore_master_version(snapshots[0], db_path)
+    assert master(db_path) == numbers(0, snapshots[0] * 10)
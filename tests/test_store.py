@@ -0,0 +1,71 @@
+"""
+การเขียนพร้อมกันหลายโปรเซส (BEGIN IMMEDIATE + ตารางชั่วคราว staged_numbers) ต้องไม่ทำให้เบอร์ซ้ำ หาย หรือนับผิด
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+import numpy as np
+
+from number_manager import (
+    count_numbers,
+    decode_numbers,
+    encode_numbers,
+    get_db_connection,
+    get_lists,
+    insert_list_numbers,
+    load_list_numbers,
+    load_master_numbers,
+    read_master_snapshot,
+)
+
+WRITERS = 12
+ROUNDS = 8
+BATCH_SIZE = 500
+# เบอร์ทั้งหมดที่ทุกโปรเซสสุ่มหยิบไปบันทึก (ชุดของแต่ละโปรเซสทับกันมาก)
+POOL_SIZE = 5000
+LIST_NAMES = (None, 'brand_a', 'brand_b')
+
+def write_batches(db_path, writer):
+    """
+    บันทึกเบอร์ ROUNDS ชุด สลับระหว่างเบอร์รวมอย่างเดียวกับรายการ คืนค่า list ของ
+    (ชื่อรายการ, เบอร์ที่เพิ่มในเบอร์รวม, เบอร์ที่เพิ่มในรายการ)
+    """
+    rng = np.random.default_rng(writer)
+    results = []
+    for round_number in range(ROUNDS):
+        encoded = rng.choice(POOL_SIZE, BATCH_SIZE, replace=False).astype(np.uint32) + 800000000
+        list_name = LIST_NAMES[(writer + round_number) % len(LIST_NAMES)]
+        inserted, _, list_added, _ = insert_list_numbers(decode_numbers(encoded), list_name, None, db_path)
+        results.append((list_name, inserted, list_added.tolist()))
+    return results
+
+def test_concurrent_writers_keep_store_consistent(tmp_path):
+    db_path = str(tmp_path / 'numbers.db')
+    with closing(get_db_connection(db_path)):
+        pass
+    with ProcessPoolExecutor(WRITERS, mp_context=multiprocessing.get_context('spawn')) as pool:
+        results = [
+            result
+            for future in [pool.submit(write_batches, db_path, writer) for writer in range(WRITERS)]
+            for result in future.result()
+        ]
+
+    inserted = [number for _, numbers, _ in results for number in numbers]
+    # แต่ละเบอร์ถูกนับว่า "เพิ่มใหม่" ได้เพียงครั้งเดียวไม่ว่าจะมีกี่โปรเซสบันทึกพร้อมกัน
+    assert len(inserted) == len(set(inserted))
+    with closing(get_db_connection(db_path)) as conn:
+        master = load_master_numbers(conn)
+        assert sorted(encode_numbers(inserted).tolist()) == master.tolist()
+        assert conn.execute('SELECT COUNT(*) FROM phone_numbers').fetchone()[0] == len(master)
+        assert read_master_snapshot(conn, db_path)[1].tolist() == master.tolist()
+        list_counts = {name: count for name, count, _ in get_lists(db_path)}
+        for list_name in LIST_NAMES[1:]:
+            added = [number for name, _, numbers in results if name == list_name for number in numbers]
+            assert len(added) == len(set(added))
+            members = load_list_numbers(conn, list_name)
+            assert sorted(added) == members.tolist()
+            assert list_counts[list_name] == len(members)
+            # สมาชิกของรายการอยู่ในเบอร์รวมด้วยเสมอ
+            assert np.isin(members, master).all()
+    assert count_numbers(db_path) == len(master)